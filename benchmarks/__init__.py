@@ -0,0 +1,6 @@
+"""
+Benchmarks for objectgraph
+
+Run ``python -m benchmarks --help`` in the root of the repository
+for usage information.
+"""
@@ -0,0 +1,106 @@
+"""
+Command line interface for the benchmark suite
+
+Usage::
+
+    python -m benchmarks run [--sizes 1e3,1e4] [--output results.json]
+    python -m benchmarks compare baseline.json results.json
+"""
+
+import argparse
+import json
+import sys
+
+from .generators import GENERATORS
+from .operations import BENCHMARKS
+from .runner import compare_results, graph_classes, parse_sizes, run_benchmarks
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run benchmarks")
+    run.add_argument(
+        "--sizes",
+        type=parse_sizes,
+        default=[1_000, 10_000, 100_000, 1_000_000],
+        help="comma separated list of edge counts (default: 1e3,1e4,1e5,1e6)",
+    )
+    run.add_argument(
+        "--generator",
+        action="append",
+        choices=sorted(GENERATORS),
+        help="graph generator to use, can be repeated (default: all)",
+    )
+    run.add_argument(
+        "--benchmark",
+        action="append",
+        choices=sorted(BENCHMARKS),
+        help="benchmark to run, can be repeated (default: all)",
+    )
+    run.add_argument(
+        "--graph-class",
+        action="append",
+        help="objectgraph class to benchmark, can be repeated (default: ObjectGraph)",
+    )
+    run.add_argument("--repeat", type=int, default=3, help="repetitions (default: 3)")
+    run.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    run.add_argument(
+        "--no-memory",
+        dest="memory",
+        action="store_false",
+        help="don't measure peak memory usage",
+    )
+    run.add_argument(
+        "--output",
+        type=argparse.FileType("w"),
+        default=sys.stdout,
+        help="file for the JSON results (default: stdout)",
+    )
+    run.add_argument("--quiet", action="store_true", help="don't report progress")
+
+    compare = commands.add_parser("compare", help="compare two result files")
+    compare.add_argument("baseline", type=argparse.FileType("r"))
+    compare.add_argument("current", type=argparse.FileType("r"))
+    compare.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="ratio above which a result is a regression (default: 1.25)",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        lines, regressions = compare_results(
+            json.load(args.baseline), json.load(args.current), args.threshold
+        )
+        print("\n".join(lines))
+        if regressions:
+            print(f"\n{len(regressions)} regressions", file=sys.stderr)
+            return 1
+        return 0
+
+    try:
+        classes = graph_classes(args.graph_class or ["ObjectGraph"])
+    except KeyError as exc:
+        parser.error(f"unknown graph class: {exc.args[0]}")
+
+    document = run_benchmarks(
+        graph_classes=classes,
+        generators=args.generator or list(GENERATORS),
+        sizes=args.sizes,
+        benchmarks=args.benchmark or list(BENCHMARKS),
+        repeat=args.repeat,
+        seed=args.seed,
+        memory=args.memory,
+        progress=None if args.quiet else lambda msg: print(msg, file=sys.stderr),
+    )
+    json.dump(document, args.output, indent=2)
+    args.output.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
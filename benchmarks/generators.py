@@ -0,0 +1,167 @@
+"""
+Seeded generators for synthetic graphs
+
+Every generator is called with the number of edges and a
+:class:`random.Random` instance, and returns a :class:`GraphData`
+with approximately that number of edges. Generators only use the
+random instance, the same seed always results in the same graph.
+"""
+
+import random
+from collections.abc import Callable
+from typing import NamedTuple
+
+
+class Node:
+    """
+    A minimal node with an identifier
+    """
+
+    __slots__ = ("identifier",)
+
+    def __init__(self, identifier: str) -> None:
+        self.identifier = identifier
+
+    def __repr__(self) -> str:
+        return f"<Node {self.identifier!r}>"
+
+
+class GraphData(NamedTuple):
+    """
+    The contents of a generated graph
+
+    Attributes:
+      nodes: All nodes in the graph
+      edges: ``(source, destination, attributes)`` with node identifiers
+      roots: Identifiers of the graph roots
+    """
+
+    nodes: list[Node]
+    edges: list[tuple[str, str, str]]
+    roots: list[str]
+
+
+# Edge attributes used by the generators, modelled after the kinds of
+# imports found by modulegraph.
+EDGE_KINDS = ("toplevel", "conditional", "try-except", "function")
+
+
+def _attribute(rng: random.Random) -> str:
+    return rng.choices(EDGE_KINDS, weights=(70, 10, 10, 10))[0]
+
+
+def random_graph(edge_count: int, rng: random.Random) -> GraphData:
+    """
+    Edges between nodes picked uniformly at random, with on average
+    four outgoing edges per node.
+    """
+    node_count = max(2, edge_count // 4)
+    nodes = [Node(f"n{idx}") for idx in range(node_count)]
+    edges = [
+        (
+            nodes[rng.randrange(node_count)].identifier,
+            nodes[rng.randrange(node_count)].identifier,
+            _attribute(rng),
+        )
+        for _ in range(edge_count)
+    ]
+    roots = [node.identifier for node in rng.sample(nodes, min(10, node_count))]
+    return GraphData(nodes, edges, roots)
+
+
+def scale_free_graph(edge_count: int, rng: random.Random) -> GraphData:
+    """
+    Preferential attachment: every new node has edges to four existing
+    nodes, picked with a probability proportional to their degree. This
+    results in a small number of nodes with a very large in-degree.
+    """
+    per_node = 4
+    node_count = max(per_node + 1, edge_count // per_node + 1)
+    nodes = [Node(f"n{idx}") for idx in range(node_count)]
+
+    # Every node appears in *targets* once per incident edge, plus once
+    # for itself to give new nodes a chance of being picked.
+    targets = [node.identifier for node in nodes[:per_node]]
+    edges: list[tuple[str, str, str]] = []
+    for node in nodes[per_node:]:
+        picked = dict.fromkeys(rng.choice(targets) for _ in range(per_node))
+        for target in picked:
+            edges.append((node.identifier, target, _attribute(rng)))
+            targets.append(target)
+        targets.append(node.identifier)
+
+    return GraphData(nodes, edges, [nodes[-1].identifier])
+
+
+def deep_chain_graph(edge_count: int, rng: random.Random) -> GraphData:
+    """
+    A single path through all nodes, the worst case for recursive
+    algorithms.
+    """
+    nodes = [Node(f"n{idx}") for idx in range(edge_count + 1)]
+    edges = [
+        (nodes[idx].identifier, nodes[idx + 1].identifier, _attribute(rng))
+        for idx in range(edge_count)
+    ]
+    return GraphData(nodes, edges, [nodes[0].identifier])
+
+
+def wide_fan_out_graph(edge_count: int, rng: random.Random) -> GraphData:
+    """
+    A root with an edge to all other nodes.
+    """
+    nodes = [Node(f"n{idx}") for idx in range(edge_count + 1)]
+    root = nodes[0].identifier
+    edges = [(root, node.identifier, _attribute(rng)) for node in nodes[1:]]
+    return GraphData(nodes, edges, [root])
+
+
+def module_graph(edge_count: int, rng: random.Random) -> GraphData:
+    """
+    A graph that resembles the import graph of an application: modules
+    in packages, where most imports refer to modules in lower layers
+    with a preference for a small set of popular modules, and some
+    imports introduce cycles.
+    """
+    module_count = max(2, edge_count // 8)
+    package_size = 20
+    nodes = [
+        Node(f"pkg{idx // package_size}.mod{idx % package_size}")
+        for idx in range(module_count)
+    ]
+    popular = nodes[: max(1, module_count // 100)]
+
+    edges: list[tuple[str, str, str]] = []
+    while len(edges) < edge_count:
+        index = rng.randrange(1, module_count)
+        source = nodes[index].identifier
+        choice = rng.random()
+        if choice < 0.3:
+            target = rng.choice(popular)
+        elif choice < 0.95:
+            target = nodes[rng.randrange(index)]
+        else:
+            target = nodes[rng.randrange(module_count)]
+        edges.append((source, target.identifier, _attribute(rng)))
+
+    return GraphData(nodes, edges, [nodes[-1].identifier])
+
+
+GENERATORS: dict[str, Callable[[int, random.Random], GraphData]] = {
+    "random": random_graph,
+    "scale-free": scale_free_graph,
+    "deep-chain": deep_chain_graph,
+    "wide-fan-out": wide_fan_out_graph,
+    "module": module_graph,
+}
+
+
+def generate(name: str, edge_count: int, seed: int) -> GraphData:
+    """
+    Return the graph created by generator *name* with
+    approximately *edge_count* edges.
+
+    Raises:
+      KeyError: If *name* is not a known generator
+    """
+    return GENERATORS[name](edge_count, random.Random(f"{name}-{edge_count}-{seed}"))
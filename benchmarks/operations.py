@@ -0,0 +1,379 @@
+"""
+The operations measured by the benchmark suite
+
+Every benchmark is a function that is called with a graph class and
+the generated graph data, and returns a :class:`Operation`. Setting up
+the operation is not measured, benchmarks for operations that modify
+the graph are set up again for every repetition.
+"""
+
+import io
+import random
+from collections.abc import Callable, Iterable
+from typing import Any, NamedTuple
+
+import objectgraph
+
+from .generators import EDGE_KINDS, GraphData
+
+# The number of calls for benchmarks of queries that are about a
+# single node or pair of nodes, such as shortest_path.
+SAMPLE_SIZE = 10
+
+
+class Operation(NamedTuple):
+    """
+    An operation that is ready to be measured
+
+    Attributes:
+      run: Performs the operation
+      calls: The number of calls to the graph API in *run*
+    """
+
+    run: Callable[[], object]
+    calls: int
+
+
+Benchmark = Callable[[type[objectgraph.ObjectGraph], GraphData], Operation]
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    """
+    Register a benchmark function as *name*
+    """
+
+    def register(function: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = function
+        return function
+
+    return register
+
+
+def build_graph(
+    graph_class: type[objectgraph.ObjectGraph], data: GraphData, **kwds: Any
+) -> objectgraph.ObjectGraph:
+    """
+    Return a new graph of *graph_class* with the contents of *data*
+    """
+    graph = graph_class(**kwds)
+    graph.add_nodes(data.nodes)
+    graph.add_edges(data.edges)
+    for root in data.roots:
+        graph.add_root(root)
+    return graph
+
+
+def _sample(data: GraphData, count: int, salt: str) -> list[str]:
+    rng = random.Random(f"{salt}-{len(data.nodes)}-{len(data.edges)}")
+    return [rng.choice(data.nodes).identifier for _ in range(count)]
+
+
+def _consume(iterable: Iterable[object]) -> None:
+    for _ in iterable:
+        pass
+
+
+# Construction
+
+
+@benchmark("add_node")
+def bench_add_node(graph_class, data):
+    graph = graph_class()
+
+    def run():
+        add_node = graph.add_node
+        for node in data.nodes:
+            add_node(node)
+
+    return Operation(run, len(data.nodes))
+
+
+@benchmark("add_nodes")
+def bench_add_nodes(graph_class, data):
+    graph = graph_class()
+    return Operation(lambda: graph.add_nodes(data.nodes), 1)
+
+
+@benchmark("add_edge")
+def bench_add_edge(graph_class, data):
+    graph = graph_class()
+    graph.add_nodes(data.nodes)
+
+    def run():
+        add_edge = graph.add_edge
+        for source, destination, attributes in data.edges:
+            add_edge(source, destination, attributes)
+
+    return Operation(run, len(data.edges))
+
+
+@benchmark("add_edges")
+def bench_add_edges(graph_class, data):
+    graph = graph_class()
+    graph.add_nodes(data.nodes)
+    return Operation(lambda: graph.add_edges(data.edges), 1)
+
+
+@benchmark("from_edges")
+def bench_from_edges(graph_class, data):
+    nodes = {node.identifier: node for node in data.nodes}
+    edges = [
+        (nodes[source], nodes[destination], attributes)
+        for source, destination, attributes in data.edges
+    ]
+    return Operation(
+        lambda: graph_class.from_edges(edges, nodes=data.nodes, roots=data.roots), 1
+    )
+
+
+# Queries
+
+
+@benchmark("find_node")
+def bench_find_node(graph_class, data):
+    graph = build_graph(graph_class, data)
+    identifiers = [node.identifier for node in data.nodes]
+
+    def run():
+        find_node = graph.find_node
+        for identifier in identifiers:
+            find_node(identifier)
+
+    return Operation(run, len(identifiers))
+
+
+@benchmark("edge_data")
+def bench_edge_data(graph_class, data):
+    graph = build_graph(graph_class, data)
+
+    def run():
+        edge_data = graph.edge_data
+        for source, destination, _ in data.edges:
+            edge_data(source, destination)
+
+    return Operation(run, len(data.edges))
+
+
+@benchmark("outgoing")
+def bench_outgoing(graph_class, data):
+    graph = build_graph(graph_class, data)
+
+    def run():
+        outgoing = graph.outgoing
+        for node in data.nodes:
+            _consume(outgoing(node))
+
+    return Operation(run, len(data.nodes))
+
+
+@benchmark("incoming")
+def bench_incoming(graph_class, data):
+    graph = build_graph(graph_class, data)
+
+    def run():
+        incoming = graph.incoming
+        for node in data.nodes:
+            _consume(incoming(node))
+
+    return Operation(run, len(data.nodes))
+
+
+@benchmark("edges")
+def bench_edges(graph_class, data):
+    graph = build_graph(graph_class, data)
+    return Operation(lambda: _consume(graph.edges()), 1)
+
+
+@benchmark("edges_with_attribute")
+def bench_edges_with_attribute(graph_class, data):
+    graph = build_graph(graph_class, data)
+    return Operation(
+        lambda: [_consume(graph.edges_with_attribute(kind)) for kind in EDGE_KINDS],
+        len(EDGE_KINDS),
+    )
+
+
+@benchmark("edges_with_attribute-indexed")
+def bench_edges_with_attribute_indexed(graph_class, data):
+    graph = build_graph(graph_class, data, attribute_index=True)
+    return Operation(
+        lambda: [_consume(graph.edges_with_attribute(kind)) for kind in EDGE_KINDS],
+        len(EDGE_KINDS),
+    )
+
+
+@benchmark("iter_graph")
+def bench_iter_graph(graph_class, data):
+    graph = build_graph(graph_class, data)
+    return Operation(lambda: _consume(graph.iter_graph()), 1)
+
+
+@benchmark("iter_graph-bfs")
+def bench_iter_graph_bfs(graph_class, data):
+    graph = build_graph(graph_class, data)
+    return Operation(lambda: _consume(graph.iter_graph(order="bfs")), 1)
+
+
+@benchmark("iter_graph-filtered")
+def bench_iter_graph_filtered(graph_class, data):
+    graph = build_graph(graph_class, data)
+    return Operation(
+        lambda: _consume(
+            graph.iter_graph(edge_filter=lambda attributes: "toplevel" in attributes)
+        ),
+        1,
+    )
+
+
+@benchmark("reachable_from")
+def bench_reachable_from(graph_class, data):
+    graph = build_graph(graph_class, data)
+    sources = _sample(data, SAMPLE_SIZE, "reachable_from")
+
+    def run():
+        for source in sources:
+            _consume(graph.reachable_from(source))
+
+    return Operation(run, len(sources))
+
+
+@benchmark("is_reachable")
+def bench_is_reachable(graph_class, data):
+    graph = build_graph(graph_class, data, reachability_cache_size=0)
+    pairs = list(
+        zip(
+            _sample(data, SAMPLE_SIZE, "is_reachable-source"),
+            _sample(data, SAMPLE_SIZE, "is_reachable-destination"),
+        )
+    )
+
+    def run():
+        for source, destination in pairs:
+            graph.is_reachable(source, destination)
+
+    return Operation(run, len(pairs))
+
+
+@benchmark("shortest_path")
+def bench_shortest_path(graph_class, data):
+    graph = build_graph(graph_class, data)
+    pairs = list(
+        zip(
+            _sample(data, SAMPLE_SIZE, "shortest_path-source"),
+            _sample(data, SAMPLE_SIZE, "shortest_path-destination"),
+        )
+    )
+
+    def run():
+        for source, destination in pairs:
+            graph.shortest_path(source, destination)
+
+    return Operation(run, len(pairs))
+
+
+@benchmark("why")
+def bench_why(graph_class, data):
+    graph = build_graph(graph_class, data)
+    nodes = _sample(data, SAMPLE_SIZE, "why")
+
+    def run():
+        for node in nodes:
+            graph.why(node)
+
+    return Operation(run, len(nodes))
+
+
+# Algorithms
+
+
+@benchmark("strongly_connected_components")
+def bench_strongly_connected_components(graph_class, data):
+    graph = build_graph(graph_class, data)
+    return Operation(lambda: _consume(graph.strongly_connected_components()), 1)
+
+
+@benchmark("topological_order")
+def bench_topological_order(graph_class, data):
+    graph = build_graph(graph_class, data)
+
+    def run():
+        try:
+            graph.topological_order()
+        except objectgraph.CycleError:
+            pass
+
+    return Operation(run, 1)
+
+
+@benchmark("induced_subgraph")
+def bench_induced_subgraph(graph_class, data):
+    graph = build_graph(graph_class, data)
+    nodes = [node.identifier for node in data.nodes[::2]]
+    return Operation(lambda: graph.induced_subgraph(nodes), 1)
+
+
+@benchmark("diff")
+def bench_diff(graph_class, data):
+    graph = build_graph(graph_class, data)
+    other = build_graph(graph_class, data._replace(edges=data.edges[::2]))
+    return Operation(lambda: graph.diff(other), 1)
+
+
+# Removal
+
+
+@benchmark("remove_edge")
+def bench_remove_edge(graph_class, data):
+    graph = build_graph(graph_class, data)
+    edges = list(dict.fromkeys(data.edges))
+
+    def run():
+        remove_edge = graph.remove_edge
+        for source, destination, attributes in edges:
+            remove_edge(source, destination, attributes)
+
+    return Operation(run, len(edges))
+
+
+@benchmark("remove_node")
+def bench_remove_node(graph_class, data):
+    graph = build_graph(graph_class, data)
+
+    def run():
+        remove_node = graph.remove_node
+        for node in data.nodes:
+            remove_node(node)
+
+    return Operation(run, len(data.nodes))
+
+
+@benchmark("remove_nodes")
+def bench_remove_nodes(graph_class, data):
+    graph = build_graph(graph_class, data)
+    nodes = data.nodes[::2]
+    return Operation(lambda: graph.remove_nodes(nodes), 1)
+
+
+# Conversion
+
+
+@benchmark("freeze")
+def bench_freeze(graph_class, data):
+    graph = build_graph(graph_class, data)
+    return Operation(graph.freeze, 1)
+
+
+@benchmark("dump")
+def bench_dump(graph_class, data):
+    graph = build_graph(graph_class, data)
+    return Operation(lambda: graph.dump(io.BytesIO()), 1)
+
+
+@benchmark("load")
+def bench_load(graph_class, data):
+    stream = io.BytesIO()
+    build_graph(graph_class, data).dump(stream)
+    serialized = stream.getvalue()
+    return Operation(lambda: graph_class.load(io.BytesIO(serialized)), 1)
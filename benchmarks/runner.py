@@ -0,0 +1,215 @@
+"""
+Running benchmarks and comparing results
+
+Results are stored as a JSON document::
+
+    {
+      "metadata": {...},
+      "results": [
+        {
+          "graph_class": "ObjectGraph",
+          "generator": "random",
+          "size": 1000,
+          "benchmark": "outgoing",
+          "nodes": 250,
+          "edges": 1000,
+          "calls": 250,
+          "seconds": 0.00012,
+          "peak_memory": 1024
+        },
+        ...
+      ]
+    }
+
+"seconds" is the fastest of all repetitions, "peak_memory" is the
+peak size in bytes of memory allocated during one run of the operation
+as measured by :mod:`tracemalloc`, or :data:`null` when memory is not
+measured.
+"""
+
+import datetime
+import functools
+import gc
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+import objectgraph
+
+from .generators import generate
+from .operations import BENCHMARKS, Operation
+
+ResultKey = tuple[str, str, int, str]
+
+
+def _measure_time(setup: Callable[[], Operation], repeat: int) -> tuple[float, int]:
+    """
+    Return the fastest time of *repeat* runs, and the number of calls
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        operation = setup()
+        gc.collect()
+        start = time.perf_counter()
+        operation.run()
+        best = min(best, time.perf_counter() - start)
+    return best, operation.calls
+
+
+def _measure_memory(setup: Callable[[], Operation]) -> int:
+    """
+    Return the peak size of memory allocated by one run
+    """
+    operation = setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation.run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(
+    *,
+    graph_classes: Sequence[type[objectgraph.ObjectGraph]],
+    generators: Sequence[str],
+    sizes: Sequence[int],
+    benchmarks: Sequence[str],
+    repeat: int,
+    seed: int,
+    memory: bool,
+    progress: Callable[[str], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Run all combinations of the arguments and return a JSON-compatible
+    document with the results.
+
+    Raises:
+      KeyError: If a generator or benchmark is not known
+      ValueError: If *repeat* is less than 1
+    """
+    if repeat < 1:
+        raise ValueError(f"Invalid repeat count: {repeat}")
+
+    results = []
+    for size in sizes:
+        for generator in generators:
+            data = generate(generator, size, seed)
+            for graph_class in graph_classes:
+                for name in benchmarks:
+                    setup = functools.partial(BENCHMARKS[name], graph_class, data)
+
+                    if progress is not None:
+                        progress(f"{graph_class.__name__} {generator} {size} {name}")
+
+                    seconds, calls = _measure_time(setup, repeat)
+                    results.append(
+                        {
+                            "graph_class": graph_class.__name__,
+                            "generator": generator,
+                            "size": size,
+                            "benchmark": name,
+                            "nodes": len(data.nodes),
+                            "edges": len(data.edges),
+                            "calls": calls,
+                            "seconds": seconds,
+                            "peak_memory": _measure_memory(setup) if memory else None,
+                        }
+                    )
+
+    return {
+        "metadata": {
+            "objectgraph": objectgraph.__version__,
+            "python": sys.version,
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _index(document: dict[str, Any]) -> dict[ResultKey, dict[str, Any]]:
+    return {
+        (
+            result["graph_class"],
+            result["generator"],
+            result["size"],
+            result["benchmark"],
+        ): result
+        for result in document["results"]
+    }
+
+
+def compare_results(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> tuple[list[str], list[ResultKey]]:
+    """
+    Compare two result documents for the benchmarks present in both
+
+    Returns:
+      The lines of a report, and the keys of benchmarks that are more
+      than *threshold* times slower, or use more than *threshold* times
+      the memory, in *current*.
+    """
+    old = _index(baseline)
+    new = _index(current)
+
+    lines = [
+        f"{'graph class':<20} {'generator':<13} {'size':>8} {'benchmark':<30} {'time':>7} {'memory':>7}"  # noqa:E501, B950
+    ]
+    regressions: list[ResultKey] = []
+    for key in sorted(old.keys() & new.keys()):
+        time_ratio = new[key]["seconds"] / max(old[key]["seconds"], 1e-9)
+        old_memory = old[key]["peak_memory"]
+        new_memory = new[key]["peak_memory"]
+        memory_ratio: float | None = None
+        if old_memory and new_memory is not None:
+            memory_ratio = new_memory / old_memory
+
+        regressed = time_ratio > threshold or (
+            memory_ratio is not None and memory_ratio > threshold
+        )
+        if regressed:
+            regressions.append(key)
+
+        memory = "-" if memory_ratio is None else f"{memory_ratio:.2f}x"
+        lines.append(
+            f"{key[0]:<20} {key[1]:<13} {key[2]:>8} {key[3]:<30} {time_ratio:>6.2f}x {memory:>7}{' *' if regressed else ''}"  # noqa:E501, B950
+        )
+
+    for key in sorted(old.keys() ^ new.keys()):
+        where = "baseline" if key in old else "current results"
+        lines.append(f"{' '.join(map(str, key))}: only in {where}")
+
+    return lines, regressions
+
+
+def parse_sizes(value: str) -> list[int]:
+    """
+    Parse a comma separated list of sizes, such as "1000,1e4"
+    """
+    return [int(float(item)) for item in value.split(",") if item.strip()]
+
+
+def graph_classes(names: Iterable[str]) -> list[type[objectgraph.ObjectGraph]]:
+    """
+    Return the graph classes in :mod:`objectgraph` with the given names
+
+    Raises:
+      KeyError: If a name is not a subclass of ObjectGraph
+    """
+    result = []
+    for name in names:
+        value = getattr(objectgraph, name, None)
+        if not (isinstance(value, type) and issubclass(value, objectgraph.ObjectGraph)):
+            raise KeyError(name)
+        result.append(value)
+    return result
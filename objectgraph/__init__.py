@@ -10,6 +10,32 @@ where edges with the same source, destination and attributes
 are collapsed into one edge.
 """
 
-__all__ = ("ObjectGraph", "NODE_TYPE", "EDGE_TYPE")
+__all__ = (
+    "ObjectGraph",
+    "CompactObjectGraph",
+    "Component",
+    "ConcurrentObjectGraph",
+    "CycleError",
+    "FrozenObjectGraph",
+    "GraphDiff",
+    "GraphEvent",
+    "GraphSnapshot",
+    "NodeCodec",
+    "OperationStats",
+    "PickleNodeCodec",
+    "SubgraphView",
+    "NODE_TYPE",
+    "EDGE_TYPE",
+)
 __version__ = "1.0.6"
+from ._algorithms import Component, CycleError
+from ._compact import CompactObjectGraph
+from ._concurrent import ConcurrentObjectGraph
+from ._diff import GraphDiff
+from ._events import GraphEvent
+from ._frozen import FrozenObjectGraph
+from ._instrument import OperationStats
 from ._objectgraph import EDGE_TYPE, NODE_TYPE, ObjectGraph
+from ._serialize import NodeCodec, PickleNodeCodec
+from ._snapshot import GraphSnapshot
+from ._view import SubgraphView
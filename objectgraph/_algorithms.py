@@ -0,0 +1,261 @@
+"""
+Graph algorithms
+
+Like the traversal functions these work on node keys and a function
+that returns the successors for a key.
+"""
+
+import collections
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from typing import Generic, TypeVar
+
+from ._types import NODE_TYPE
+
+KEY = TypeVar("KEY", bound=Hashable)
+
+
+class Component(Generic[NODE_TYPE]):
+    """
+    A strongly connected component of a graph, used as the node
+    type of the graph returned by :meth:`ObjectGraph.condensation`.
+
+    The identifier of a component is the smallest identifier of
+    the nodes in the component.
+
+    Attributes:
+      identifier: The identifier of the component
+      nodes: The nodes in the component
+    """
+
+    __slots__ = ("identifier", "nodes")
+
+    def __init__(self, nodes: Sequence[NODE_TYPE]) -> None:
+        self.nodes: tuple[NODE_TYPE, ...] = tuple(nodes)
+        self.identifier: str = min(node.identifier for node in self.nodes)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.identifier!r} with {len(self.nodes)} nodes>"  # noqa:E501, B950
+
+
+def strongly_connected_components(
+    keys: Iterable[KEY], successors: Callable[[KEY], Iterable[KEY]]
+) -> Iterator[list[KEY]]:
+    """
+    Yield the strongly connected components of the graph in reverse
+    topological order: a component is yielded after all components
+    reachable from it.
+
+    This is an iterative version of Tarjan's algorithm.
+    """
+    index: dict[KEY, int] = {}
+    lowlink: dict[KEY, int] = {}
+    on_stack: set[KEY] = set()
+    stack: list[KEY] = []
+
+    for start in keys:
+        if start in index:
+            continue
+
+        index[start] = lowlink[start] = len(index)
+        stack.append(start)
+        on_stack.add(start)
+
+        # The work stack contains the current DFS path, with an iterator
+        # for the successors of each node that still need to be visited.
+        work = [(start, iter(successors(start)))]
+        while work:
+            current, pending = work[-1]
+            for successor in pending:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(successors(successor))))
+                    break
+
+                elif successor in on_stack:
+                    if index[successor] < lowlink[current]:
+                        lowlink[current] = index[successor]
+
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[current] < lowlink[parent]:
+                        lowlink[parent] = lowlink[current]
+
+                if lowlink[current] == index[current]:
+                    component = []
+                    while True:
+                        key = stack.pop()
+                        on_stack.remove(key)
+                        component.append(key)
+                        if key == current:
+                            break
+                    yield component
+
+
+class CycleError(ValueError):
+    """
+    Raised by :meth:`ObjectGraph.topological_order` and
+    :meth:`ObjectGraph.levels` when the graph contains a cycle.
+
+    The second item of *args* is a list of nodes that form a cycle,
+    each node has an edge to the next one and the first and last
+    node in the list are the same.
+    """
+
+
+def topological_levels(
+    keys: Iterable[KEY], successors: Callable[[KEY], Iterable[KEY]]
+) -> Iterator[list[KEY]]:
+    """
+    Yield lists of keys such that every key is yielded after
+    all keys with an edge to it (Kahn's algorithm).
+
+    Raises:
+      CycleError: After yielding all keys that are not part of or
+                  reachable from a cycle. The exception contains
+                  a list of keys.
+    """
+    in_degree = dict.fromkeys(keys, 0)
+    for key in in_degree:
+        for successor in successors(key):
+            in_degree[successor] += 1
+
+    level = [key for key, count in in_degree.items() if count == 0]
+    seen = 0
+    while level:
+        yield level
+        seen += len(level)
+
+        next_level = []
+        for key in level:
+            for successor in successors(key):
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    next_level.append(successor)
+        level = next_level
+
+    if seen != len(in_degree):
+        remaining = {key for key, count in in_degree.items() if count > 0}
+        raise CycleError("Graph contains a cycle", find_cycle(remaining, successors))
+
+
+def find_cycle(keys: set[KEY], successors: Callable[[KEY], Iterable[KEY]]) -> list[KEY]:
+    """
+    Return a cycle in the subgraph induced by *keys*, which
+    must contain at least one cycle.
+    """
+
+    def inner_successors(key: KEY) -> Iterator[KEY]:
+        return (successor for successor in successors(key) if successor in keys)
+
+    for component in strongly_connected_components(keys, inner_successors):
+        members = set(component)
+        start = component[0]
+        if len(component) == 1 and start not in set(inner_successors(start)):
+            continue
+
+        # Every node in a strongly connected component has a successor in
+        # that component, follow those until a node is visited twice.
+        path: list[KEY] = []
+        position: dict[KEY, int] = {}
+        current = start
+        while current not in position:
+            position[current] = len(path)
+            path.append(current)
+            current = next(
+                successor
+                for successor in inner_successors(current)
+                if successor in members
+            )
+
+        del path[: position[current]]
+        path.append(current)
+        return path
+
+    raise ValueError("No cycle found")  # pragma: nocover
+
+
+def bfs_path(
+    start: KEY, targets: set[KEY], successors: Callable[[KEY], Iterable[KEY]]
+) -> list[KEY] | None:
+    """
+    Return the shortest path from *start* to one of *targets*, as a list
+    of keys starting with *start*, or :data:`None` if there is no path.
+
+    The search stops as soon as a target is found.
+    """
+    if start in targets:
+        return [start]
+
+    parents: dict[KEY, KEY] = {start: start}
+    queue = collections.deque([start])
+    while queue:
+        current = queue.popleft()
+        for successor in successors(current):
+            if successor in parents:
+                continue
+
+            parents[successor] = current
+            if successor in targets:
+                path = [successor]
+                while successor != start:
+                    successor = parents[successor]
+                    path.append(successor)
+                path.reverse()
+                return path
+
+            queue.append(successor)
+
+    return None
+
+
+def bfs_all_paths(
+    start: KEY, target: KEY, successors: Callable[[KEY], Iterable[KEY]]
+) -> Iterator[list[KEY]]:
+    """
+    Yield all shortest paths from *start* to *target*
+
+    The search processes the graph one level at a time, and stops
+    after the level that contains *target*.
+    """
+    if start == target:
+        yield [start]
+        return
+
+    # Node -> distance from start, and all predecessors
+    # on a shortest path from start.
+    distance: dict[KEY, int] = {start: 0}
+    parents: dict[KEY, list[KEY]] = {start: []}
+    level = [start]
+    depth = 0
+    while level and target not in parents:
+        depth += 1
+        next_level: list[KEY] = []
+        for current in level:
+            for successor in successors(current):
+                if successor not in distance:
+                    distance[successor] = depth
+                    parents[successor] = [current]
+                    next_level.append(successor)
+                elif distance[successor] == depth:
+                    parents[successor].append(current)
+        level = next_level
+
+    if target not in parents:
+        return
+
+    # Walk back from the target, the stack contains partial
+    # paths in reverse order.
+    stack = [[target]]
+    while stack:
+        path = stack.pop()
+        last = path[-1]
+        if last == start:
+            yield path[::-1]
+            continue
+
+        for parent in reversed(parents[last]):
+            stack.append(path + [parent])
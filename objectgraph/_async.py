@@ -0,0 +1,86 @@
+"""
+Building and traversing graphs with asyncio
+
+The functions in this module use the public API of the graph to
+make them work with all graph classes, including
+:class:`ConcurrentObjectGraph`.
+"""
+
+import asyncio
+import collections
+from collections.abc import AsyncIterator, Iterable
+from typing import TYPE_CHECKING
+
+from ._types import EDGE_TYPE, NODE_TYPE, AsyncExpander
+
+if TYPE_CHECKING:  # pragma: nocover
+    from ._objectgraph import ObjectGraph
+
+
+async def expand_graph(
+    graph: "ObjectGraph[NODE_TYPE, EDGE_TYPE]",
+    start_nodes: Iterable[NODE_TYPE],
+    expand: AsyncExpander[NODE_TYPE, EDGE_TYPE],
+    concurrency: int,
+    max_depth: int | None,
+) -> AsyncIterator[NODE_TYPE]:
+    """
+    Yield all nodes reachable from *start_nodes*, which must be part
+    of *graph*, calling *expand* for every node before following its
+    outgoing edges.
+
+    Up to *concurrency* calls of *expand* run at the same time. Nodes
+    are yielded when their expansion is done, nodes at *max_depth* are
+    yielded without expanding them.
+
+    Raises:
+      ValueError: If *concurrency* is less than 1
+    """
+    if concurrency < 1:
+        raise ValueError(f"Invalid concurrency limit: {concurrency}")
+
+    visited: set[str] = set()
+    waiting: collections.deque[tuple[NODE_TYPE, int]] = collections.deque()
+    for node in start_nodes:
+        if node.identifier not in visited:
+            visited.add(node.identifier)
+            waiting.append((node, 0))
+
+    running: dict[asyncio.Future, tuple[NODE_TYPE, int]] = {}
+    try:
+        while waiting or running:
+            while waiting and len(running) < concurrency:
+                node, depth = waiting.popleft()
+                if max_depth is not None and depth >= max_depth:
+                    yield node
+                    continue
+
+                running[asyncio.ensure_future(expand(node))] = (node, depth)
+
+            if not running:
+                continue
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node, depth = running.pop(task)
+                # The bulk operations are atomic for ConcurrentObjectGraph,
+                # nodes added by another thread in the meantime are skipped.
+                edges = list(task.result())
+                graph.add_nodes(
+                    (new_node for _, new_node in edges), ignore_existing=True
+                )
+                graph.add_edges(
+                    (node, new_node.identifier, edge_attributes)
+                    for edge_attributes, new_node in edges
+                )
+
+                for _, successor in graph.outgoing(node):
+                    if successor.identifier not in visited:
+                        visited.add(successor.identifier)
+                        waiting.append((successor, depth + 1))
+
+                yield node
+
+    finally:
+        for task in running:
+            task.cancel()
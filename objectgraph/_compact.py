@@ -0,0 +1,458 @@
+"""
+A graph with a compact representation for edges
+"""
+
+import collections
+import itertools
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any
+
+from ._objectgraph import EDGE_TYPE, NODE_TYPE, ObjectGraph
+
+# Type code for the arrays with node indexes, this limits
+# the number of nodes to 2**31.
+_INDEX_TYPE = "i"
+
+# Adjacency lists with more entries than this get a dict that maps
+# a neighbour to its position in the list, looking up an edge for
+# a node with fewer neighbours uses a linear search.
+_HUB_DEGREE = 32
+
+
+def _as_set(value):
+    """
+    Convert an attribute slot to the set of attributes it represents
+    """
+    if isinstance(value, set):
+        return value
+    return {value}
+
+
+def _position(indexes: array, positions: dict[int, int] | None, value: int) -> int:
+    """
+    Return the position of *value* in *indexes*, or -1 if
+    the value is not present.
+    """
+    if positions is not None:
+        return positions.get(value, -1)
+
+    try:
+        return indexes.index(value)
+    except ValueError:
+        return -1
+
+
+def _append(
+    hubs: dict[int, dict[int, int]],
+    node: int,
+    indexes: array,
+    values: list,
+    neighbour: int,
+    value: Any,
+) -> None:
+    """
+    Append *neighbour* with attribute slot *value* to the adjacency
+    list *indexes*/*values* of *node*.
+    """
+    indexes.append(neighbour)
+    values.append(value)
+
+    positions = hubs.get(node)
+    if positions is not None:
+        positions[neighbour] = len(indexes) - 1
+
+    elif len(indexes) > _HUB_DEGREE:
+        hubs[node] = {other: pos for pos, other in enumerate(indexes)}
+
+
+def _extend_hubs(
+    hubs: dict[int, dict[int, int]], lists: list[array], added: Mapping[int, int]
+) -> None:
+    """
+    Update the position indexes in *hubs* after appending *added[node]*
+    entries to the adjacency lists *lists[node]*.
+    """
+    for node, count in added.items():
+        indexes = lists[node]
+        positions = hubs.get(node)
+        if positions is not None:
+            for pos in range(len(indexes) - count, len(indexes)):
+                positions[indexes[pos]] = pos
+
+        elif len(indexes) > _HUB_DEGREE:
+            hubs[node] = {other: pos for pos, other in enumerate(indexes)}
+
+
+def _delete(
+    hubs: dict[int, dict[int, int]],
+    node: int,
+    indexes: array,
+    values: list,
+    pos: int,
+) -> None:
+    """
+    Remove the entry at *pos* from the adjacency list of *node*, by
+    moving the last entry into its place.
+    """
+    last = len(indexes) - 1
+    positions = hubs.get(node)
+    if positions is not None:
+        del positions[indexes[pos]]
+        if pos != last:
+            positions[indexes[last]] = pos
+
+    if pos != last:
+        indexes[pos] = indexes[last]
+        values[pos] = values[last]
+    del indexes[last]
+    del values[last]
+
+
+class CompactObjectGraph(ObjectGraph[NODE_TYPE, EDGE_TYPE]):
+    """
+    An :class:`ObjectGraph` that uses a compact representation for
+    edges, for use with very large graphs.
+
+    Node identifiers are mapped to dense integer indexes and adjacency
+    lists are stored in :class:`array.array` objects. The attributes of
+    an edge are stored as a single value when there is only one
+    attribute, a set is only allocated for edges with multiple attributes.
+
+    The API is the same as that of :class:`ObjectGraph`, with some
+    differences in performance and behaviour:
+
+    * Looking up the edge between two nodes is O(out-degree) of
+      the source node for nodes with few outgoing edges, nodes with
+      many neighbours get an additional index that makes this O(1).
+
+    * Removing an edge changes the order in which the remaining edges
+      of its source and destination are reported.
+
+    * :meth:`edge_data`, :meth:`edges`, :meth:`outgoing` and :meth:`incoming`
+      return a new set for edges with a single attribute, changing that
+      set does not affect the graph.
+    """
+
+    def _init_edge_storage(self) -> None:
+        # Node identifier -> dense index, and the reverse mapping. Indexes
+        # of removed nodes are reused for new nodes.
+        self._index: dict[str, int] = {}
+        self._identifiers: list[str | None] = []
+        self._free_indexes: list[int] = []
+
+        # Per node index: the indexes of successors/predecessors and
+        # a parallel list of attribute slots. An attribute slot is either
+        # a single attribute, or a set of attributes shared between
+        # the successor and predecessor lists. Attributes must be hashable,
+        # and hence can never be a set themselves.
+        self._succ: list[array] = []
+        self._succ_attrs: list[list] = []
+        self._pred: list[array] = []
+        self._pred_attrs: list[list] = []
+
+        # Per node index, only for nodes with many successors/predecessors:
+        # the index of a neighbour -> its position in _succ/_pred.
+        self._succ_hubs: dict[int, dict[int, int]] = {}
+        self._pred_hubs: dict[int, dict[int, int]] = {}
+
+        self._edge_total = 0
+
+    def _register_node(self, node_id: str) -> None:
+        if self._free_indexes:
+            index = self._free_indexes.pop()
+            self._identifiers[index] = node_id
+
+        else:
+            index = len(self._identifiers)
+            self._identifiers.append(node_id)
+            self._succ.append(array(_INDEX_TYPE))
+            self._succ_attrs.append([])
+            self._pred.append(array(_INDEX_TYPE))
+            self._pred_attrs.append([])
+
+        self._index[node_id] = index
+
+    def _insert_edge(
+        self, source_id: str, destination_id: str, edge_attributes: EDGE_TYPE
+    ) -> bool:
+        source = self._index[source_id]
+        destination = self._index[destination_id]
+
+        pos = self._succ_position(source, destination)
+        if pos == -1:
+            self._append_edge(source, destination, edge_attributes)
+            self._edge_total += 1
+            return True
+
+        current = self._succ_attrs[source][pos]
+        if isinstance(current, set):
+            if edge_attributes in current:
+                return False
+            current.add(edge_attributes)
+            return True
+
+        attributes = {current}
+        if edge_attributes in attributes:
+            return False
+
+        attributes.add(edge_attributes)
+        self._set_slot(source, pos, destination, attributes)
+        return True
+
+    def _insert_new_edges(
+        self,
+        sources: Sequence[str],
+        destinations: Sequence[str],
+        attributes: Sequence[set[EDGE_TYPE]],
+    ) -> None:
+        # A single attribute is stored as is, see _init_edge_storage
+        values: list[Any] = list(attributes)
+        for pos, edge_attributes in enumerate(attributes):
+            if len(edge_attributes) == 1:
+                (values[pos],) = edge_attributes
+
+        self._append_slots(
+            list(map(self._index.__getitem__, sources)),
+            list(map(self._index.__getitem__, destinations)),
+            values,
+        )
+
+    def _load_edges(
+        self,
+        node_ids: Sequence[str],
+        triples: Sequence[int],
+        attribute_table: Sequence[tuple[EDGE_TYPE, ...]],
+    ) -> None:
+        # Edges with a single attribute share the value in the table,
+        # a set is only allocated for the other edges.
+        multiple = [len(attributes) != 1 for attributes in attribute_table]
+        slots: list[Any] = [
+            attributes if is_multiple else attributes[0]
+            for attributes, is_multiple in zip(attribute_table, multiple)
+        ]
+
+        attribute_indexes = triples[2::3]
+        values = list(map(slots.__getitem__, attribute_indexes))
+        if any(multiple):
+            for pos in itertools.compress(
+                range(len(values)), map(multiple.__getitem__, attribute_indexes)
+            ):
+                values[pos] = set(values[pos])
+
+        indexes = list(map(self._index.__getitem__, node_ids))
+        self._append_slots(
+            list(map(indexes.__getitem__, triples[::3])),
+            list(map(indexes.__getitem__, triples[1::3])),
+            values,
+        )
+
+    def _append_slots(
+        self, sources: list[int], destinations: list[int], values: list
+    ) -> None:
+        """
+        Add edges between *sources[i]* and *destinations[i]* with attribute
+        slot *values[i]*, the edges are not yet part of the graph.
+        """
+        succ = self._succ
+        succ_attrs = self._succ_attrs
+        pred = self._pred
+        pred_attrs = self._pred_attrs
+        for source, destination, value in zip(sources, destinations, values):
+            succ[source].append(destination)
+            succ_attrs[source].append(value)
+            pred[destination].append(source)
+            pred_attrs[destination].append(value)
+
+        self._edge_total += len(sources)
+
+        # Update the position indexes once per node instead of per edge
+        _extend_hubs(self._succ_hubs, succ, collections.Counter(sources))
+        _extend_hubs(self._pred_hubs, pred, collections.Counter(destinations))
+
+    def _succ_position(self, source: int, destination: int) -> int:
+        """
+        Return the position of *destination* in the successors of
+        *source*, or -1 if there is no such edge.
+        """
+        return _position(self._succ[source], self._succ_hubs.get(source), destination)
+
+    def _pred_position(self, destination: int, source: int) -> int:
+        """
+        Return the position of *source* in the predecessors of
+        *destination*, or -1 if there is no such edge.
+        """
+        return _position(
+            self._pred[destination], self._pred_hubs.get(destination), source
+        )
+
+    def _append_edge(self, source: int, destination: int, value: Any) -> None:
+        """
+        Add an edge that is not yet present in the adjacency lists
+        """
+        _append(
+            self._succ_hubs,
+            source,
+            self._succ[source],
+            self._succ_attrs[source],
+            destination,
+            value,
+        )
+        _append(
+            self._pred_hubs,
+            destination,
+            self._pred[destination],
+            self._pred_attrs[destination],
+            source,
+            value,
+        )
+
+    def _delete_successor(self, source: int, pos: int) -> None:
+        _delete(
+            self._succ_hubs, source, self._succ[source], self._succ_attrs[source], pos
+        )
+
+    def _delete_predecessor(self, destination: int, pos: int) -> None:
+        _delete(
+            self._pred_hubs,
+            destination,
+            self._pred[destination],
+            self._pred_attrs[destination],
+            pos,
+        )
+
+    def _set_slot(self, source: int, pos: int, destination: int, value) -> None:
+        """
+        Replace the attribute slot for an edge, *pos* is the position
+        of *destination* in the successors of *source*.
+        """
+        self._succ_attrs[source][pos] = value
+        self._pred_attrs[destination][self._pred_position(destination, source)] = value
+
+    def _remove_edge_attribute(
+        self, source_id: str, destination_id: str, edge_attributes: EDGE_TYPE
+    ) -> None:
+        source = self._index[source_id]
+        destination = self._index[destination_id]
+
+        pos = self._succ_position(source, destination)
+        if pos == -1:
+            raise KeyError(edge_attributes)
+
+        current = self._succ_attrs[source][pos]
+        if isinstance(current, set):
+            current.remove(edge_attributes)
+
+        elif {current} == {edge_attributes}:
+            # Edges without attributes are kept, the same as in
+            # ObjectGraph.
+            self._set_slot(source, pos, destination, set())
+
+        else:
+            raise KeyError(edge_attributes)
+
+    def _remove_edges(self, source_id: str, destination_id: str) -> None:
+        source = self._index[source_id]
+        destination = self._index[destination_id]
+
+        pos = self._succ_position(source, destination)
+        if pos == -1:
+            raise KeyError((source_id, destination_id))
+
+        self._delete_successor(source, pos)
+        self._delete_predecessor(destination, self._pred_position(destination, source))
+
+        self._edge_total -= 1
+
+    def _discard_nodes(self, node_ids: set[str]) -> None:
+        removed = {self._index[node_id] for node_id in node_ids}
+
+        for index in removed:
+            # Every edge is in exactly one successor list, edges between
+            # two removed nodes are therefore only counted once.
+            self._edge_total -= len(self._succ[index])
+
+            for destination in self._succ[index]:
+                if destination not in removed:
+                    self._delete_predecessor(
+                        destination, self._pred_position(destination, index)
+                    )
+
+            for source in self._pred[index]:
+                if source not in removed:
+                    self._delete_successor(source, self._succ_position(source, index))
+                    self._edge_total -= 1
+
+        for index in removed:
+            del self._index[self._identifiers[index]]  # type: ignore[arg-type]
+            self._identifiers[index] = None
+            self._succ_hubs.pop(index, None)
+            self._pred_hubs.pop(index, None)
+            self._succ[index] = array(_INDEX_TYPE)
+            self._succ_attrs[index] = []
+            self._pred[index] = array(_INDEX_TYPE)
+            self._pred_attrs[index] = []
+            self._free_indexes.append(index)
+
+    def _edge_count(self) -> int:
+        return self._edge_total
+
+    def _edge_items(self) -> Iterator[tuple[str, str, set[EDGE_TYPE]]]:
+        identifiers = self._identifiers
+        for source, source_id in enumerate(identifiers):
+            if source_id is None:
+                continue
+
+            for destination, value in zip(
+                self._succ[source], self._succ_attrs[source], strict=True
+            ):
+                yield source_id, identifiers[destination], _as_set(  # type: ignore
+                    value
+                )
+
+    def _edge_attributes(
+        self, source_id: str, destination_id: str
+    ) -> set[EDGE_TYPE] | None:
+        source = self._index[source_id]
+        pos = self._succ_position(source, self._index[destination_id])
+        if pos == -1:
+            return None
+        return _as_set(self._succ_attrs[source][pos])
+
+    def _successors(self, node_id: str) -> Iterable[tuple[str, set[EDGE_TYPE]]]:
+        index = self._index[node_id]
+        identifiers = self._identifiers
+        return [
+            (identifiers[destination], _as_set(value))  # type: ignore[misc]
+            for destination, value in zip(
+                self._succ[index], self._succ_attrs[index], strict=True
+            )
+        ]
+
+    def _predecessors(self, node_id: str) -> Iterable[tuple[str, set[EDGE_TYPE]]]:
+        index = self._index[node_id]
+        identifiers = self._identifiers
+        return [
+            (identifiers[source], _as_set(value))  # type: ignore[misc]
+            for source, value in zip(
+                self._pred[index], self._pred_attrs[index], strict=True
+            )
+        ]
+
+    def _successor_ids(self, node_id: str) -> Iterable[str]:
+        return map(
+            self._identifiers.__getitem__,  # type: ignore[arg-type]
+            self._succ[self._index[node_id]],
+        )
+
+    def _predecessor_ids(self, node_id: str) -> Iterable[str]:
+        return map(
+            self._identifiers.__getitem__,  # type: ignore[arg-type]
+            self._pred[self._index[node_id]],
+        )
+
+    def _out_degree(self, node_id: str) -> int:
+        return len(self._succ[self._index[node_id]])
+
+    def _in_degree(self, node_id: str) -> int:
+        return len(self._pred[self._index[node_id]])
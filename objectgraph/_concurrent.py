@@ -0,0 +1,349 @@
+"""
+A graph that can be shared between threads
+"""
+
+import functools
+import inspect
+import threading
+import types
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor
+from typing import Any, TypeVar
+
+from ._algorithms import CycleError
+from ._objectgraph import ObjectGraph
+from ._types import EDGE_TYPE, NODE_TYPE, EdgeFilter
+from ._view import SubgraphView
+
+R = TypeVar("R")
+T = TypeVar("T")
+
+
+def _replay(
+    levels: list[list[NODE_TYPE]], error: CycleError | None
+) -> Iterator[list[NODE_TYPE]]:
+    yield from levels
+    if error is not None:
+        raise error
+
+
+def _locked(cls: Any, name: str, function: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Return a method that calls the implementation of *name* in the
+    base classes of *cls* while holding the lock. Iterators are
+    consumed while holding the lock.
+    """
+
+    @functools.wraps(function)
+    def method(self: Any, *args: Any, **kwds: Any) -> Any:
+        with self._lock:
+            result = getattr(super(cls, self), name)(*args, **kwds)
+            if isinstance(result, Iterator):
+                return iter(list(result))
+            return result
+
+    return method
+
+
+def _locked_property(cls: Any, name: str, prop: property) -> property:
+    """
+    Return a property that reads *name* from the base classes
+    of *cls* while holding the lock.
+    """
+
+    def getter(self: Any) -> Any:
+        with self._lock:
+            return getattr(super(cls, self), name)
+
+    return property(getter, doc=prop.__doc__)
+
+
+def _lock_public_api(
+    base: type, unlocked: Iterable[str] = ()
+) -> Callable[[type[T]], type[T]]:
+    """
+    Class decorator that adds a method that holds the lock to the class
+    for every public method of *base* that isn't defined in the class
+    itself or listed in *unlocked*.
+
+    Raises:
+      TypeError: If a coroutine or class method would have to be locked,
+                 those must be defined in the class or listed in *unlocked*.
+    """
+
+    def decorator(cls: type[T]) -> type[T]:
+        for name, value in vars(base).items():
+            is_special = name.startswith("__") and name.endswith("__")
+            if name.startswith("_") and not is_special:
+                continue
+            if name in vars(cls) or name in unlocked:
+                continue
+
+            if isinstance(value, property):
+                setattr(cls, name, _locked_property(cls, name, value))
+
+            elif (
+                isinstance(value, (classmethod, staticmethod))
+                or inspect.iscoroutinefunction(value)
+                or inspect.isasyncgenfunction(value)
+            ):
+                raise TypeError(f"Cannot lock {base.__name__}.{name}")
+
+            elif isinstance(value, types.FunctionType):
+                setattr(cls, name, _locked(cls, name, value))
+
+        return cls
+
+    return decorator
+
+
+@_lock_public_api(SubgraphView)
+class _ConcurrentSubgraphView(SubgraphView[NODE_TYPE, EDGE_TYPE]):
+    """
+    A :class:`SubgraphView` on a :class:`ConcurrentObjectGraph` that
+    holds the lock of the graph, with the same snapshot semantics
+    as the graph itself.
+    """
+
+    def __init__(
+        self,
+        graph: "ConcurrentObjectGraph[NODE_TYPE, EDGE_TYPE]",
+        predicate: Callable[[NODE_TYPE], bool] | None,
+        node_ids: frozenset[str] | None,
+    ) -> None:
+        super().__init__(graph, predicate, node_ids)
+        self._lock = graph._lock
+
+    # Edge attributes are returned as copies
+
+    def edges(self) -> Iterator[tuple[NODE_TYPE, NODE_TYPE, set[EDGE_TYPE]]]:
+        with self._lock:
+            return iter(
+                [
+                    (source, destination, set(attributes))
+                    for source, destination, attributes in super().edges()
+                ]
+            )
+
+    def outgoing(
+        self,
+        source: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[tuple[set[EDGE_TYPE], NODE_TYPE]]:
+        with self._lock:
+            return iter(
+                [
+                    (set(attributes), node)
+                    for attributes, node in super().outgoing(
+                        source, edge_filter=edge_filter
+                    )
+                ]
+            )
+
+    def incoming(
+        self,
+        destination: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[tuple[set[EDGE_TYPE], NODE_TYPE]]:
+        with self._lock:
+            return iter(
+                [
+                    (set(attributes), node)
+                    for attributes, node in super().incoming(
+                        destination, edge_filter=edge_filter
+                    )
+                ]
+            )
+
+
+@_lock_public_api(
+    ObjectGraph,
+    # The coroutines update the graph using the bulk operations and
+    # can't hold the lock while waiting, the class methods create
+    # a new graph.
+    unlocked=("crawl", "async_iter_graph", "from_edges", "load"),
+)
+class ConcurrentObjectGraph(ObjectGraph[NODE_TYPE, EDGE_TYPE]):
+    """
+    An :class:`ObjectGraph` that can be used by multiple threads at
+    the same time, for example to let a number of scanner threads add
+    nodes and edges to one graph on a free-threaded build of Python.
+
+    All operations are protected by a single reentrant lock. The bulk
+    operations (:meth:`add_nodes`, :meth:`add_edges` and :meth:`remove_nodes`)
+    acquire the lock once for all items and are the most efficient way
+    to update the graph from multiple threads.
+
+    Methods that return an iterator take a snapshot while holding
+    the lock, the iterator reflects the state of the graph at the
+    time of the call and is not affected by later changes. Edge
+    attributes are returned as copies of the sets stored in the graph.
+    Views returned by :meth:`subgraph_view` use the same lock and
+    return snapshots as well.
+
+    Subscribers, the expander and the functions passed to the exporters
+    are called while holding the lock. The function passed to
+    :meth:`map_nodes` and the instrumentation sink are called without
+    holding the lock. The graph passed to :meth:`diff` is not locked
+    and should not be modified at the same time.
+
+    The coroutines :meth:`crawl` and :meth:`async_iter_graph` don't
+    hold the lock while waiting, they update the graph using the
+    bulk operations and can run at the same time as other threads.
+
+    This class can be combined with :class:`CompactObjectGraph` by
+    defining a subclass of both, with this class first.
+    """
+
+    # Public methods of ObjectGraph that are not defined below are
+    # added by the class decorator, and hold the lock while calling
+    # the implementation in ObjectGraph.
+
+    def __init__(
+        self,
+        *,
+        reachability_cache_size: int = 128,
+        journal_size: int = 0,
+        attribute_index: bool = False,
+    ) -> None:
+        """
+        Create a new empty graph
+
+        Args:
+          reachability_cache_size: The maximum number of nodes for which
+                 the result of :meth:`reachable_from` is cached, 0 disables
+                 the cache.
+
+          journal_size: The maximum number of events kept in the journal,
+                 see :meth:`events_since`. 0 disables the journal.
+
+          attribute_index: If true maintain an index from edge attributes
+                 to edges, which speeds up :meth:`edges_with_attribute`
+                 at the cost of slower updates.
+        """
+        self._lock = threading.RLock()
+        super().__init__(
+            reachability_cache_size=reachability_cache_size,
+            journal_size=journal_size,
+            attribute_index=attribute_index,
+        )
+
+    # The bulk operations consume their argument before acquiring the lock
+
+    def add_nodes(
+        self, nodes: Iterable[NODE_TYPE], *, ignore_existing: bool = False
+    ) -> int:
+        nodes = list(nodes)
+        with self._lock:
+            return super().add_nodes(nodes, ignore_existing=ignore_existing)
+
+    def add_edges(
+        self,
+        edges: Iterable[tuple[str | NODE_TYPE, str | NODE_TYPE, EDGE_TYPE]],
+    ) -> int:
+        edges = list(edges)
+        with self._lock:
+            return super().add_edges(edges)
+
+    def remove_nodes(self, nodes: Iterable[str | NODE_TYPE]) -> None:
+        nodes = list(nodes)
+        with self._lock:
+            super().remove_nodes(nodes)
+
+    def induced_subgraph(
+        self, nodes: Iterable[str | NODE_TYPE]
+    ) -> ObjectGraph[NODE_TYPE, EDGE_TYPE]:
+        nodes = list(nodes)
+        with self._lock:
+            return super().induced_subgraph(nodes)
+
+    # Edge attributes are returned as copies
+
+    def edges(self) -> Iterator[tuple[NODE_TYPE, NODE_TYPE, set[EDGE_TYPE]]]:
+        with self._lock:
+            return iter(
+                [
+                    (source, destination, set(attributes))
+                    for source, destination, attributes in super().edges()
+                ]
+            )
+
+    def edge_data(
+        self, source: str | NODE_TYPE, destination: str | NODE_TYPE
+    ) -> set[EDGE_TYPE]:
+        with self._lock:
+            return set(super().edge_data(source, destination))
+
+    def outgoing(
+        self,
+        source: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[tuple[set[EDGE_TYPE], NODE_TYPE]]:
+        with self._lock:
+            return iter(
+                [
+                    (set(attributes), node)
+                    for attributes, node in super().outgoing(
+                        source, edge_filter=edge_filter
+                    )
+                ]
+            )
+
+    def incoming(
+        self,
+        destination: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[tuple[set[EDGE_TYPE], NODE_TYPE]]:
+        with self._lock:
+            return iter(
+                [
+                    (set(attributes), node)
+                    for attributes, node in super().incoming(
+                        destination, edge_filter=edge_filter
+                    )
+                ]
+            )
+
+    # Other methods with a different behaviour than the generated ones
+
+    def map_nodes(
+        self,
+        function: Callable[[NODE_TYPE], R],
+        nodes: Iterable[NODE_TYPE] | None = None,
+        *,
+        executor: Executor | None = None,
+        workers: int | None = None,
+    ) -> Iterator[tuple[NODE_TYPE, R]]:
+        # *function* is called without holding the lock
+        if nodes is None:
+            nodes = self.nodes()
+        return super().map_nodes(function, nodes, executor=executor, workers=workers)
+
+    def levels(self, *, reverse: bool = False) -> Iterator[list[NODE_TYPE]]:
+        # A cycle is reported after the levels before it, like ObjectGraph
+        levels: list[list[NODE_TYPE]] = []
+        error = None
+        with self._lock:
+            try:
+                levels.extend(super().levels(reverse=reverse))
+            except CycleError as exc:
+                error = exc
+
+        return _replay(levels, error)
+
+    def subgraph_view(
+        self,
+        predicate: Callable[[NODE_TYPE], bool] | None = None,
+        *,
+        nodes: Iterable[str | NODE_TYPE] | None = None,
+    ) -> SubgraphView[NODE_TYPE, EDGE_TYPE]:
+        node_ids = None
+        if nodes is not None:
+            node_ids = frozenset(
+                node if isinstance(node, str) else node.identifier for node in nodes
+            )
+        return _ConcurrentSubgraphView(self, predicate, node_ids)
@@ -0,0 +1,352 @@
+"""
+Read-only graphs using a compressed sparse row (CSR) representation
+
+Nodes are numbered by sorting their identifiers. The successors of node
+*i* are ``out_targets[out_offsets[i]:out_offsets[i+1]]`` sorted by node
+number, and ``out_attrs`` contains the index of the attribute set for each
+of these edges in the attribute table. The predecessors are stored in the
+same way in ``in_offsets``, ``in_sources`` and ``in_attrs``.
+"""
+
+import bisect
+from array import array
+from collections.abc import Callable, Iterator, Sequence
+from typing import TYPE_CHECKING, Generic, NamedTuple
+
+from ._traversal import TraversalOrder, traverse
+from ._types import EDGE_TYPE, NODE_TYPE, EdgeFilter
+
+if TYPE_CHECKING:  # pragma: nocover
+    from ._objectgraph import ObjectGraph
+
+
+class CSRData(NamedTuple):
+    identifiers: list[str]
+    out_offsets: array
+    out_targets: array
+    out_attrs: array
+    in_offsets: array
+    in_sources: array
+    in_attrs: array
+    roots: array
+    attribute_table: list[frozenset]
+
+
+def build_csr(graph: "ObjectGraph") -> CSRData:
+    """
+    Return the CSR representation of *graph*
+    """
+    identifiers = sorted(graph._nodes)
+    numbering = {identifier: idx for idx, identifier in enumerate(identifiers)}
+
+    attribute_numbering: dict[frozenset, int] = {}
+
+    def attribute_index(attributes: set) -> int:
+        key = frozenset(attributes)
+        try:
+            return attribute_numbering[key]
+        except KeyError:
+            attribute_numbering[key] = result = len(attribute_numbering)
+            return result
+
+    tables = []
+    for neighbours in (graph._successors, graph._predecessors):
+        offsets = array("Q", [0])
+        targets = array("I")
+        attributes = array("I")
+        for identifier in identifiers:
+            edges = sorted(
+                (numbering[other], attribute_index(edge_attributes))
+                for other, edge_attributes in neighbours(identifier)
+            )
+            targets.extend(target for target, _ in edges)
+            attributes.extend(attribute for _, attribute in edges)
+            offsets.append(len(targets))
+        tables.append((offsets, targets, attributes))
+
+    (out_offsets, out_targets, out_attrs), (in_offsets, in_sources, in_attrs) = tables
+    return CSRData(
+        identifiers,
+        out_offsets,
+        out_targets,
+        out_attrs,
+        in_offsets,
+        in_sources,
+        in_attrs,
+        array("I", sorted(numbering[root] for root in graph._roots)),
+        list(attribute_numbering),
+    )
+
+
+class CSRGraph(Generic[NODE_TYPE, EDGE_TYPE]):
+    """
+    Base class for read-only graphs using the CSR representation,
+    implementing the read-only API of :class:`ObjectGraph`.
+
+    Subclasses must set the CSR attributes and implement the
+    methods for mapping between node numbers and nodes.
+    """
+
+    _node_count: int
+    _edge_count: int
+    _out_offsets: Sequence[int]
+    _out_targets: Sequence[int]
+    _out_attrs: Sequence[int]
+    _in_offsets: Sequence[int]
+    _in_sources: Sequence[int]
+    _in_attrs: Sequence[int]
+    _roots: Sequence[int]
+    _attribute_table: list[frozenset]
+
+    def _identifier(self, index: int) -> str:  # pragma: nocover
+        """
+        Return the identifier for node number *index*
+        """
+        raise NotImplementedError
+
+    def _node(self, index: int) -> NODE_TYPE:  # pragma: nocover
+        """
+        Return the node for node number *index*
+        """
+        raise NotImplementedError
+
+    def _index(self, node: str | NODE_TYPE) -> int | None:  # pragma: nocover
+        """
+        Return the node number for a node or node identifier,
+        or :data:`None` if the node is not part of the graph.
+        """
+        raise NotImplementedError
+
+    def _successor_indexes(self, index: int) -> Sequence[int]:
+        start = self._out_offsets[index]
+        end = self._out_offsets[index + 1]
+        return self._out_targets[start:end]
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} with {len(self._roots)} roots, {self._node_count} nodes and {self._edge_count} edges>"  # noqa:E501, B950
+
+    def roots(self) -> Iterator[NODE_TYPE]:
+        """
+        Yield the roots of the graph, sorted by identifier.
+        """
+        return map(self._node, self._roots)
+
+    def nodes(self) -> Iterator[NODE_TYPE]:
+        """
+        Yield all nodes in the graph, sorted by identifier.
+        """
+        return map(self._node, range(self._node_count))
+
+    def edges(self) -> Iterator[tuple[NODE_TYPE, NODE_TYPE, frozenset[EDGE_TYPE]]]:
+        """
+        Yield the source and destination of all edges in the graph with a
+        set of all unique edge attributes for edges between the two nodes.
+        """
+        offsets = self._out_offsets
+        table = self._attribute_table
+        for source in range(self._node_count):
+            low = offsets[source]
+            high = offsets[source + 1]
+            source_node = self._node(source)
+            for destination, attribute in zip(
+                self._out_targets[low:high], self._out_attrs[low:high], strict=True
+            ):
+                yield source_node, self._node(destination), table[attribute]
+
+    def find_node(self, node: str | NODE_TYPE) -> NODE_TYPE | None:
+        """
+        Find a node in the graph. If the argument is a node object
+        this looks for a graph member with the same *identifier*.
+
+        Args:
+          node: A node or node identifier
+
+        Returns:
+          The node found, or :data:`None` when the node is not present
+        """
+        index = self._index(node)
+        if index is None:
+            return None
+        return self._node(index)
+
+    def __contains__(self, node: str | NODE_TYPE) -> bool:
+        """
+        Check if a node is a member of the graph
+
+        Args:
+          node: The node or node identifier to look for
+
+        Returns:
+          True if the node is part of the graph, False otherwise
+        """
+        return self._index(node) is not None
+
+    def edge_data(
+        self, source: str | NODE_TYPE, destination: str | NODE_TYPE
+    ) -> frozenset[EDGE_TYPE]:
+        """
+        Return the all edge attributes for edges between *source* and *destination*.
+
+        Args:
+          source: A node or node identifier
+          destination: A node or node identifier
+
+        Returns:
+          A set of edge attributes for all edges between *source* and *destination*
+
+        Raises:
+          KeyError: If *source* or *destination* aren't member of the graph
+          KeyError: If there is no edge between *source* and *destination*
+        """
+        from_index = self._index(source)
+        to_index = self._index(destination)
+        if from_index is None:
+            raise KeyError(f"Source {source!r} not found")
+        if to_index is None:
+            raise KeyError(f"Destination {destination!r} not found")
+
+        low = self._out_offsets[from_index]
+        high = self._out_offsets[from_index + 1]
+        pos = bisect.bisect_left(self._out_targets, to_index, low, high)
+        if pos == high or self._out_targets[pos] != to_index:
+            raise KeyError(
+                f"There is no edge between {self._identifier(from_index)} and {self._identifier(to_index)}"  # noqa:E501, B950
+            )
+        return self._attribute_table[self._out_attrs[pos]]
+
+    def _filtered_successor_indexes(
+        self, edge_filter: EdgeFilter[EDGE_TYPE] | None
+    ) -> Callable[[int], Sequence[int]]:
+        """
+        Return the successor function for traversals that only
+        follow edges selected by *edge_filter*.
+        """
+        if edge_filter is None:
+            return self._successor_indexes
+
+        def successors(index: int) -> Sequence[int]:
+            low = self._out_offsets[index]
+            high = self._out_offsets[index + 1]
+            table = self._attribute_table
+            return [
+                destination
+                for destination, attribute in zip(
+                    self._out_targets[low:high], self._out_attrs[low:high], strict=True
+                )
+                if edge_filter(table[attribute])
+            ]
+
+        return successors
+
+    def outgoing(
+        self,
+        source: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[tuple[frozenset[EDGE_TYPE], NODE_TYPE]]:
+        """
+        Yield (edge, node) for all outgoing edges
+
+        Args:
+          source: A node or node identifier
+          edge_filter: If not :data:`None` only yield edges for which
+                 this function returns true when called with the set
+                 of edge attributes.
+        """
+        index = self._index(source)
+        if index is None:
+            return
+
+        low = self._out_offsets[index]
+        high = self._out_offsets[index + 1]
+        table = self._attribute_table
+        for destination, attribute in zip(
+            self._out_targets[low:high], self._out_attrs[low:high], strict=True
+        ):
+            attributes = table[attribute]
+            if edge_filter is None or edge_filter(attributes):
+                yield attributes, self._node(destination)
+
+    def incoming(
+        self,
+        destination: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[tuple[frozenset[EDGE_TYPE], NODE_TYPE]]:
+        """
+        Yield (edge, node) for all incoming edges
+
+        Args:
+          destination: A node or node identifier
+          edge_filter: If not :data:`None` only yield edges for which
+                 this function returns true when called with the set
+                 of edge attributes.
+        """
+        index = self._index(destination)
+        if index is None:
+            return
+
+        low = self._in_offsets[index]
+        high = self._in_offsets[index + 1]
+        table = self._attribute_table
+        for source, attribute in zip(
+            self._in_sources[low:high], self._in_attrs[low:high], strict=True
+        ):
+            attributes = table[attribute]
+            if edge_filter is None or edge_filter(attributes):
+                yield attributes, self._node(source)
+
+    def out_degree(self, node: str | NODE_TYPE) -> int:
+        """
+        Return the number of outgoing edges for *node*
+
+        Raises:
+          KeyError: If *node* is not part of the graph
+        """
+        index = self._index(node)
+        if index is None:
+            raise KeyError(f"Node {node!r} not found")
+        return self._out_offsets[index + 1] - self._out_offsets[index]
+
+    def in_degree(self, node: str | NODE_TYPE) -> int:
+        """
+        Return the number of incoming edges for *node*
+
+        Raises:
+          KeyError: If *node* is not part of the graph
+        """
+        index = self._index(node)
+        if index is None:
+            raise KeyError(f"Node {node!r} not found")
+        return self._in_offsets[index + 1] - self._in_offsets[index]
+
+    def iter_graph(
+        self,
+        *,
+        node: str | NODE_TYPE | None = None,
+        order: TraversalOrder = "dfs-pre",
+        max_depth: int | None = None,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[NODE_TYPE]:
+        """
+        Yield all nodes in the graph reachable from *node*
+        or any of the graph roots.
+
+        See :meth:`ObjectGraph.iter_graph` for a description
+        of the arguments.
+        """
+        if node is None:
+            start: Sequence[int] = self._roots
+
+        else:
+            index = self._index(node)
+            if index is None:
+                raise KeyError(f"Start node {node!r} not found")
+            start = [index]
+
+        yield from map(
+            self._node,
+            traverse(
+                start, self._filtered_successor_indexes(edge_filter), order, max_depth
+            ),
+        )
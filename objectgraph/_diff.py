@@ -0,0 +1,176 @@
+"""
+Differences between two graphs
+"""
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Generic
+
+from ._types import EDGE_TYPE, NODE_TYPE
+
+if TYPE_CHECKING:  # pragma: nocover
+    from ._objectgraph import ObjectGraph
+
+EdgeChange = tuple[str, str, frozenset[EDGE_TYPE]]
+
+
+class GraphDiff(Generic[NODE_TYPE, EDGE_TYPE]):
+    """
+    The differences between two graphs, as returned by
+    :meth:`ObjectGraph.diff`. Nodes are referred to by their
+    identifier, except for nodes that must be added to a graph.
+
+    A diff is true when there is at least one difference.
+
+    Attributes:
+      added_nodes: Nodes that are only in the new graph
+      removed_nodes: Identifiers of nodes that are only in the old graph
+      changed_nodes: Nodes in the new graph that replace a node with
+                     the same identifier in the old graph
+      added_roots: Identifiers of roots that are only in the new graph
+      removed_roots: Identifiers of roots that are only in the old graph
+      added_edges: ``(source, destination, attributes)`` for edges
+                   that are only in the new graph
+      removed_edges: ``(source, destination, attributes)`` for edges
+                     that are only in the old graph, including edges
+                     of removed nodes
+      added_edge_attributes: ``(source, destination, attributes)`` with
+                     the attributes that are only in the new graph for
+                     edges that are in both graphs
+      removed_edge_attributes: ``(source, destination, attributes)`` with
+                     the attributes that are only in the old graph for
+                     edges that are in both graphs
+    """
+
+    __slots__ = (
+        "added_nodes",
+        "removed_nodes",
+        "changed_nodes",
+        "added_roots",
+        "removed_roots",
+        "added_edges",
+        "removed_edges",
+        "added_edge_attributes",
+        "removed_edge_attributes",
+    )
+
+    def __init__(
+        self,
+        *,
+        added_nodes: tuple[NODE_TYPE, ...] = (),
+        removed_nodes: tuple[str, ...] = (),
+        changed_nodes: tuple[NODE_TYPE, ...] = (),
+        added_roots: tuple[str, ...] = (),
+        removed_roots: tuple[str, ...] = (),
+        added_edges: tuple[EdgeChange, ...] = (),
+        removed_edges: tuple[EdgeChange, ...] = (),
+        added_edge_attributes: tuple[EdgeChange, ...] = (),
+        removed_edge_attributes: tuple[EdgeChange, ...] = (),
+    ) -> None:
+        self.added_nodes = added_nodes
+        self.removed_nodes = removed_nodes
+        self.changed_nodes = changed_nodes
+        self.added_roots = added_roots
+        self.removed_roots = removed_roots
+        self.added_edges = added_edges
+        self.removed_edges = removed_edges
+        self.added_edge_attributes = added_edge_attributes
+        self.removed_edge_attributes = removed_edge_attributes
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        changes = ", ".join(
+            f"{len(getattr(self, name))} {name.replace('_', ' ')}"
+            for name in self.__slots__
+            if getattr(self, name)
+        )
+        return f"<{type(self).__name__} {changes or 'no changes'}>"
+
+    def affected_nodes(self) -> set[str]:
+        """
+        Return the identifiers of all nodes that are added, removed or
+        changed, or that are the source or destination of an edge that
+        is added, removed or changed.
+        """
+        result = set(self.removed_nodes)
+        result.update(node.identifier for node in self.added_nodes)
+        result.update(node.identifier for node in self.changed_nodes)
+        for edges in (
+            self.added_edges,
+            self.removed_edges,
+            self.added_edge_attributes,
+            self.removed_edge_attributes,
+        ):
+            for source, destination, _ in edges:
+                result.add(source)
+                result.add(destination)
+        return result
+
+
+def diff_graphs(
+    old: "ObjectGraph[NODE_TYPE, EDGE_TYPE]",
+    new: "ObjectGraph[NODE_TYPE, EDGE_TYPE]",
+    node_changed: Callable[[NODE_TYPE, NODE_TYPE], bool] | None,
+) -> GraphDiff[NODE_TYPE, EDGE_TYPE]:
+    """
+    Return the differences between *old* and *new*
+    """
+    old_nodes = old._nodes
+    new_nodes = new._nodes
+
+    changed_nodes: tuple[NODE_TYPE, ...] = ()
+    if node_changed is not None:
+        changed_nodes = tuple(
+            node
+            for identifier, node in new_nodes.items()
+            if identifier in old_nodes and node_changed(old_nodes[identifier], node)
+        )
+
+    added_edges = []
+    added_attributes = []
+    for source, destination, attributes in new._edge_items():
+        if source not in old_nodes or destination not in old_nodes:
+            added_edges.append((source, destination, frozenset(attributes)))
+            continue
+
+        old_attributes = old._edge_attributes(source, destination)
+        if old_attributes is None:
+            added_edges.append((source, destination, frozenset(attributes)))
+        elif not attributes <= old_attributes:
+            added_attributes.append(
+                (source, destination, frozenset(attributes - old_attributes))
+            )
+
+    removed_edges = []
+    removed_attributes = []
+    for source, destination, attributes in old._edge_items():
+        if source not in new_nodes or destination not in new_nodes:
+            removed_edges.append((source, destination, frozenset(attributes)))
+            continue
+
+        new_attributes = new._edge_attributes(source, destination)
+        if new_attributes is None:
+            removed_edges.append((source, destination, frozenset(attributes)))
+        elif not attributes <= new_attributes:
+            removed_attributes.append(
+                (source, destination, frozenset(attributes - new_attributes))
+            )
+
+    return GraphDiff(
+        added_nodes=tuple(
+            node
+            for identifier, node in new_nodes.items()
+            if identifier not in old_nodes
+        ),
+        removed_nodes=tuple(
+            identifier for identifier in old_nodes if identifier not in new_nodes
+        ),
+        changed_nodes=changed_nodes,
+        added_roots=tuple(new._roots - old._roots),
+        removed_roots=tuple(old._roots - new._roots),
+        added_edges=tuple(added_edges),
+        removed_edges=tuple(removed_edges),
+        added_edge_attributes=tuple(added_attributes),
+        removed_edge_attributes=tuple(removed_attributes),
+    )
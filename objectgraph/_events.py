@@ -0,0 +1,48 @@
+"""
+Change notifications for graphs
+"""
+
+from typing import Any, Literal, NamedTuple
+
+EventKind = Literal[
+    "node-added",
+    "node-removed",
+    "node-replaced",
+    "edge-added",
+    "edge-removed",
+    "root-added",
+    "root-removed",
+]
+
+
+class GraphEvent(NamedTuple):
+    """
+    A change to a graph, see :meth:`ObjectGraph.subscribe`.
+
+    Attributes:
+      version: The version of the graph after the change. All events
+               for a single call of a primitive operation, such as
+               :meth:`ObjectGraph.add_edges`, have the same version.
+               :meth:`ObjectGraph.apply` performs a sequence of those
+               operations and its events have increasing versions.
+
+      kind: The kind of change: "node-added", "node-removed",
+            "node-replaced" (see :meth:`ObjectGraph.apply`), "edge-added",
+            "edge-removed", "root-added" or "root-removed".
+
+      source: The identifier of the node, or the source of the edge
+
+      destination: The destination of the edge, :data:`None` for events
+                   that are not about edges.
+
+      attributes: The attributes of the edge that were added or removed.
+                  Removing a node, or all edges between two nodes, results
+                  in a single "edge-removed" event for every pair of nodes.
+                  This is empty for events that are not about edges.
+    """
+
+    version: int
+    kind: EventKind
+    source: str
+    destination: str | None = None
+    attributes: frozenset[Any] = frozenset()
@@ -0,0 +1,211 @@
+"""
+Writing graphs in text formats used by other tools
+
+The writers stream the graph to the file: nodes and edges are
+formatted and written one by one, without building a copy of the
+graph or the output in memory.
+"""
+
+import json
+from collections.abc import Iterator, Mapping
+from collections.abc import Set as AbstractSet
+from typing import IO, TYPE_CHECKING, Any
+from xml.sax.saxutils import escape, quoteattr
+
+from ._traversal import traverse
+from ._types import EdgeFormatter, NodeFormatter
+
+if TYPE_CHECKING:  # pragma: nocover
+    from ._objectgraph import ObjectGraph
+
+GRAPHML_NAMESPACE = "http://graphml.graphdrawing.org/xmlns"
+
+
+_NO_ATTRIBUTES: frozenset[Any] = frozenset()
+
+
+def _items(
+    graph: "ObjectGraph", reachable: bool
+) -> Iterator[tuple[str, str | None, AbstractSet[Any]]]:
+    """
+    Yield ``(node_id, None, frozenset())`` for nodes and ``(source_id,
+    destination_id, attributes)`` for edges in *graph*, only including
+    the part of the graph reachable from the roots if *reachable* is true.
+    """
+    if not reachable:
+        for node_id in graph._nodes:
+            yield node_id, None, _NO_ATTRIBUTES
+        yield from graph._edge_items()
+        return
+
+    # The destination of an edge is always reachable when the
+    # source is, the edges can be written together with the source.
+    for node_id in traverse(list(graph._roots), graph._successor_ids, "dfs-pre", None):
+        yield node_id, None, _NO_ATTRIBUTES
+        for destination_id, attributes in graph._successors(node_id):
+            yield node_id, destination_id, attributes
+
+
+def default_edge_label(
+    source: Any, destination: Any, attributes: AbstractSet[Any]
+) -> Mapping[str, Any]:
+    """
+    The default edge formatter for DOT and GraphML: a label
+    with the edge attributes.
+    """
+    if not attributes:
+        return {}
+    return {"label": ", ".join(sorted(map(str, attributes)))}
+
+
+def default_edge_attributes(
+    source: Any, destination: Any, attributes: AbstractSet[Any]
+) -> Mapping[str, Any]:
+    """
+    The default edge formatter for JSON Lines: the list of
+    edge attributes.
+    """
+    return {"attributes": sorted(attributes, key=repr)}
+
+
+def _no_data(node: Any) -> Mapping[str, Any]:
+    return {}
+
+
+def _dot_quote(value: object) -> str:
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{text}"'
+
+
+def _dot_attributes(data: Mapping[str, Any]) -> str:
+    if not data:
+        return ""
+    items = ", ".join(f"{key}={_dot_quote(value)}" for key, value in data.items())
+    return f" [{items}]"
+
+
+def write_dot(
+    graph: "ObjectGraph",
+    file: IO[str],
+    node_formatter: NodeFormatter | None,
+    edge_formatter: EdgeFormatter | None,
+    reachable: bool,
+) -> None:
+    """
+    Write *graph* to *file* in the DOT language used by Graphviz
+    """
+    nodes = graph._nodes
+    roots = graph._roots
+    node_formatter = node_formatter or _no_data
+    edge_formatter = edge_formatter or default_edge_label
+
+    file.write("digraph G {\n")
+    for source_id, destination_id, attributes in _items(graph, reachable):
+        if destination_id is None:
+            data = node_formatter(nodes[source_id])
+            if source_id in roots and "root" not in data:
+                data = {**data, "root": "true"}
+            file.write(f"  {_dot_quote(source_id)}{_dot_attributes(data)};\n")
+        else:
+            data = edge_formatter(nodes[source_id], nodes[destination_id], attributes)
+            file.write(
+                f"  {_dot_quote(source_id)} -> {_dot_quote(destination_id)}{_dot_attributes(data)};\n"  # noqa:E501, B950
+            )
+    file.write("}\n")
+
+
+def _graphml_data(data: Mapping[str, Any], keys: frozenset[str], kind: str) -> str:
+    for key in data:
+        if key not in keys:
+            raise ValueError(f"Undeclared GraphML {kind} key {key!r}")
+
+    return "".join(
+        f"<data key={quoteattr(f'{kind}-{key}')}>{escape(str(value))}</data>"
+        for key, value in data.items()
+    )
+
+
+def write_graphml(
+    graph: "ObjectGraph",
+    file: IO[str],
+    node_formatter: NodeFormatter | None,
+    edge_formatter: EdgeFormatter | None,
+    reachable: bool,
+    node_keys: frozenset[str],
+    edge_keys: frozenset[str],
+) -> None:
+    """
+    Write *graph* to *file* in the GraphML format
+
+    Raises:
+      ValueError: If a formatter returns a key that is not declared
+    """
+    nodes = graph._nodes
+    roots = graph._roots
+    node_formatter = node_formatter or _no_data
+    edge_formatter = edge_formatter or default_edge_label
+    node_keys = node_keys | {"root"}
+
+    file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    file.write(f'<graphml xmlns="{GRAPHML_NAMESPACE}">\n')
+    for kind, keys in (("node", node_keys), ("edge", edge_keys)):
+        for key in sorted(keys):
+            attr_type = "boolean" if kind == "node" and key == "root" else "string"
+            file.write(
+                f"  <key id={quoteattr(f'{kind}-{key}')} for={quoteattr(kind)} attr.name={quoteattr(key)} attr.type={quoteattr(attr_type)}/>\n"  # noqa:E501, B950
+            )
+    file.write('  <graph edgedefault="directed">\n')
+
+    for source_id, destination_id, attributes in _items(graph, reachable):
+        if destination_id is None:
+            data = node_formatter(nodes[source_id])
+            if source_id in roots and "root" not in data:
+                data = {**data, "root": "true"}
+            file.write(
+                f"    <node id={quoteattr(source_id)}>{_graphml_data(data, node_keys, 'node')}</node>\n"  # noqa:E501, B950
+            )
+        else:
+            data = edge_formatter(nodes[source_id], nodes[destination_id], attributes)
+            file.write(
+                f"    <edge source={quoteattr(source_id)} target={quoteattr(destination_id)}>{_graphml_data(data, edge_keys, 'edge')}</edge>\n"  # noqa:E501, B950
+            )
+
+    file.write("  </graph>\n")
+    file.write("</graphml>\n")
+
+
+def write_jsonl(
+    graph: "ObjectGraph",
+    file: IO[str],
+    node_formatter: NodeFormatter | None,
+    edge_formatter: EdgeFormatter | None,
+    reachable: bool,
+) -> None:
+    """
+    Write *graph* to *file* as JSON Lines, with one JSON object
+    per node or edge.
+    """
+    nodes = graph._nodes
+    roots = graph._roots
+    node_formatter = node_formatter or _no_data
+    edge_formatter = edge_formatter or default_edge_attributes
+    encode = json.JSONEncoder(default=str).encode
+
+    for source_id, destination_id, attributes in _items(graph, reachable):
+        if destination_id is None:
+            record = {
+                **node_formatter(nodes[source_id]),
+                "type": "node",
+                "id": source_id,
+            }
+            if source_id in roots:
+                record["root"] = True
+        else:
+            record = {
+                **edge_formatter(nodes[source_id], nodes[destination_id], attributes),
+                "type": "edge",
+                "source": source_id,
+                "destination": destination_id,
+            }
+        file.write(encode(record))
+        file.write("\n")
@@ -0,0 +1,142 @@
+"""
+An immutable graph
+"""
+
+from array import array
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+from ._csr import CSRGraph, build_csr
+from ._traversal import TraversalOrder, traverse
+from ._types import EDGE_TYPE, NODE_TYPE, EdgeFilter
+
+if TYPE_CHECKING:  # pragma: nocover
+    from ._objectgraph import ObjectGraph
+
+
+class FrozenObjectGraph(CSRGraph[NODE_TYPE, EDGE_TYPE]):
+    """
+    An immutable copy of an :class:`ObjectGraph`, created
+    by :meth:`ObjectGraph.freeze`.
+
+    The graph structure is stored in sorted arrays that are computed
+    once, which makes queries cheaper than on a mutable graph. The set
+    of nodes reachable from the graph roots is precomputed as well.
+
+    This class supports the read-only API of :class:`ObjectGraph`, edge
+    attributes are returned as a :class:`frozenset`. Nodes are iterated
+    in the order of their identifiers.
+
+    Frozen graphs are hashable and can be shared between threads. Two
+    frozen graphs are equal when they have the same node identifiers,
+    roots and edges.
+    """
+
+    # The CSR arrays built by build_csr, these are hashed as bytes
+    _out_offsets: array
+    _out_targets: array
+    _roots: array
+
+    def __init__(self, graph: "ObjectGraph[NODE_TYPE, EDGE_TYPE]") -> None:
+        csr = build_csr(graph)
+        self._identifiers = csr.identifiers
+        self._index_map = {
+            identifier: idx for idx, identifier in enumerate(csr.identifiers)
+        }
+        self._nodes = [graph._nodes[identifier] for identifier in csr.identifiers]
+
+        self._node_count = len(csr.identifiers)
+        self._edge_count = len(csr.out_targets)
+        self._out_offsets = csr.out_offsets
+        self._out_targets = csr.out_targets
+        self._out_attrs = csr.out_attrs
+        self._in_offsets = csr.in_offsets
+        self._in_sources = csr.in_sources
+        self._in_attrs = csr.in_attrs
+        self._roots = csr.roots
+        self._attribute_table = csr.attribute_table
+
+        self._reachable = tuple(
+            traverse(self._roots, self._successor_indexes, "dfs-pre", None)
+        )
+        self._reachable_set = frozenset(self._reachable)
+        self._hash: int | None = None
+
+    def _identifier(self, index: int) -> str:
+        return self._identifiers[index]
+
+    def _node(self, index: int) -> NODE_TYPE:
+        return self._nodes[index]
+
+    def _index(self, node: str | NODE_TYPE) -> int | None:
+        return self._index_map.get(node if isinstance(node, str) else node.identifier)
+
+    def _key(self) -> tuple:
+        return (
+            self._identifiers,
+            self._roots,
+            self._out_offsets,
+            self._out_targets,
+            [self._attribute_table[attribute] for attribute in self._out_attrs],
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FrozenObjectGraph):
+            return NotImplemented
+        return self is other or self._key() == other._key()
+
+    def __hash__(self) -> int:
+        # Computing the hash more than once when called from multiple
+        # threads is harmless.
+        if self._hash is None:
+            self._hash = hash(
+                (
+                    tuple(self._identifiers),
+                    self._roots.tobytes(),
+                    self._out_offsets.tobytes(),
+                    self._out_targets.tobytes(),
+                    tuple(self._attribute_table[idx] for idx in self._out_attrs),
+                )
+            )
+        return self._hash
+
+    def iter_graph(
+        self,
+        *,
+        node: str | NODE_TYPE | None = None,
+        order: TraversalOrder = "dfs-pre",
+        max_depth: int | None = None,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[NODE_TYPE]:
+        """
+        Yield all nodes in the graph reachable from *node*
+        or any of the graph roots.
+
+        See :meth:`ObjectGraph.iter_graph` for a description
+        of the arguments. Iterating from the graph roots in the
+        default order uses a precomputed result.
+        """
+        if (
+            node is None
+            and order == "dfs-pre"
+            and max_depth is None
+            and edge_filter is None
+        ):
+            return map(self._node, self._reachable)
+
+        return super().iter_graph(
+            node=node, order=order, max_depth=max_depth, edge_filter=edge_filter
+        )
+
+    def is_root_reachable(self, node: str | NODE_TYPE) -> bool:
+        """
+        Return True if *node* is reachable from one of the graph roots
+
+        Raises:
+          KeyError: If *node* is not part of the graph
+        """
+        index = self._index(node)
+        if index is None:
+            raise KeyError(f"Node {node!r} not found")
+
+        return index in self._reachable_set
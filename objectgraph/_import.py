@@ -0,0 +1,212 @@
+"""
+Reading graphs from text formats used by other tools
+
+The readers process the input in chunks of rows, and add the nodes
+and edges for a chunk using the bulk APIs of the graph. The input is
+never read in memory as a whole.
+"""
+
+import csv
+import itertools
+import json
+from collections.abc import Callable, Iterable, Iterator
+from typing import IO, TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:  # pragma: nocover
+    from ._objectgraph import ObjectGraph
+
+T = TypeVar("T")
+
+Row = tuple[str, str, Any]
+
+
+def _chunks(rows: Iterable[T], chunk_size: int) -> Iterator[list[T]]:
+    if chunk_size < 1:
+        raise ValueError(f"Invalid chunk size: {chunk_size}")
+
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
+
+
+def _insert_rows(
+    graph: "ObjectGraph", rows: list[Row], node_factory: Callable[[str], Any]
+) -> None:
+    """
+    Add the edges in *rows* to *graph*, creating nodes that are
+    not yet part of the graph using *node_factory*.
+    """
+    nodes = graph._nodes
+    new_nodes: dict[str, None] = {}
+    for source, destination, _ in rows:
+        if source not in nodes:
+            new_nodes[source] = None
+        if destination not in nodes:
+            new_nodes[destination] = None
+
+    graph.add_nodes(map(node_factory, new_nodes))
+    graph.add_edges(rows)
+
+
+def read_edge_list(
+    graph: "ObjectGraph",
+    file: IO[str],
+    node_factory: Callable[[str], Any],
+    delimiter: str | None,
+    chunk_size: int,
+) -> None:
+    """
+    Read edges from *file* in the edge list format: lines with a source,
+    destination and optional edge attribute, separated by *delimiter*.
+    """
+
+    def rows() -> Iterator[Row]:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            fields = line.split(delimiter, 2)
+            if len(fields) < 2:
+                raise ValueError(f"Line {line_number}: expecting at least two fields")
+            yield fields[0], fields[1], fields[2] if len(fields) == 3 else None
+
+    for chunk in _chunks(rows(), chunk_size):
+        _insert_rows(graph, chunk, node_factory)
+
+
+def read_csv(
+    graph: "ObjectGraph",
+    file: IO[str],
+    node_factory: Callable[[str], Any],
+    source: str,
+    destination: str,
+    attribute: str | None,
+    delimiter: str,
+    chunk_size: int,
+) -> None:
+    """
+    Read edges from a CSV file with a header row, using the columns
+    named *source*, *destination* and *attribute*.
+    """
+    reader = csv.reader(file, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    def column(name: str) -> int:
+        try:
+            return header.index(name)
+        except ValueError:
+            raise ValueError(f"Column {name!r} not found") from None
+
+    source_column = column(source)
+    destination_column = column(destination)
+    attribute_column = None if attribute is None else column(attribute)
+
+    def rows() -> Iterator[Row]:
+        for row in reader:
+            if not row:
+                continue
+
+            try:
+                yield (
+                    row[source_column],
+                    row[destination_column],
+                    None if attribute_column is None else row[attribute_column],
+                )
+            except IndexError:
+                raise ValueError(
+                    f"Line {reader.line_num}: expecting {len(header)} fields"
+                ) from None
+
+    for chunk in _chunks(rows(), chunk_size):
+        _insert_rows(graph, chunk, node_factory)
+
+
+def _hashable(value: Any) -> Any:
+    """
+    Convert JSON arrays in *value* to tuples
+    """
+    if isinstance(value, list):
+        return tuple(map(_hashable, value))
+    return value
+
+
+def read_jsonl(
+    graph: "ObjectGraph",
+    file: IO[str],
+    node_factory: Callable[[dict[str, Any]], Any],
+    chunk_size: int,
+) -> None:
+    """
+    Read nodes and edges from JSON Lines in the format
+    written by :func:`objectgraph._export.write_jsonl`.
+    """
+    nodes = graph._nodes
+
+    # Nodes created for edges before the record for the node
+    # was seen, these are replaced when the record is found.
+    implicit: set[str] = set()
+
+    for chunk in _chunks(file, chunk_size):
+        node_records: dict[str, dict[str, Any]] = {}
+        roots: list[str] = []
+        edges: list[Row] = []
+        empty_edges: dict[tuple[str, str], None] = {}
+
+        for line in chunk:
+            if not line.strip():
+                continue
+
+            record = json.loads(line)
+            kind = record.get("type")
+            if kind == "node":
+                node_records[record["id"]] = record
+                if record.get("root"):
+                    roots.append(record["id"])
+
+            elif kind == "edge":
+                attributes = record.get("attributes", ())
+                if attributes:
+                    edges.extend(
+                        (record["source"], record["destination"], _hashable(value))
+                        for value in attributes
+                    )
+                else:
+                    empty_edges[(record["source"], record["destination"])] = None
+
+            else:
+                raise ValueError(f"Invalid record type {kind!r}")
+
+        replaced = [identifier for identifier in node_records if identifier in implicit]
+        implicit.difference_update(replaced)
+        graph._replace_nodes(
+            [node_factory(node_records.pop(identifier)) for identifier in replaced]
+        )
+        graph.add_nodes(map(node_factory, node_records.values()))
+
+        new_nodes: dict[str, None] = {}
+        for source, destination in itertools.chain(
+            [(source, destination) for source, destination, _ in edges], empty_edges
+        ):
+            if source not in nodes:
+                new_nodes[source] = None
+            if destination not in nodes:
+                new_nodes[destination] = None
+
+        graph.add_nodes(
+            node_factory({"type": "node", "id": identifier}) for identifier in new_nodes
+        )
+        implicit.update(new_nodes)
+
+        graph.add_edges(edges)
+        graph._add_empty_edges(
+            [
+                (source, destination)
+                for source, destination in empty_edges
+                if graph._edge_attributes(source, destination) is None
+            ]
+        )
+        for root in roots:
+            graph.add_root(root)
@@ -0,0 +1,272 @@
+"""
+Operation counters for graphs
+
+Instrumentation works by installing wrappers for the public methods
+and the adjacency hooks as attributes of a graph instance, and removing
+them again when instrumentation is disabled. Graphs without
+instrumentation therefore use the plain methods of their class.
+"""
+
+import functools
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+if TYPE_CHECKING:  # pragma: nocover
+    from ._objectgraph import ObjectGraph
+
+
+class OperationStats(NamedTuple):
+    """
+    Counters for an operation on a graph, see
+    :meth:`ObjectGraph.enable_instrumentation`.
+
+    Attributes:
+      calls: The number of calls
+
+      edges_scanned: The number of edges looked at in the
+                     adjacency of nodes, or while iterating
+                     over all edges
+
+      nodes_visited: The number of nodes whose adjacency
+                     was looked at
+
+      seconds: The time spent in the operation, or :data:`None`
+               when timing is disabled
+    """
+
+    calls: int
+    edges_scanned: int
+    nodes_visited: int
+    seconds: float | None
+
+
+StatsSink = Callable[[str, OperationStats], None]
+
+# Public methods that are instrumented
+OPERATIONS = (
+    "add_root",
+    "add_node",
+    "add_nodes",
+    "add_edge",
+    "add_edges",
+    "remove_root",
+    "remove_node",
+    "remove_nodes",
+    "remove_edge",
+    "remove_all_edges",
+    "find_node",
+    "edge_data",
+    "roots",
+    "nodes",
+    "edges",
+    "outgoing",
+    "incoming",
+    "edges_with_attribute",
+    "out_degree",
+    "in_degree",
+    "degree_histogram",
+    "top_k_by_in_degree",
+    "iter_graph",
+    "reachable_from",
+    "is_reachable",
+    "shortest_path",
+    "all_shortest_paths",
+    "why",
+    "strongly_connected_components",
+    "levels",
+    "topological_order",
+    "induced_subgraph",
+    "condensation",
+    "diff",
+    "apply",
+    "freeze",
+    "dump",
+)
+
+# Operations that return an iterator, most of the work for
+# these is done while consuming the iterator.
+ITERATOR_OPERATIONS = frozenset(
+    {
+        "roots",
+        "nodes",
+        "edges",
+        "outgoing",
+        "incoming",
+        "edges_with_attribute",
+        "iter_graph",
+        "reachable_from",
+        "all_shortest_paths",
+        "strongly_connected_components",
+        "levels",
+    }
+)
+
+# Adjacency hooks of the edge storage that are called with
+# a node identifier.
+ADJACENCY_HOOKS = ("_successors", "_predecessors", "_successor_ids", "_predecessor_ids")
+
+
+class _Frame:
+    """
+    Counters for a call of an operation
+    """
+
+    __slots__ = ("edges", "nodes", "seconds", "nested_seconds")
+
+    def __init__(self) -> None:
+        self.edges = 0
+        self.nodes = 0
+        self.seconds = 0.0
+        self.nested_seconds = 0.0
+
+
+class Instrumentation:
+    """
+    Counters for the operations on a graph.
+
+    The counters are exclusive: work done in a nested call of another
+    operation, such as the calls to :meth:`ObjectGraph.find_node` by
+    :meth:`ObjectGraph.add_edge`, is only counted for the nested
+    operation.
+    """
+
+    def __init__(self, timing: bool, sink: StatsSink | None) -> None:
+        self._timing = timing
+        self._sink = sink
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._totals: dict[str, list[Any]] = {}
+
+    def stats(self) -> dict[str, OperationStats]:
+        """
+        Return a snapshot of the counters of all operations
+        that have been called.
+        """
+        with self._lock:
+            return {
+                name: OperationStats(*values) for name, values in self._totals.items()
+            }
+
+    def install(self, graph: "ObjectGraph") -> None:
+        """
+        Install wrappers for the methods of *graph*
+        """
+        for name in OPERATIONS:
+            method = getattr(graph, name)
+            if name in ITERATOR_OPERATIONS:
+                setattr(graph, name, self._wrap_iterator_operation(name, method))
+            else:
+                setattr(graph, name, self._wrap_operation(name, method))
+
+        for name in ADJACENCY_HOOKS:
+            setattr(graph, name, self._wrap_adjacency(getattr(graph, name)))
+        graph.__dict__["_edge_items"] = self._wrap_edge_items(graph._edge_items)
+
+    def uninstall(self, graph: "ObjectGraph") -> None:
+        """
+        Remove the wrappers installed by :meth:`install`
+        """
+        for name in (*OPERATIONS, *ADJACENCY_HOOKS, "_edge_items"):
+            graph.__dict__.pop(name, None)
+
+    def _stack(self) -> list[_Frame]:
+        try:
+            return self._local.stack
+        except AttributeError:
+            stack = self._local.stack = []
+            return stack
+
+    def _step(self, frame: _Frame, function: Callable[[], Any]) -> Any:
+        """
+        Call *function* with *frame* as the active frame
+        """
+        stack = self._stack()
+        stack.append(frame)
+        start = time.perf_counter() if self._timing else 0.0
+        try:
+            return function()
+        finally:
+            stack.pop()
+            if self._timing:
+                elapsed = time.perf_counter() - start
+                frame.seconds += elapsed
+                if stack:
+                    stack[-1].nested_seconds += elapsed
+
+    def _record(self, name: str, frame: _Frame) -> None:
+        seconds = frame.seconds - frame.nested_seconds if self._timing else None
+        with self._lock:
+            totals = self._totals.get(name)
+            if totals is None:
+                self._totals[name] = [1, frame.edges, frame.nodes, seconds]
+            else:
+                totals[0] += 1
+                totals[1] += frame.edges
+                totals[2] += frame.nodes
+                if seconds is not None:
+                    totals[3] += seconds
+
+        if self._sink is not None:
+            self._sink(name, OperationStats(1, frame.edges, frame.nodes, seconds))
+
+    def _wrap_operation(self, name: str, method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(*args: Any, **kwds: Any) -> Any:
+            frame = _Frame()
+            try:
+                return self._step(frame, lambda: method(*args, **kwds))
+            finally:
+                self._record(name, frame)
+
+        return wrapper
+
+    def _wrap_iterator_operation(self, name: str, method: Callable) -> Callable:
+        def consume(frame: _Frame, iterator: Iterator) -> Iterator:
+            try:
+                while True:
+                    try:
+                        item = self._step(frame, iterator.__next__)
+                    except StopIteration:
+                        return
+                    yield item
+
+            finally:
+                self._record(name, frame)
+
+        @functools.wraps(method)
+        def wrapper(*args: Any, **kwds: Any) -> Iterator:
+            frame = _Frame()
+            try:
+                iterator = self._step(frame, lambda: iter(method(*args, **kwds)))
+            except BaseException:
+                self._record(name, frame)
+                raise
+            return consume(frame, iterator)
+
+        return wrapper
+
+    def _wrap_adjacency(self, method: Callable[[str], Iterable]) -> Callable:
+        @functools.wraps(method)
+        def wrapper(node_id: str) -> list:
+            result = list(method(node_id))
+            stack = self._stack()
+            if stack:
+                frame = stack[-1]
+                frame.nodes += 1
+                frame.edges += len(result)
+            return result
+
+        return wrapper
+
+    def _wrap_edge_items(self, method: Callable[[], Iterable]) -> Callable:
+        @functools.wraps(method)
+        def wrapper() -> Iterator:
+            for item in method():
+                stack = self._stack()
+                if stack:
+                    stack[-1].edges += 1
+                yield item
+
+        return wrapper
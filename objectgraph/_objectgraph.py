@@ -4,24 +4,51 @@ A basic graph datastructure
 
 # isort misbehaves here.
 # isort: skip_file
+import collections
+import heapq
 from typing import (
+    IO,
+    Any,
     Generic,
     TypeVar,
-    Protocol,
 )
-from collections.abc import Hashable, Iterator
-
-
-class GraphNode(Protocol):
-    @property
-    def identifier(self) -> str:  # pragma: nocover
-        ...  # pragma: nocover
-
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from concurrent.futures import Executor
+
+from . import _export, _import, _serialize
+from ._async import expand_graph
+from ._algorithms import (
+    Component,
+    CycleError,
+    bfs_all_paths,
+    bfs_path,
+    strongly_connected_components,
+    topological_levels,
+)
+from ._diff import GraphDiff, diff_graphs
+from ._events import EventKind, GraphEvent
+from ._frozen import FrozenObjectGraph
+from ._instrument import Instrumentation, OperationStats, StatsSink
+from ._parallel import parallel_bfs, parallel_map, use_executor
+from ._traversal import TraversalOrder, traverse
+from ._types import (
+    EDGE_TYPE,
+    NODE_TYPE,
+    AsyncExpander,
+    EdgeFilter,
+    EdgeFormatter,
+    Expander,
+    NodeFormatter,
+)
+from ._view import SubgraphView
 
-# The graph is generic for the types of nodes and edges,
-# mostly to make it easier to type-check code using the graph.
-NODE_TYPE = TypeVar("NODE_TYPE", bound=GraphNode)
-EDGE_TYPE = TypeVar("EDGE_TYPE", bound=Hashable)
+R = TypeVar("R")
 
 
 class ObjectGraph(Generic[NODE_TYPE, EDGE_TYPE]):
@@ -45,16 +72,69 @@ class ObjectGraph(Generic[NODE_TYPE, EDGE_TYPE]):
       An arbirary type that is hashable.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        reachability_cache_size: int = 128,
+        journal_size: int = 0,
+        attribute_index: bool = False,
+    ) -> None:
         """
         Create a new empty graph
+
+        Args:
+          reachability_cache_size: The maximum number of nodes for which
+                 the result of :meth:`reachable_from` is cached, 0 disables
+                 the cache.
+
+          journal_size: The maximum number of events kept in the journal,
+                 see :meth:`events_since`. 0 disables the journal.
+
+          attribute_index: If true maintain an index from edge attributes
+                 to edges, which speeds up :meth:`edges_with_attribute`
+                 at the cost of slower updates.
         """
         self._roots: set[str] = set()
         self._nodes: dict[str, NODE_TYPE] = {}
-        self._edges: dict[tuple[str, str], set[EDGE_TYPE]] = {}
+        self._init_edge_storage()
+
+        # Node identifier -> identifiers of all nodes reachable from that
+        # node, in least-recently-used order.
+        self._reachability_cache: collections.OrderedDict[str, frozenset[str]] = (
+            collections.OrderedDict()
+        )
+        self._reachability_cache_size = reachability_cache_size
+
+        # Change notifications. The list of subscribers is replaced instead
+        # of updated in place. The journal is a subscriber, and the version
+        # of the last event dropped from it is kept in _journal_floor.
+        self._version = 0
+        self._subscribers: list[Callable[[GraphEvent], None]] = []
+        self._journal: collections.deque[GraphEvent] | None = None
+        self._journal_floor = 0
+        if journal_size > 0:
+            self._journal = collections.deque(maxlen=journal_size)
+            self._subscribers = [self._append_journal]
+
+        # Edge attribute -> (source, destination) for all edges with that
+        # attribute, maintained by a subscriber like the journal.
+        self._attribute_index: dict[EDGE_TYPE, set[tuple[str, str]]] | None = None
+        if attribute_index:
+            self._attribute_index = {}
+            self._subscribers = [*self._subscribers, self._update_attribute_index]
+
+        # Lazy expansion, see set_expander
+        self._expander: Expander[NODE_TYPE, EDGE_TYPE] | None = None
+        self._expanded: set[str] = set()
+
+        # Operation counters, see enable_instrumentation. Only the counters
+        # are kept when instrumentation is disabled, the instrumentation
+        # itself contains a lock and can't be copied or pickled.
+        self._instrumentation: Instrumentation | None = None
+        self._stats: dict[str, OperationStats] = {}
 
     def __repr__(self) -> str:
-        return f"<{type(self).__name__} with {len(self._roots)} roots, {len(self._nodes)} nodes and {len(self._edges)} edges>"  # noqa:E501, B950
+        return f"<{type(self).__name__} with {len(self._roots)} roots, {len(self._nodes)} nodes and {self._edge_count()} edges>"  # noqa:E501, B950
 
     def roots(self) -> Iterator[NODE_TYPE]:
         """
@@ -73,10 +153,9 @@ class ObjectGraph(Generic[NODE_TYPE, EDGE_TYPE]):
         Yield the source and destination of all edges in the graph with a
         set of all unique edge attributes for edges between the two nodes.
         """
-        for from_id, to_id in self._edges:
-            yield self._nodes[from_id], self._nodes[to_id], self._edges[
-                (from_id, to_id)
-            ]
+        nodes = self._nodes
+        for from_id, to_id, attributes in self._edge_items():
+            yield nodes[from_id], nodes[to_id], attributes
 
     def add_root(self, node: str | NODE_TYPE) -> None:
         """
@@ -92,7 +171,11 @@ class ObjectGraph(Generic[NODE_TYPE, EDGE_TYPE]):
         if value is None:
             raise KeyError("Adding non-existing {node!r} as root")
 
-        self._roots.add(value.identifier)
+        if value.identifier not in self._roots:
+            self._roots.add(value.identifier)
+            self._version += 1
+            if self._subscribers:
+                self._publish([("root-added", value.identifier, None, frozenset())])
 
     def add_node(self, node: NODE_TYPE) -> None:
         """
@@ -105,6 +188,11 @@ class ObjectGraph(Generic[NODE_TYPE, EDGE_TYPE]):
             raise ValueError(f"Already have node with name {node.identifier!r}")
 
         self._nodes[node.identifier] = node
+        self._register_node(node.identifier)
+
+        self._version += 1
+        if self._subscribers:
+            self._publish([("node-added", node.identifier, None, frozenset())])
 
     def add_edge(
         self,
@@ -132,12 +220,194 @@ class ObjectGraph(Generic[NODE_TYPE, EDGE_TYPE]):
         if to_node is None:
             raise KeyError(f"Destination {destination!r} not found")
 
-        key = (from_node.identifier, to_node.identifier)
-        if key in self._edges:
-            self._edges[key].add(edge_attributes)
+        if (
+            self._reachability_cache
+            and self._edge_attributes(from_node.identifier, to_node.identifier) is None
+        ):
+            self._invalidate_reachability({from_node.identifier})
+
+        if self._insert_edge(from_node.identifier, to_node.identifier, edge_attributes):
+            self._version += 1
+            if self._subscribers:
+                self._publish(
+                    [
+                        (
+                            "edge-added",
+                            from_node.identifier,
+                            to_node.identifier,
+                            frozenset((edge_attributes,)),
+                        )
+                    ]
+                )
+
+    def add_nodes(
+        self, nodes: Iterable[NODE_TYPE], *, ignore_existing: bool = False
+    ) -> int:
+        """
+        Add a collection of nodes to the graph
 
-        else:
-            self._edges[key] = {edge_attributes}
+        Args:
+          nodes: The nodes to add
+
+          ignore_existing: If true skip nodes with the same identifier as
+                 a node already in the graph, or as an earlier node in
+                 *nodes*, instead of raising :exc:`ValueError`.
+
+        Returns:
+          The number of nodes added
+
+        Raises:
+          ValueError: If one or more nodes have the same identifier as
+                      a node already in the graph, or as another node in
+                      *nodes*. The graph is not modified in that case.
+        """
+        new_nodes: dict[str, NODE_TYPE] = {}
+        duplicates: list[str] = []
+        for node in nodes:
+            identifier = node.identifier
+            if identifier in self._nodes or identifier in new_nodes:
+                if not ignore_existing:
+                    duplicates.append(identifier)
+            else:
+                new_nodes[identifier] = node
+
+        if duplicates:
+            raise ValueError(f"Already have nodes with names {duplicates!r}")
+
+        self._nodes.update(new_nodes)
+        for identifier in new_nodes:
+            self._register_node(identifier)
+
+        if new_nodes:
+            self._version += 1
+            if self._subscribers:
+                self._publish(
+                    ("node-added", identifier, None, frozenset())
+                    for identifier in new_nodes
+                )
+
+        return len(new_nodes)
+
+    def add_edges(
+        self,
+        edges: Iterable[tuple[str | NODE_TYPE, str | NODE_TYPE, EDGE_TYPE]],
+    ) -> int:
+        """
+        Add a collection of directed edges to the graph. This has the same
+        effect as calling :meth:`add_edge` for every item in *edges*.
+
+        Args:
+          edges: An iterable of *(source, destination, edge_attributes)*
+                 tuples, where *source* and *destination* are nodes or
+                 node identifiers.
+
+        Returns:
+          The number of edges that were not yet part of the graph
+
+        Raises:
+          KeyError: If one or more sources or destinations are not nodes
+                    in the graph. The exception reports all missing nodes,
+                    and the graph is not modified in that case.
+        """
+        nodes = self._nodes
+        batch: list[tuple[str, str, EDGE_TYPE]] = []
+        missing: dict[str, None] = {}
+        for source, destination, edge_attributes in edges:
+            source_id = source if isinstance(source, str) else source.identifier
+            destination_id = (
+                destination if isinstance(destination, str) else destination.identifier
+            )
+            if source_id not in nodes:
+                missing[source_id] = None
+            if destination_id not in nodes:
+                missing[destination_id] = None
+            batch.append((source_id, destination_id, edge_attributes))
+
+        if missing:
+            raise KeyError(f"Nodes {list(missing)!r} not found")
+
+        if self._reachability_cache:
+            self._invalidate_reachability(
+                {
+                    source_id
+                    for source_id, destination_id, _ in batch
+                    if self._edge_attributes(source_id, destination_id) is None
+                }
+            )
+
+        insert = self._insert_edge
+        if not self._subscribers:
+            count = sum(
+                insert(source_id, destination_id, edge_attributes)
+                for source_id, destination_id, edge_attributes in batch
+            )
+            if count:
+                self._version += 1
+            return count
+
+        added: list[tuple[EventKind, str, str | None, frozenset]] = [
+            ("edge-added", source_id, destination_id, frozenset((edge_attributes,)))
+            for source_id, destination_id, edge_attributes in batch
+            if insert(source_id, destination_id, edge_attributes)
+        ]
+        if added:
+            self._version += 1
+            self._publish(added)
+        return len(added)
+
+    @classmethod
+    def from_edges(
+        cls,
+        edges: Iterable[tuple[NODE_TYPE, NODE_TYPE, EDGE_TYPE]],
+        *,
+        nodes: Iterable[NODE_TYPE] = (),
+        roots: Iterable[str | NODE_TYPE] = (),
+    ) -> "ObjectGraph[NODE_TYPE, EDGE_TYPE]":
+        """
+        Create a new graph from a collection of edges.
+
+        Nodes are added to the graph the first time they are seen, later
+        nodes with the same identifier refer to the first one.
+
+        Args:
+          edges: An iterable of *(source, destination, edge_attributes)*
+                 tuples, where *source* and *destination* are nodes.
+
+          nodes: Additional nodes to add to the graph, for example
+                 nodes without edges.
+
+          roots: Nodes or node identifiers that are roots of the graph
+
+        Returns:
+          A new graph
+
+        Raises:
+          KeyError: If one of the *roots* is not a node in the graph
+        """
+        graph = cls()
+        graph_nodes = graph._nodes
+        register = graph._register_node
+        insert = graph._insert_edge
+
+        for node in nodes:
+            identifier = node.identifier
+            if identifier not in graph_nodes:
+                graph_nodes[identifier] = node
+                register(identifier)
+
+        for source, destination, edge_attributes in edges:
+            for node in (source, destination):
+                identifier = node.identifier
+                if identifier not in graph_nodes:
+                    graph_nodes[identifier] = node
+                    register(identifier)
+
+            insert(source.identifier, destination.identifier, edge_attributes)
+
+        for root in roots:
+            graph.add_root(root)
+
+        return graph
 
     def remove_root(self, node: str | NODE_TYPE) -> None:
         """
@@ -150,11 +420,12 @@ class ObjectGraph(Generic[NODE_TYPE, EDGE_TYPE]):
         Raises:
           KeyError: if the node is not a root of the graph
         """
-        if isinstance(node, str):
-            self._roots.remove(node)
+        node_id = node if isinstance(node, str) else node.identifier
+        self._roots.remove(node_id)
 
-        else:
-            self._roots.remove(node.identifier)
+        self._version += 1
+        if self._subscribers:
+            self._publish([("root-removed", node_id, None, frozenset())])
 
     def remove_node(self, node: str | NODE_TYPE) -> None:
         """
@@ -177,18 +448,56 @@ class ObjectGraph(Generic[NODE_TYPE, EDGE_TYPE]):
         if node_id not in self._nodes:
             raise KeyError(node_id)
 
-        if node_id in self._roots:
-            self._roots.remove(node_id)
+        changes = self._removal_changes({node_id}) if self._subscribers else None
 
-        to_remove = []
-        for source, destination in self._edges:
-            if source == node_id or destination == node_id:
-                to_remove.append((source, destination))
+        self._roots.discard(node_id)
+        self._invalidate_reachability({node_id})
+        self._discard_nodes({node_id})
+        self._expanded.discard(node_id)
+        del self._nodes[node_id]
 
-        for item in to_remove:
-            del self._edges[item]
+        self._version += 1
+        if changes is not None:
+            self._publish(changes)
 
-        del self._nodes[node_id]
+    def remove_nodes(self, nodes: Iterable[str | NODE_TYPE]) -> None:
+        """
+        Removes a collection of nodes and related information
+        from the graph.
+
+        This only touches edges incident to the removed nodes, and
+        edges between two removed nodes are only processed once.
+
+        Args:
+          nodes: The nodes or node identifiers to remove
+
+        Raises:
+           KeyError: If one of the nodes is not part of the graph,
+                     the graph is not modified in that case.
+        """
+        node_ids = {
+            node if isinstance(node, str) else node.identifier for node in nodes
+        }
+
+        for node_id in node_ids:
+            if node_id not in self._nodes:
+                raise KeyError(node_id)
+
+        if not node_ids:
+            return
+
+        changes = self._removal_changes(node_ids) if self._subscribers else None
+
+        self._roots.difference_update(node_ids)
+        self._invalidate_reachability(node_ids)
+        self._discard_nodes(node_ids)
+        self._expanded.difference_update(node_ids)
+        for node_id in node_ids:
+            del self._nodes[node_id]
+
+        self._version += 1
+        if changes is not None:
+            self._publish(changes)
 
     def remove_edge(
         self,
@@ -216,16 +525,29 @@ class ObjectGraph(Generic[NODE_TYPE, EDGE_TYPE]):
         if to_node is None:
             raise KeyError("Destination {destination!r} not found")
 
-        key = (from_node.identifier, to_node.identifier)
-
         try:
-            self._edges[key].remove(edge_attributes)
+            self._remove_edge_attribute(
+                from_node.identifier, to_node.identifier, edge_attributes
+            )
 
         except KeyError:
             raise KeyError(
                 f"There is no edge between {from_node.identifier} and {to_node.identifier} with attributes {edge_attributes!r}"  # noqa:E501, B950
             ) from None
 
+        self._version += 1
+        if self._subscribers:
+            self._publish(
+                [
+                    (
+                        "edge-removed",
+                        from_node.identifier,
+                        to_node.identifier,
+                        frozenset((edge_attributes,)),
+                    )
+                ]
+            )
+
     def remove_all_edges(self, source: str | NODE_TYPE, destination: str | NODE_TYPE):
         """
         Remove all edges between *source* and *destination*.
@@ -244,15 +566,147 @@ class ObjectGraph(Generic[NODE_TYPE, EDGE_TYPE]):
         if to_node is None:
             raise KeyError("Destination {destination!r} not found")
 
-        key = (from_node.identifier, to_node.identifier)
-
-        try:
-            del self._edges[key]
-
-        except KeyError:
+        attributes = self._edge_attributes(from_node.identifier, to_node.identifier)
+        if attributes is None:
             raise KeyError(
                 f"There is no edge between {from_node.identifier} and {to_node.identifier}"  # noqa:E501, B950
-            ) from None
+            )
+
+        removed = frozenset(attributes)
+        self._remove_edges(from_node.identifier, to_node.identifier)
+        self._invalidate_reachability({from_node.identifier})
+
+        self._version += 1
+        if self._subscribers:
+            self._publish(
+                [("edge-removed", from_node.identifier, to_node.identifier, removed)]
+            )
+
+    @property
+    def version(self) -> int:
+        """
+        The version of the graph, this is incremented by every operation
+        that changes the graph.
+        """
+        return self._version
+
+    def subscribe(self, callback: Callable[[GraphEvent], None]) -> None:
+        """
+        Call *callback* with a :class:`objectgraph.GraphEvent` for every
+        change to the graph. The callback is called after the change, and
+        must not modify the graph.
+
+        Tracking changes has no measurable cost when there are no
+        subscribers and the journal is disabled.
+
+        Args:
+          callback: The function to call
+        """
+        self._subscribers = [*self._subscribers, callback]
+
+    def unsubscribe(self, callback: Callable[[GraphEvent], None]) -> None:
+        """
+        Stop calling *callback* for changes to the graph
+
+        Raises:
+          ValueError: If *callback* is not subscribed
+        """
+        subscribers = list(self._subscribers)
+        subscribers.remove(callback)
+        self._subscribers = subscribers
+
+    def events_since(self, version: int) -> list[GraphEvent]:
+        """
+        Return the events for all changes after *version* from the
+        journal, oldest first.
+
+        Args:
+          version: A value of :attr:`version`
+
+        Raises:
+          ValueError: If the journal is disabled, or if events after
+                      *version* are no longer in the journal. Consumers
+                      must rescan the graph in that case.
+        """
+        if self._journal is None:
+            raise ValueError("The journal is disabled")
+
+        if version < self._journal_floor:
+            raise ValueError(f"Events after version {version} are no longer available")
+
+        result = []
+        for event in reversed(self._journal):
+            if event.version <= version:
+                break
+            result.append(event)
+        result.reverse()
+        return result
+
+    def _append_journal(self, event: GraphEvent) -> None:
+        journal = self._journal
+        assert journal is not None
+        if len(journal) == journal.maxlen:
+            self._journal_floor = journal[0].version
+        journal.append(event)
+
+    def _update_attribute_index(self, event: GraphEvent) -> None:
+        index = self._attribute_index
+        assert index is not None
+        if event.destination is None:
+            return
+
+        key = (event.source, event.destination)
+        if event.kind == "edge-added":
+            for attribute in event.attributes:
+                index.setdefault(attribute, set()).add(key)
+
+        else:
+            for attribute in event.attributes:
+                edges = index.get(attribute)
+                if edges is not None:
+                    edges.discard(key)
+                    if not edges:
+                        del index[attribute]
+
+    def _publish(
+        self, changes: Iterable[tuple[EventKind, str, str | None, frozenset]]
+    ) -> None:
+        """
+        Notify subscribers of changes for the current version
+        """
+        version = self._version
+        subscribers = self._subscribers
+        for kind, source, destination, attributes in changes:
+            event = GraphEvent(version, kind, source, destination, attributes)
+            for callback in subscribers:
+                callback(event)
+
+    def _removal_changes(
+        self, node_ids: set[str]
+    ) -> list[tuple[EventKind, str, str | None, frozenset]]:
+        """
+        Return the changes for removing the nodes in *node_ids*
+        """
+        changes: list[tuple[EventKind, str, str | None, frozenset]] = [
+            ("root-removed", node_id, None, frozenset())
+            for node_id in node_ids
+            if node_id in self._roots
+        ]
+        for node_id in node_ids:
+            for destination_id, attributes in self._successors(node_id):
+                changes.append(
+                    ("edge-removed", node_id, destination_id, frozenset(attributes))
+                )
+            for source_id, attributes in self._predecessors(node_id):
+                if source_id not in node_ids:
+                    changes.append(
+                        ("edge-removed", source_id, node_id, frozenset(attributes))
+                    )
+
+        changes.extend(
+            ("node-removed", node_id, None, frozenset()) for node_id in node_ids
+        )
+        return changes
 
     def find_node(self, node: str | NODE_TYPE) -> NODE_TYPE | None:
         """
@@ -307,75 +761,1564 @@ class ObjectGraph(Generic[NODE_TYPE, EDGE_TYPE]):
         if to_node is None:
             raise KeyError("Destination {destination!r} not found")
 
-        try:
-            return self._edges[(from_node.identifier, to_node.identifier)]
-        except KeyError:
+        attributes = self._edge_attributes(from_node.identifier, to_node.identifier)
+        if attributes is None:
             raise KeyError(
                 f"There is no edge between {from_node.identifier} and {to_node.identifier}"  # noqa:E501, B950
-            ) from None
+            )
+        return attributes
 
     def outgoing(
-        self, source: str | NODE_TYPE
+        self,
+        source: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
     ) -> Iterator[tuple[set[EDGE_TYPE], NODE_TYPE]]:
         """
         Yield (edge, node) for all outgoing edges
 
+        This expands *source* when an expander is set and the
+        node hasn't been expanded yet, see :meth:`set_expander`.
+
         Args:
           source: A node or node identifier
+          edge_filter: If not :data:`None` only yield edges for which
+                 this function returns true when called with the set
+                 of edge attributes.
         """
         node = self.find_node(source)
         if node is None:
             return
 
-        for from_node, to_node in self._edges:
-            if from_node == node.identifier:
-                yield self._edges[(from_node, to_node)], self._nodes[to_node]
+        if self._expander is not None and node.identifier not in self._expanded:
+            self._expand_node(node.identifier)
+
+        for to_node, attributes in self._successors(node.identifier):
+            if edge_filter is None or edge_filter(attributes):
+                yield attributes, self._nodes[to_node]
 
     def incoming(
-        self, destination: str | NODE_TYPE
+        self,
+        destination: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
     ) -> Iterator[tuple[set[EDGE_TYPE], NODE_TYPE]]:
         """
         Yield (edge, node) for all incoming edges
 
         Args:
           destination: A node or node identifier
+          edge_filter: If not :data:`None` only yield edges for which
+                 this function returns true when called with the set
+                 of edge attributes.
         """
         node = self.find_node(destination)
         if node is None:
             return
 
-        for from_node, to_node in self._edges:
-            if to_node == node.identifier:
-                yield self._edges[(from_node, to_node)], self._nodes[from_node]
+        for from_node, attributes in self._predecessors(node.identifier):
+            if edge_filter is None or edge_filter(attributes):
+                yield attributes, self._nodes[from_node]
+
+    def edges_with_attribute(
+        self, edge_attributes: EDGE_TYPE
+    ) -> Iterator[tuple[NODE_TYPE, NODE_TYPE]]:
+        """
+        Yield the source and destination of all edges with *edge_attributes*
+        in an arbitrary order.
+
+        This uses the attribute index when the graph was created with
+        ``attribute_index=True``, and checks all edges otherwise.
+
+        Args:
+          edge_attributes: The edge attributes to look for
+        """
+        nodes = self._nodes
+        if self._attribute_index is not None:
+            for source_id, destination_id in self._attribute_index.get(
+                edge_attributes, ()
+            ):
+                yield nodes[source_id], nodes[destination_id]
+            return
+
+        for source_id, destination_id, attributes in self._edge_items():
+            if edge_attributes in attributes:
+                yield nodes[source_id], nodes[destination_id]
+
+    def out_degree(self, node: str | NODE_TYPE) -> int:
+        """
+        Return the number of outgoing edges for *node*
+
+        This is O(1) and does not expand *node* when an
+        expander is set.
+
+        Raises:
+          KeyError: If *node* is not part of the graph
+        """
+        value = self.find_node(node)
+        if value is None:
+            raise KeyError(f"Node {node!r} not found")
+        return self._out_degree(value.identifier)
+
+    def in_degree(self, node: str | NODE_TYPE) -> int:
+        """
+        Return the number of incoming edges for *node*
+
+        This is O(1).
+
+        Raises:
+          KeyError: If *node* is not part of the graph
+        """
+        value = self.find_node(node)
+        if value is None:
+            raise KeyError(f"Node {node!r} not found")
+        return self._in_degree(value.identifier)
+
+    def degree_histogram(self, *, incoming: bool = False) -> list[int]:
+        """
+        Return a list where the item at index *n* is the number of
+        nodes with *n* outgoing edges. The list ends at the largest
+        degree in the graph, and is empty for an empty graph.
+
+        Args:
+          incoming: Count incoming edges instead of outgoing edges
+        """
+        degree = self._in_degree if incoming else self._out_degree
+        counts = collections.Counter(map(degree, self._nodes))
+
+        histogram = [0] * (max(counts, default=-1) + 1)
+        for value, count in counts.items():
+            histogram[value] = count
+        return histogram
+
+    def top_k_by_in_degree(self, k: int) -> list[tuple[NODE_TYPE, int]]:
+        """
+        Return up to *k* nodes with the most incoming edges and their
+        in-degree, ordered by decreasing in-degree. The order of nodes
+        with the same in-degree is arbitrary.
+
+        This is O(V log k) for a graph with V nodes.
+
+        Args:
+          k: The number of nodes to return
+        """
+        nodes = self._nodes
+        return [
+            (nodes[node_id], degree)
+            for degree, node_id in heapq.nlargest(
+                k,
+                ((self._in_degree(node_id), node_id) for node_id in nodes),
+                key=lambda item: item[0],
+            )
+        ]
 
     def iter_graph(
-        self, *, node: str | NODE_TYPE | None = None, _visited: set | None = None
+        self,
+        *,
+        node: str | NODE_TYPE | None = None,
+        order: TraversalOrder = "dfs-pre",
+        max_depth: int | None = None,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
     ) -> Iterator[NODE_TYPE]:
         """
         Yield all nodes in the graph reachable from *node*
         or any of the graph roots.
 
+        The traversal uses an explicit stack (or queue) instead of
+        recursion, and can therefore be used with arbitrarily deep graphs.
+
+        Args:
+          node: The node or node identifier used to start iterating. Defaults
+                to using the graph roots.
+
+          order: The traversal order: "dfs-pre" (depth-first, a node is
+                 yielded before its successors), "dfs-post" (depth-first,
+                 a node is yielded after its successors) or "bfs"
+                 (breadth-first).
+
+          max_depth: If not :data:`None` don't follow edges from nodes
+                 at this distance from the start node(s). For the
+                 depth-first orders the distance is measured along
+                 the traversal path, use "bfs" to limit by the shortest
+                 distance.
+
+          edge_filter: If not :data:`None` only follow edges for which
+                 this function returns true when called with the set
+                 of edge attributes.
+
+        Raises:
+          KeyError: If *node* is not part of the graph
+          ValueError: If *order* is not a valid traversal order
+        """
+        if node is None:
+            start_ids: list[str] = list(self._roots)
+
+        else:
+            start_node = self.find_node(node)
+            if start_node is None:
+                raise KeyError(f"Start node {node!r} not found")
+
+            start_ids = [start_node.identifier]
+
+        yield from map(
+            self._nodes.__getitem__,
+            traverse(
+                start_ids, self._successor_function(edge_filter), order, max_depth
+            ),
+        )
+
+    def set_expander(self, expander: Expander[NODE_TYPE, EDGE_TYPE] | None) -> None:
+        """
+        Set a function that is called to find the outgoing edges of a node
+        the first time they are needed, which makes it possible to work
+        with graphs that are too large, or too expensive, to build up front.
+
+        The expander is called with a node and returns an iterable of
+        ``(edge_attributes, node)`` pairs for the outgoing edges of that
+        node, similar to :meth:`outgoing`. Nodes that are not yet part of
+        the graph are added using :meth:`add_nodes`, and edges are added
+        using :meth:`add_edges`.
+
+        Nodes are expanded by :meth:`outgoing`, :meth:`iter_graph`,
+        :meth:`reachable_from`, :meth:`is_reachable`, :meth:`shortest_path`
+        and :meth:`all_shortest_paths`. Every node is expanded at most once,
+        including nodes added to the graph before setting the expander.
+        Other methods, including :meth:`parallel_iter_graph`, only look at
+        the part of the graph that is already present.
+
+        Args:
+          expander: The expander, or :data:`None` to stop expanding nodes.
+        """
+        self._expander = expander
+        if expander is None:
+            self._expanded.clear()
+
+        # Cached results may have been computed without expanding nodes
+        self._reachability_cache.clear()
+
+    def _expand_node(self, node_id: str) -> None:
+        """
+        Add the outgoing edges of *node_id* found by the expander
+        """
+        assert self._expander is not None
+
+        self._expanded.add(node_id)
+        try:
+            edges = list(self._expander(self._nodes[node_id]))
+        except BaseException:
+            self._expanded.discard(node_id)
+            raise
+
+        nodes = self._nodes
+        new_nodes: dict[str, NODE_TYPE] = {}
+        for _, node in edges:
+            if node.identifier not in nodes and node.identifier not in new_nodes:
+                new_nodes[node.identifier] = node
+
+        self.add_nodes(new_nodes.values())
+        self.add_edges(
+            (node_id, node.identifier, edge_attributes)
+            for edge_attributes, node in edges
+        )
+
+    def _expanding_successor_ids(self, node_id: str) -> Iterable[str]:
+        if node_id not in self._expanded:
+            self._expand_node(node_id)
+        return self._successor_ids(node_id)
+
+    def _traversal_successors(self) -> Callable[[str], Iterable[str]]:
+        """
+        Return the successor function for traversals, which
+        expands nodes when an expander is set.
+        """
+        if self._expander is None:
+            return self._successor_ids
+        return self._expanding_successor_ids
+
+    def _successor_function(
+        self, edge_filter: EdgeFilter[EDGE_TYPE] | None
+    ) -> Callable[[str], Iterable[str]]:
+        """
+        Return the successor function for traversals that only
+        follow edges selected by *edge_filter*.
+        """
+        if edge_filter is None:
+            return self._traversal_successors()
+
+        def successors(node_id: str) -> Iterable[str]:
+            if self._expander is not None and node_id not in self._expanded:
+                self._expand_node(node_id)
+
+            return [
+                destination_id
+                for destination_id, attributes in self._successors(node_id)
+                if edge_filter(attributes)
+            ]
+
+        return successors
+
+    def parallel_iter_graph(
+        self,
+        *,
+        node: str | NODE_TYPE | None = None,
+        max_depth: int | None = None,
+        executor: Executor | None = None,
+        workers: int | None = None,
+    ) -> Iterator[NODE_TYPE]:
+        """
+        Yield all nodes in the graph reachable from *node* or any of the
+        graph roots in breadth-first order, like ``iter_graph(order="bfs")``.
+
+        Each level of the traversal is split into chunks that are expanded
+        concurrently, which scales across cores on free-threaded builds
+        of Python. The graph must not be modified during iteration, and
+        nodes are not expanded (see :meth:`set_expander`).
+
         Args:
           node: The node or node identifier used to start iterating. Defaults
                 to using the graph roots.
+
+          max_depth: If not :data:`None` don't follow edges from nodes
+                 at this distance from the start node(s).
+
+          executor: The executor used to run the work. This should be a
+                 thread pool, a process pool would copy the graph for
+                 every chunk. Defaults to a new
+                 :class:`concurrent.futures.ThreadPoolExecutor`.
+
+          workers: The number of chunks to split a level in, and the
+                 number of threads when *executor* is :data:`None`.
+                 Defaults to the number of CPUs.
+
+        Raises:
+          KeyError: If *node* is not part of the graph
+          ValueError: If *workers* is less than 1
+        """
+        if node is None:
+            start_ids: list[str] = list(self._roots)
+
+        else:
+            start_node = self.find_node(node)
+            if start_node is None:
+                raise KeyError(f"Start node {node!r} not found")
+
+            start_ids = [start_node.identifier]
+
+        with use_executor(executor, workers) as (pool, count):
+            yield from map(
+                self._nodes.__getitem__,
+                parallel_bfs(start_ids, self._successor_ids, pool, count, max_depth),
+            )
+
+    def map_nodes(
+        self,
+        function: Callable[[NODE_TYPE], R],
+        nodes: Iterable[NODE_TYPE] | None = None,
+        *,
+        executor: Executor | None = None,
+        workers: int | None = None,
+    ) -> Iterator[tuple[NODE_TYPE, R]]:
+        """
+        Yield ``(node, function(node))`` for all nodes, calling *function*
+        concurrently for multiple nodes. Results are yielded in the
+        order of *nodes*, as they become available.
+
+        Args:
+          function: The function to call for every node
+
+          nodes: The nodes to process, for example the result of
+                 :meth:`iter_graph`. Defaults to all nodes in the graph.
+
+          executor: The executor used to call *function*. Defaults to a new
+                 :class:`concurrent.futures.ThreadPoolExecutor`. With a
+                 process pool both *function* and the nodes must be
+                 picklable.
+
+          workers: The number of threads when *executor* is :data:`None`,
+                 defaults to the number of CPUs. At most twice this
+                 number of calls are scheduled at the same time.
+
+        Raises:
+          ValueError: If *workers* is less than 1
+        """
+        if nodes is None:
+            nodes = list(self._nodes.values())
+
+        with use_executor(executor, workers) as (pool, count):
+            yield from parallel_map(function, nodes, pool, count)
+
+    async def crawl(
+        self,
+        start: Iterable[NODE_TYPE],
+        expand: AsyncExpander[NODE_TYPE, EDGE_TYPE],
+        *,
+        concurrency: int = 8,
+    ) -> int:
+        """
+        Build the graph by expanding nodes concurrently, starting at the
+        nodes in *start*. This is a coroutine.
+
+        The *expand* coroutine is called once for every node reachable
+        from *start* and returns the outgoing edges of that node as
+        ``(edge_attributes, node)`` pairs, similar to :meth:`outgoing`.
+        Nodes that are not yet part of the graph are added using
+        :meth:`add_nodes`, and edges are added using :meth:`add_edges`.
+
+        Args:
+          start: The nodes to start with, nodes that are not yet part
+                 of the graph are added to it.
+
+          expand: Coroutine function that returns the outgoing edges
+                 of a node
+
+          concurrency: The maximum number of *expand* calls that
+                 run at the same time
+
+        Returns:
+          The number of nodes added to the graph
+
+        Raises:
+          ValueError: If *concurrency* is less than 1
+        """
+        count = len(self._nodes)
+        start = list(start)
+        self.add_nodes(start, ignore_existing=True)
+        start_nodes = [self._nodes[node.identifier] for node in start]
+
+        async for _ in expand_graph(self, start_nodes, expand, concurrency, None):
+            pass
+
+        return len(self._nodes) - count
+
+    async def async_iter_graph(
+        self,
+        expand: AsyncExpander[NODE_TYPE, EDGE_TYPE],
+        *,
+        node: str | NODE_TYPE | None = None,
+        max_depth: int | None = None,
+        concurrency: int = 8,
+    ) -> AsyncIterator[NODE_TYPE]:
         """
-        if _visited is None:
-            _visited = set()
+        Asynchronously yield all nodes reachable from *node* or any
+        of the graph roots, expanding nodes while iterating.
 
+        This calls *expand* for every node before following its outgoing
+        edges, see :meth:`crawl`. Nodes are yielded in breadth-first
+        order of discovery, after their expansion is done.
+
+        Args:
+          expand: Coroutine function that returns the outgoing edges
+                 of a node
+
+          node: The node or node identifier used to start iterating. Defaults
+                to using the graph roots.
+
+          max_depth: If not :data:`None` don't expand and follow edges from
+                 nodes at this distance from the start node(s).
+
+          concurrency: The maximum number of *expand* calls that
+                 run at the same time
+
+        Raises:
+          KeyError: If *node* is not part of the graph
+          ValueError: If *concurrency* is less than 1
+        """
         if node is None:
-            for node in self._roots:
-                yield from self.iter_graph(node=node, _visited=_visited)
+            start_nodes = list(self.roots())
 
         else:
             start_node = self.find_node(node)
             if start_node is None:
                 raise KeyError(f"Start node {node!r} not found")
 
-            if start_node.identifier in _visited:
-                return
+            start_nodes = [start_node]
+
+        async for result in expand_graph(
+            self, start_nodes, expand, concurrency, max_depth
+        ):
+            yield result
+
+    def reachable_from(self, node: str | NODE_TYPE) -> Iterator[NODE_TYPE]:
+        """
+        Yield all nodes reachable from *node*, including *node* itself,
+        in an arbitrary order.
+
+        The result is cached until the graph is changed in a way that
+        affects the result.
 
-            _visited.add(start_node.identifier)
-            yield start_node
+        Args:
+          node: A node or node identifier
 
-            for _, node in self.outgoing(start_node):
-                yield from self.iter_graph(node=node, _visited=_visited)
+        Raises:
+          KeyError: If *node* is not part of the graph
+        """
+        return map(self._nodes.__getitem__, self._reachable_ids(node))
+
+    def is_reachable(
+        self, source: str | NODE_TYPE, destination: str | NODE_TYPE
+    ) -> bool:
+        """
+        Check if there is a path from *source* to *destination*. A node
+        is always reachable from itself.
+
+        This uses the same cache as :meth:`reachable_from`.
+
+        Args:
+          source: A node or node identifier
+          destination: A node or node identifier
+
+        Raises:
+          KeyError: If *source* or *destination* aren't member of the graph
+        """
+        to_node = self.find_node(destination)
+        if to_node is None and self._expander is not None:
+            # The traversal can add the destination to the graph
+            reachable = self._reachable_ids(source)
+            to_node = self.find_node(destination)
+            if to_node is not None:
+                return to_node.identifier in reachable
+
+        if to_node is None:
+            raise KeyError(f"Destination {destination!r} not found")
+
+        return to_node.identifier in self._reachable_ids(source)
+
+    def _reachable_ids(self, node: str | NODE_TYPE) -> frozenset[str]:
+        """
+        Return the identifiers of all nodes reachable from *node*
+        """
+        start_node = self.find_node(node)
+        if start_node is None:
+            raise KeyError(f"Node {node!r} not found")
+
+        node_id = start_node.identifier
+        cache = self._reachability_cache
+        try:
+            result = cache[node_id]
+
+        except KeyError:
+            result = frozenset(
+                traverse([node_id], self._traversal_successors(), "dfs-pre", None)
+            )
+            if self._reachability_cache_size > 0:
+                cache[node_id] = result
+                if len(cache) > self._reachability_cache_size:
+                    cache.popitem(last=False)
+
+        else:
+            cache.move_to_end(node_id)
+
+        return result
+
+    def _invalidate_reachability(self, node_ids: set[str]) -> None:
+        """
+        Drop cached reachability information that depends on the
+        outgoing edges of the nodes in *node_ids*.
+        """
+        cache = self._reachability_cache
+        if not cache or not node_ids:
+            return
+
+        stale = [
+            key
+            for key, reachable in cache.items()
+            if not node_ids.isdisjoint(reachable)
+        ]
+        for key in stale:
+            del cache[key]
+
+    def shortest_path(
+        self,
+        source: str | NODE_TYPE,
+        destination: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> list[NODE_TYPE] | None:
+        """
+        Return a shortest path from *source* to *destination*, using
+        a breadth-first search that stops when *destination* is found.
+
+        Args:
+          source: A node or node identifier
+          destination: A node or node identifier
+          edge_filter: If not :data:`None` only follow edges for which
+                 this function returns true when called with the set
+                 of edge attributes.
+
+        Returns:
+          The nodes on the path, starting with *source* and ending with
+          *destination*, or :data:`None` if there is no path.
+
+        Raises:
+          KeyError: If *source* or *destination* aren't member of the graph
+        """
+        from_node = self.find_node(source)
+        to_node = self.find_node(destination)
+        if from_node is None:
+            raise KeyError(f"Source {source!r} not found")
+        if to_node is None:
+            raise KeyError(f"Destination {destination!r} not found")
+
+        path = bfs_path(
+            from_node.identifier,
+            {to_node.identifier},
+            self._successor_function(edge_filter),
+        )
+        if path is None:
+            return None
+        return [self._nodes[node_id] for node_id in path]
+
+    def all_shortest_paths(
+        self,
+        source: str | NODE_TYPE,
+        destination: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[list[NODE_TYPE]]:
+        """
+        Yield all shortest paths from *source* to *destination*. The
+        search stops after finding all nodes at the distance of
+        *destination*.
+
+        Args:
+          source: A node or node identifier
+          destination: A node or node identifier
+          edge_filter: If not :data:`None` only follow edges for which
+                 this function returns true when called with the set
+                 of edge attributes.
+
+        Raises:
+          KeyError: If *source* or *destination* aren't member of the graph
+        """
+        from_node = self.find_node(source)
+        to_node = self.find_node(destination)
+        if from_node is None:
+            raise KeyError(f"Source {source!r} not found")
+        if to_node is None:
+            raise KeyError(f"Destination {destination!r} not found")
+
+        nodes = self._nodes
+        for path in bfs_all_paths(
+            from_node.identifier,
+            to_node.identifier,
+            self._successor_function(edge_filter),
+        ):
+            yield [nodes[node_id] for node_id in path]
+
+    def why(
+        self,
+        node: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> list[NODE_TYPE] | None:
+        """
+        Explain why *node* is part of the graph: return a shortest path
+        from one of the graph roots to *node*.
+
+        This searches backwards from *node* using incoming edges, and
+        stops at the first root that is found.
+
+        Args:
+          node: A node or node identifier
+          edge_filter: If not :data:`None` only follow edges for which
+                 this function returns true when called with the set
+                 of edge attributes.
+
+        Returns:
+          The nodes on the path, starting with a root and ending with
+          *node*, or :data:`None` if *node* is not reachable from a root.
+
+        Raises:
+          KeyError: If *node* is not part of the graph
+        """
+        start_node = self.find_node(node)
+        if start_node is None:
+            raise KeyError(f"Node {node!r} not found")
+
+        if edge_filter is None:
+            predecessors: Callable[[str], Iterable[str]] = self._predecessor_ids
+        else:
+
+            def predecessors(node_id: str) -> Iterable[str]:
+                return [
+                    source_id
+                    for source_id, attributes in self._predecessors(node_id)
+                    if edge_filter(attributes)
+                ]
+
+        path = bfs_path(start_node.identifier, self._roots, predecessors)
+        if path is None:
+            return None
+        return [self._nodes[node_id] for node_id in reversed(path)]
+
+    def strongly_connected_components(self) -> Iterator[list[NODE_TYPE]]:
+        """
+        Yield the strongly connected components of the graph as lists
+        of nodes. Every node is part of exactly one component, nodes
+        that are not part of a cycle are a component on their own.
+
+        Components are yielded in reverse topological order: a component
+        is yielded after all components that are reachable from it.
+
+        This runs in linear time, and does not use recursion.
+        """
+        nodes = self._nodes
+        for component in strongly_connected_components(nodes, self._successor_ids):
+            yield [nodes[node_id] for node_id in component]
+
+    def levels(self, *, reverse: bool = False) -> Iterator[list[NODE_TYPE]]:
+        """
+        Yield lists of nodes such that all nodes with an edge to a node
+        are yielded in an earlier list. The nodes in a list don't depend
+        on each other and can be processed concurrently.
+
+        Args:
+          reverse: If true edges are followed in the reverse direction,
+                   that is a node is yielded after all nodes it has
+                   an edge to.
+
+        Raises:
+          CycleError: If the graph contains a cycle, this is raised after
+                      yielding all nodes that are not part of, or
+                      depend on, a cycle.
+        """
+        nodes = self._nodes
+        successors = self._predecessor_ids if reverse else self._successor_ids
+        try:
+            for level in topological_levels(nodes, successors):
+                yield [nodes[node_id] for node_id in level]
+
+        except CycleError as exc:
+            cycle = [nodes[node_id] for node_id in exc.args[1]]
+            if reverse:
+                cycle.reverse()
+            raise CycleError(exc.args[0], cycle) from None
+
+    def topological_order(self, *, reverse: bool = False) -> list[NODE_TYPE]:
+        """
+        Return all nodes in the graph in topological order: for every
+        edge the source is before the destination.
+
+        Args:
+          reverse: If true return the reverse topological order, that is
+                   for every edge the destination is before the source.
+
+        Raises:
+          CycleError: If the graph contains a cycle
+        """
+        return [node for level in self.levels(reverse=reverse) for node in level]
+
+    def subgraph_view(
+        self,
+        predicate: Callable[[NODE_TYPE], bool] | None = None,
+        *,
+        nodes: Iterable[str | NODE_TYPE] | None = None,
+    ) -> SubgraphView[NODE_TYPE, EDGE_TYPE]:
+        """
+        Return a read-only view on part of the graph, without copying
+        the graph. Changes to the graph are visible through the view.
+
+        Args:
+          predicate: Only include nodes for which this function returns true
+
+          nodes: Only include these nodes, for example the result
+                 of :meth:`reachable_from`.
+        """
+        node_ids = None
+        if nodes is not None:
+            node_ids = frozenset(
+                node if isinstance(node, str) else node.identifier for node in nodes
+            )
+        return SubgraphView(self, predicate, node_ids)
+
+    def induced_subgraph(
+        self, nodes: Iterable[str | NODE_TYPE]
+    ) -> "ObjectGraph[NODE_TYPE, EDGE_TYPE]":
+        """
+        Return a new graph of the same type with the given nodes and the
+        edges between them. The roots of the new graph are the roots of
+        this graph that are in *nodes*.
+
+        This only looks at the edges of the given nodes, and copies
+        the edges in a single pass.
+
+        Args:
+          nodes: The nodes or node identifiers to include
+
+        Raises:
+          KeyError: If one or more nodes are not part of the graph
+        """
+        node_ids = {
+            node if isinstance(node, str) else node.identifier for node in nodes
+        }
+        missing = [node_id for node_id in node_ids if node_id not in self._nodes]
+        if missing:
+            raise KeyError(f"Nodes {missing!r} not found")
+
+        result: ObjectGraph[NODE_TYPE, EDGE_TYPE] = type(self)()
+        result.add_nodes(self._nodes[node_id] for node_id in node_ids)
+        result._roots.update(self._roots & node_ids)
+
+        sources = []
+        destinations = []
+        attributes = []
+        for source_id in node_ids:
+            for destination_id, edge_attributes in self._successors(source_id):
+                if destination_id in node_ids:
+                    sources.append(source_id)
+                    destinations.append(destination_id)
+                    attributes.append(set(edge_attributes))
+        result._insert_new_edges(sources, destinations, attributes)
+
+        return result
+
+    def condensation(self) -> "ObjectGraph[Component[NODE_TYPE], EDGE_TYPE]":
+        """
+        Return the condensation of the graph: a new graph of the same type
+        with a :class:`objectgraph.Component` node for every strongly
+        connected component.
+
+        There is an edge between two components when there is an edge
+        between nodes in those components, the edge attributes are the
+        combined attributes of those edges. The roots of the new graph
+        are the components containing the roots of this graph.
+
+        The condensation is a directed acyclic graph.
+        """
+        # The new graph has a different node type than this one
+        graph_class: type[ObjectGraph] = type(self)
+        result: ObjectGraph[Component[NODE_TYPE], EDGE_TYPE] = graph_class()
+
+        component_of: dict[str, str] = {}
+        for component in self.strongly_connected_components():
+            node = Component(component)
+            result.add_node(node)
+            for member in component:
+                component_of[member.identifier] = node.identifier
+
+        insert = result._insert_edge
+        for source_id, destination_id, attributes in self._edge_items():
+            source = component_of[source_id]
+            destination = component_of[destination_id]
+            if source == destination:
+                continue
+
+            for edge_attributes in attributes:
+                insert(source, destination, edge_attributes)
+
+            if not attributes and result._edge_attributes(source, destination) is None:
+                result._insert_new_edges([source], [destination], [set()])
+
+        result._roots.update(component_of[root] for root in self._roots)
+        return result
+
+    def diff(
+        self,
+        other: "ObjectGraph[NODE_TYPE, EDGE_TYPE]",
+        *,
+        node_changed: Callable[[NODE_TYPE, NODE_TYPE], bool] | None = None,
+    ) -> GraphDiff[NODE_TYPE, EDGE_TYPE]:
+        """
+        Return the differences between this graph and *other*, such
+        that ``self.apply(self.diff(other))`` makes this graph
+        equivalent to *other*.
+
+        Nodes are matched by identifier, this takes time linear in the
+        size of both graphs.
+
+        Args:
+          other: The graph to compare with
+
+          node_changed: Function called with the node from this graph and
+                 the node from *other* for all nodes that are in both graphs,
+                 returns true if the node from *other* should replace the
+                 node in this graph. By default nodes are only compared
+                 by identifier.
+        """
+        return diff_graphs(self, other, node_changed)
+
+    def apply(self, diff: GraphDiff[NODE_TYPE, EDGE_TYPE]) -> None:
+        """
+        Update the graph in place with the changes in *diff*.
+
+        The changes are made using a number of smaller operations, each
+        of which increments :attr:`version`. Subscribers are called for
+        every operation, see :class:`objectgraph.GraphEvent`.
+
+        Args:
+          diff: The changes to apply, as returned by :meth:`diff`
+
+        Raises:
+          ValueError: If the changes don't apply to this graph, for example
+                      because a node to be removed is not in the graph. The
+                      graph is not modified in that case.
+        """
+        self._check_diff(diff)
+
+        removed = set(diff.removed_nodes)
+        for source_id, destination_id, _ in diff.removed_edges:
+            if source_id not in removed and destination_id not in removed:
+                self.remove_all_edges(source_id, destination_id)
+
+        for source_id, destination_id, attributes in diff.removed_edge_attributes:
+            for edge_attributes in attributes:
+                self.remove_edge(source_id, destination_id, edge_attributes)
+
+        for root in diff.removed_roots:
+            self.remove_root(root)
+
+        self.remove_nodes(removed)
+        self.add_nodes(diff.added_nodes)
+        self._replace_nodes(diff.changed_nodes)
+        self.add_edges(
+            (source_id, destination_id, edge_attributes)
+            for edges in (diff.added_edges, diff.added_edge_attributes)
+            for source_id, destination_id, attributes in edges
+            for edge_attributes in attributes
+        )
+        self._add_empty_edges(
+            [
+                (source_id, destination_id)
+                for source_id, destination_id, attributes in diff.added_edges
+                if not attributes
+            ]
+        )
+
+        for root in diff.added_roots:
+            self.add_root(root)
+
+    def _replace_nodes(self, nodes: Sequence[NODE_TYPE]) -> None:
+        """
+        Replace nodes in the graph by nodes with the same identifier
+        """
+        if not nodes:
+            return
+
+        for node in nodes:
+            self._nodes[node.identifier] = node
+
+        self._version += 1
+        if self._subscribers:
+            self._publish(
+                ("node-replaced", node.identifier, None, frozenset()) for node in nodes
+            )
+
+    def _add_empty_edges(self, edges: Sequence[tuple[str, str]]) -> None:
+        """
+        Add edges without attributes between nodes that don't have an edge
+        """
+        if not edges:
+            return
+
+        for source_id, destination_id in edges:
+            self._invalidate_reachability({source_id})
+            self._insert_new_edges([source_id], [destination_id], [set()])
+
+        self._version += 1
+        if self._subscribers:
+            self._publish(
+                ("edge-added", source_id, destination_id, frozenset())
+                for source_id, destination_id in edges
+            )
+
+    def _check_diff(self, diff: GraphDiff[NODE_TYPE, EDGE_TYPE]) -> None:
+        """
+        Raise ValueError if *diff* cannot be applied to this graph
+        """
+        nodes = self._nodes
+        removed = set(diff.removed_nodes)
+        added = {node.identifier for node in diff.added_nodes}
+
+        def exists_after(node_id: str) -> bool:
+            return (node_id in nodes and node_id not in removed) or node_id in added
+
+        def current_edge(source_id: str, destination_id: str) -> set | None:
+            # The attributes of an edge that is not removed with its nodes
+            if source_id in removed or destination_id in removed:
+                return None
+            if source_id not in nodes or destination_id not in nodes:
+                return None
+            return self._edge_attributes(source_id, destination_id)
+
+        problems: list[str] = []
+        problems.extend(
+            f"node {node_id!r} not found" for node_id in removed if node_id not in nodes
+        )
+        problems.extend(
+            f"node {node_id!r} already exists" for node_id in added if node_id in nodes
+        )
+        problems.extend(
+            f"node {node.identifier!r} not found"
+            for node in diff.changed_nodes
+            if not exists_after(node.identifier)
+        )
+        problems.extend(
+            f"root {node_id!r} not found"
+            for node_id in diff.removed_roots
+            if node_id not in self._roots
+        )
+        problems.extend(
+            f"node {node_id!r} not found"
+            for node_id in diff.added_roots
+            if not exists_after(node_id)
+        )
+
+        for source_id, destination_id, _ in diff.removed_edges:
+            if (
+                source_id not in nodes
+                or destination_id not in nodes
+                or self._edge_attributes(source_id, destination_id) is None
+            ):
+                problems.append(f"edge {source_id!r} -> {destination_id!r} not found")
+
+        for source_id, destination_id, attributes in diff.removed_edge_attributes:
+            current = current_edge(source_id, destination_id)
+            if current is None or not attributes <= current:
+                problems.append(
+                    f"edge attributes {source_id!r} -> {destination_id!r} not found"
+                )
+
+        for source_id, destination_id, _ in diff.added_edges:
+            if not exists_after(source_id) or not exists_after(destination_id):
+                problems.append(
+                    f"node for edge {source_id!r} -> {destination_id!r} not found"
+                )
+            elif current_edge(source_id, destination_id) is not None:
+                problems.append(
+                    f"edge {source_id!r} -> {destination_id!r} already exists"
+                )
+
+        for source_id, destination_id, _ in diff.added_edge_attributes:
+            if current_edge(source_id, destination_id) is None:
+                problems.append(f"edge {source_id!r} -> {destination_id!r} not found")
+
+        if problems:
+            raise ValueError(f"Diff does not apply: {', '.join(problems)}")
+
+    def freeze(self) -> FrozenObjectGraph[NODE_TYPE, EDGE_TYPE]:
+        """
+        Return an immutable copy of the graph that is optimized
+        for queries. Later changes to this graph are not reflected
+        in the copy.
+        """
+        return FrozenObjectGraph(self)
+
+    def dump(
+        self, file: IO[bytes], *, node_codec: _serialize.NodeCodec | None = None
+    ) -> None:
+        """
+        Write the graph to a binary file, the graph can be read back
+        using :meth:`load`.
+
+        Args:
+          file: A file opened for writing in binary mode
+
+          node_codec: Object used to serialize nodes, see
+                 :class:`objectgraph.NodeCodec`. Defaults to
+                 using :mod:`pickle`.
+        """
+        if node_codec is None:
+            node_codec = _serialize.PickleNodeCodec()
+
+        _serialize.dump_graph(self, file, node_codec)
+
+    @classmethod
+    def load(
+        cls, file: IO[bytes], *, node_codec: _serialize.NodeCodec | None = None
+    ) -> "ObjectGraph[NODE_TYPE, EDGE_TYPE]":
+        """
+        Read a graph written by :meth:`dump`. The file is read
+        incrementally and is not loaded into memory as a whole.
+
+        Edge attributes are stored using :mod:`pickle`, only
+        load files from trusted sources.
+
+        Args:
+          file: A file opened for reading in binary mode
+
+          node_codec: Object used to deserialize nodes, this must
+                 be compatible with the codec used to write the file.
+
+        Returns:
+          A new graph
+
+        Raises:
+          ValueError: If the file is not a valid graph file
+        """
+        if node_codec is None:
+            node_codec = _serialize.PickleNodeCodec()
+
+        graph = cls()
+        _serialize.load_graph(graph, file, node_codec)
+        return graph
+
+    def write_dot(
+        self,
+        file: IO[str],
+        *,
+        node_formatter: NodeFormatter[NODE_TYPE] | None = None,
+        edge_formatter: EdgeFormatter[NODE_TYPE, EDGE_TYPE] | None = None,
+        reachable: bool = False,
+    ) -> None:
+        """
+        Write the graph to a text file in the DOT language used by
+        `Graphviz <https://graphviz.org>`_.
+
+        The graph is written incrementally, nodes and edges are formatted
+        one at a time without building a copy of the graph or the output
+        in memory. Nodes are written with their identifier as the node ID,
+        roots have an attribute "root" with value "true".
+
+        Args:
+          file: A file opened for writing in text mode
+
+          node_formatter: A function that returns a mapping with the DOT
+                 attributes for a node, for example ``{"label": ...}``.
+                 Defaults to writing nodes without attributes.
+
+          edge_formatter: A function that is called with the source,
+                 destination and set of edge attributes of an edge and
+                 returns a mapping with the DOT attributes for the edge.
+                 Defaults to a label with the edge attributes.
+
+          reachable: If true only write the part of the graph that is
+                 reachable from the graph roots. This uses memory
+                 proportional to the number of nodes written to keep
+                 track of visited nodes.
+        """
+        _export.write_dot(self, file, node_formatter, edge_formatter, reachable)
+
+    def write_graphml(
+        self,
+        file: IO[str],
+        *,
+        node_formatter: NodeFormatter[NODE_TYPE] | None = None,
+        edge_formatter: EdgeFormatter[NODE_TYPE, EDGE_TYPE] | None = None,
+        reachable: bool = False,
+        node_keys: Iterable[str] = (),
+        edge_keys: Iterable[str] = ("label",),
+    ) -> None:
+        """
+        Write the graph to a text file in the
+        `GraphML <http://graphml.graphdrawing.org>`_ format.
+
+        This works like :meth:`write_dot`, the mappings returned by the
+        formatters are written as ``<data>`` elements. GraphML requires
+        that keys are declared before the graph, all keys returned by the
+        formatters must be listed in *node_keys* and *edge_keys*. The
+        node key "root" is always declared and is used to mark roots.
+
+        Args:
+          file: A file opened for writing in text mode
+          node_formatter: See :meth:`write_dot`
+          edge_formatter: See :meth:`write_dot`
+          reachable: See :meth:`write_dot`
+          node_keys: The keys used by *node_formatter*
+          edge_keys: The keys used by *edge_formatter*
+
+        Raises:
+          ValueError: If a formatter returns a key that is not declared.
+                 The file contains a partial graph in that case.
+        """
+        _export.write_graphml(
+            self,
+            file,
+            node_formatter,
+            edge_formatter,
+            reachable,
+            frozenset(node_keys),
+            frozenset(edge_keys),
+        )
+
+    def write_jsonl(
+        self,
+        file: IO[str],
+        *,
+        node_formatter: NodeFormatter[NODE_TYPE] | None = None,
+        edge_formatter: EdgeFormatter[NODE_TYPE, EDGE_TYPE] | None = None,
+        reachable: bool = False,
+    ) -> None:
+        """
+        Write the graph to a text file as `JSON Lines <https://jsonlines.org>`_,
+        with one JSON object per line for every node and edge.
+
+        Nodes are written as ``{"type": "node", "id": identifier}`` with
+        ``"root": true`` for roots, edges as ``{"type": "edge", "source":
+        identifier, "destination": identifier}``. The objects are extended
+        with the items of the mapping returned by the formatters, values
+        that cannot be represented in JSON are written as strings.
+
+        Args:
+          file: A file opened for writing in text mode
+
+          node_formatter: See :meth:`write_dot`, defaults to writing
+                 no additional data for nodes.
+
+          edge_formatter: See :meth:`write_dot`, defaults to writing
+                 the edge attributes as a list with key "attributes".
+
+          reachable: See :meth:`write_dot`
+        """
+        _export.write_jsonl(self, file, node_formatter, edge_formatter, reachable)
+
+    def read_edge_list(
+        self,
+        file: IO[str],
+        *,
+        node_factory: Callable[[str], NODE_TYPE],
+        delimiter: str | None = None,
+        chunk_size: int = 10_000,
+    ) -> None:
+        """
+        Add the edges in an edge list to the graph. Every line contains
+        the identifiers of the source and destination and an optional
+        edge attribute, separated by *delimiter*. The edge attribute is
+        the rest of the line, or :data:`None` when there are only two
+        fields. Empty lines and lines starting with "#" are ignored.
+
+        The file is read in chunks of *chunk_size* lines, the nodes and
+        edges for a chunk are added using :meth:`add_nodes` and
+        :meth:`add_edges`.
+
+        Args:
+          file: A file opened for reading in text mode
+
+          node_factory: A function that is called with an identifier
+                 and returns a node with that identifier, for identifiers
+                 that are not yet part of the graph.
+
+          delimiter: The field separator, defaults to any whitespace
+
+          chunk_size: The number of lines to process at a time
+
+        Raises:
+          ValueError: If a line contains less than two fields, or
+                 *chunk_size* is less than 1. The graph contains the
+                 edges before the invalid line in that case.
+        """
+        _import.read_edge_list(self, file, node_factory, delimiter, chunk_size)
+
+    def read_csv(
+        self,
+        file: IO[str],
+        *,
+        node_factory: Callable[[str], NODE_TYPE],
+        source: str = "source",
+        destination: str = "destination",
+        attribute: str | None = None,
+        delimiter: str = ",",
+        chunk_size: int = 10_000,
+    ) -> None:
+        """
+        Add the edges in a CSV file to the graph. The first row of the
+        file contains the column names.
+
+        This works like :meth:`read_edge_list`, but uses the :mod:`csv`
+        module to parse the file.
+
+        Args:
+          file: A file opened for reading in text mode, with
+                 ``newline=""``
+
+          node_factory: See :meth:`read_edge_list`
+
+          source: The name of the column with source identifiers
+
+          destination: The name of the column with destination identifiers
+
+          attribute: The name of the column with edge attributes. Edges
+                 have attribute :data:`None` when this is :data:`None`.
+
+          delimiter: The field separator
+
+          chunk_size: The number of rows to process at a time
+
+        Raises:
+          ValueError: If one of the columns is not found, a row has too
+                 few fields, or *chunk_size* is less than 1.
+        """
+        _import.read_csv(
+            self,
+            file,
+            node_factory,
+            source,
+            destination,
+            attribute,
+            delimiter,
+            chunk_size,
+        )
+
+    def read_jsonl(
+        self,
+        file: IO[str],
+        *,
+        node_factory: Callable[[dict[str, Any]], NODE_TYPE],
+        chunk_size: int = 10_000,
+    ) -> None:
+        """
+        Add the nodes and edges in a JSON Lines file in the format written
+        by :meth:`write_jsonl` to the graph. Edges are added with the
+        items of their "attributes" list as edge attributes, JSON arrays
+        are converted to tuples.
+
+        The node factory is called with the object for a node and returns
+        the node. Edges can refer to nodes that are not yet part of the
+        graph, the node factory is called with ``{"type": "node", "id":
+        identifier}`` for those and the node is replaced when the object
+        for the node is read later.
+
+        Args:
+          file: A file opened for reading in text mode
+
+          node_factory: A function that returns a node for a JSON object
+
+          chunk_size: The number of lines to process at a time
+
+        Raises:
+          ValueError: If the file contains an invalid line, a node that is
+                 already part of the graph, or *chunk_size* is less than 1
+        """
+        _import.read_jsonl(self, file, node_factory, chunk_size)
+
+    def enable_instrumentation(
+        self, *, timing: bool = False, sink: StatsSink | None = None
+    ) -> None:
+        """
+        Start counting the calls of operations on the graph, with the
+        number of edges scanned and nodes visited by those operations.
+
+        Instrumentation has no cost when it is not enabled. The counters
+        are exclusive: work done in a nested call of another operation,
+        such as the calls to :meth:`find_node` by :meth:`add_edge`, is
+        only counted for the nested operation. For methods that return an
+        iterator the work is counted while consuming the iterator, and
+        the call is counted when the iterator is exhausted or closed.
+        Work done by the worker threads of :meth:`parallel_iter_graph`
+        is not counted.
+
+        Enabling instrumentation resets the counters. The graph can't
+        be pickled or copied while instrumentation is enabled.
+
+        Args:
+          timing: If true also measure the time spent in operations,
+                 which adds overhead to every call.
+
+          sink: A function that is called after every call of an
+                 operation with the name of the operation and an
+                 :class:`objectgraph.OperationStats` for that call,
+                 for example to forward samples to a metrics system.
+        """
+        self.disable_instrumentation()
+        self._instrumentation = Instrumentation(timing, sink)
+        self._instrumentation.install(self)
+
+    def disable_instrumentation(self) -> None:
+        """
+        Stop counting operations, the counters collected so far
+        are still available through :meth:`stats`.
+        """
+        if self._instrumentation is not None:
+            self._instrumentation.uninstall(self)
+            self._stats = self._instrumentation.stats()
+            self._instrumentation = None
+
+    def stats(self) -> dict[str, OperationStats]:
+        """
+        Return a snapshot of the counters collected since instrumentation
+        was enabled, see :meth:`enable_instrumentation`.
+
+        Returns:
+          A mapping from the name of an operation to an
+          :class:`objectgraph.OperationStats`, for all operations
+          that have been called.
+        """
+        if self._instrumentation is None:
+            return dict(self._stats)
+        return self._instrumentation.stats()
+
+    # Edge storage
+    #
+    # The methods below are the only ones that access the edge storage
+    # directly, subclasses can override them to use a different
+    # representation. All identifiers passed to these methods refer
+    # to nodes that are part of the graph.
+
+    def _init_edge_storage(self) -> None:
+        """
+        Initialize the (empty) edge storage
+        """
+        self._edges: dict[tuple[str, str], set[EDGE_TYPE]] = {}
+
+        # Adjacency indexes: node identifier -> neighbour identifier -> the
+        # attribute set for that edge (the same set object as in _edges).
+        # These are kept in sync with _edges and make neighbour queries
+        # O(degree) instead of O(edges).
+        self._outgoing: dict[str, dict[str, set[EDGE_TYPE]]] = {}
+        self._incoming: dict[str, dict[str, set[EDGE_TYPE]]] = {}
+
+    def _register_node(self, node_id: str) -> None:
+        """
+        Prepare the edge storage for a newly added node
+        """
+        self._outgoing[node_id] = {}
+        self._incoming[node_id] = {}
+
+    def _insert_edge(
+        self, source_id: str, destination_id: str, edge_attributes: EDGE_TYPE
+    ) -> bool:
+        """
+        Add an edge between two nodes that are known to be part of
+        the graph. Returns True if the edge was not yet present.
+        """
+        key = (source_id, destination_id)
+        attributes = self._edges.get(key)
+        if attributes is None:
+            attributes = {edge_attributes}
+            self._edges[key] = attributes
+            self._outgoing[source_id][destination_id] = attributes
+            self._incoming[destination_id][source_id] = attributes
+            return True
+
+        elif edge_attributes in attributes:
+            return False
+
+        else:
+            attributes.add(edge_attributes)
+            return True
+
+    def _insert_new_edges(
+        self,
+        sources: Sequence[str],
+        destinations: Sequence[str],
+        attributes: Sequence[set[EDGE_TYPE]],
+    ) -> None:
+        """
+        Add edges between *sources[i]* and *destinations[i]* with
+        attribute set *attributes[i]*. The caller guarantees that the
+        edges are not yet part of the graph, and that the attribute
+        sets are not shared with other edges.
+        """
+        self._edges.update(zip(zip(sources, destinations), attributes))
+
+        outgoing = self._outgoing
+        incoming = self._incoming
+        for source_id, destination_id, edge_attributes in zip(
+            sources, destinations, attributes
+        ):
+            outgoing[source_id][destination_id] = edge_attributes
+            incoming[destination_id][source_id] = edge_attributes
+
+    def _load_edges(
+        self,
+        node_ids: Sequence[str],
+        triples: Sequence[int],
+        attribute_table: Sequence[tuple[EDGE_TYPE, ...]],
+    ) -> None:
+        """
+        Add the edges read by :meth:`load`. *triples* contains
+        (source, destination, attributes) triples where the nodes are
+        positions in *node_ids* and attributes is a position in
+        *attribute_table*. The edges are not yet part of the graph.
+        """
+        # The edges are converted using iterators implemented in C
+        # to avoid per-edge overhead in Python code. Every edge gets
+        # its own set, the sets are returned by edge_data() and friends.
+        self._insert_new_edges(
+            list(map(node_ids.__getitem__, triples[::3])),
+            list(map(node_ids.__getitem__, triples[1::3])),
+            list(map(set, map(attribute_table.__getitem__, triples[2::3]))),
+        )
+
+    def _remove_edge_attribute(
+        self, source_id: str, destination_id: str, edge_attributes: EDGE_TYPE
+    ) -> None:
+        """
+        Remove *edge_attributes* from the edge between two nodes, the
+        edge itself is kept. Raises :exc:`KeyError` when there is no
+        such edge.
+        """
+        self._edges[(source_id, destination_id)].remove(edge_attributes)
+
+    def _remove_edges(self, source_id: str, destination_id: str) -> None:
+        """
+        Remove the edge between two nodes. Raises :exc:`KeyError`
+        when there is no such edge.
+        """
+        del self._edges[(source_id, destination_id)]
+        del self._outgoing[source_id][destination_id]
+        del self._incoming[destination_id][source_id]
+
+    def _discard_nodes(self, node_ids: set[str]) -> None:
+        """
+        Remove all edges incident to the nodes in *node_ids*, and
+        release storage for those nodes.
+        """
+        for node_id in node_ids:
+            for destination in self._outgoing.pop(node_id):
+                del self._edges[(node_id, destination)]
+                if destination not in node_ids:
+                    del self._incoming[destination][node_id]
+
+        for node_id in node_ids:
+            for source in self._incoming.pop(node_id):
+                if source not in node_ids:
+                    del self._edges[(source, node_id)]
+                    del self._outgoing[source][node_id]
+
+    def _edge_count(self) -> int:
+        """
+        Return the number of edges in the graph
+        """
+        return len(self._edges)
+
+    def _edge_items(self) -> Iterator[tuple[str, str, set[EDGE_TYPE]]]:
+        """
+        Yield *(source_id, destination_id, attributes)* for all edges
+        """
+        for (source_id, destination_id), attributes in self._edges.items():
+            yield source_id, destination_id, attributes
+
+    def _edge_attributes(
+        self, source_id: str, destination_id: str
+    ) -> set[EDGE_TYPE] | None:
+        """
+        Return the attributes of the edge between two nodes, or
+        :data:`None` if there is no such edge.
+        """
+        return self._edges.get((source_id, destination_id))
+
+    def _successors(self, node_id: str) -> Iterable[tuple[str, set[EDGE_TYPE]]]:
+        """
+        Return *(destination_id, attributes)* for all outgoing edges
+        """
+        return self._outgoing[node_id].items()
+
+    def _predecessors(self, node_id: str) -> Iterable[tuple[str, set[EDGE_TYPE]]]:
+        """
+        Return *(source_id, attributes)* for all incoming edges
+        """
+        return self._incoming[node_id].items()
+
+    def _successor_ids(self, node_id: str) -> Iterable[str]:
+        """
+        Return the identifiers of the destinations of all outgoing edges
+        """
+        return self._outgoing[node_id].keys()
+
+    def _out_degree(self, node_id: str) -> int:
+        """
+        Return the number of outgoing edges, in O(1)
+        """
+        return len(self._outgoing[node_id])
+
+    def _in_degree(self, node_id: str) -> int:
+        """
+        Return the number of incoming edges, in O(1)
+        """
+        return len(self._incoming[node_id])
+
+    def _predecessor_ids(self, node_id: str) -> Iterable[str]:
+        """
+        Return the identifiers of the sources of all incoming edges
+        """
+        return self._incoming[node_id].keys()
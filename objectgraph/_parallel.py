@@ -0,0 +1,140 @@
+"""
+Parallel graph traversal
+
+Like the functions in ``_traversal`` these work on node keys and a
+function that returns the successors for a key. The work is spread
+over a :class:`concurrent.futures.Executor`, which scales across cores
+on free-threaded builds of CPython.
+"""
+
+import collections
+import contextlib
+import itertools
+import os
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import TypeVar
+
+KEY = TypeVar("KEY", bound=Hashable)
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Frontiers smaller than this are expanded in the calling thread,
+# submitting work to an executor has a significant fixed cost.
+MIN_CHUNK_SIZE = 64
+
+
+@contextlib.contextmanager
+def use_executor(
+    executor: Executor | None, workers: int | None
+) -> Iterator[tuple[Executor, int]]:
+    """
+    Context manager returning the executor to use and the number of
+    workers. A thread pool is created (and shut down on exit) when
+    *executor* is :data:`None`.
+
+    Raises:
+      ValueError: If *workers* is less than 1
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    elif workers < 1:
+        raise ValueError(f"Invalid number of workers: {workers}")
+
+    if executor is not None:
+        yield executor, workers
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield pool, workers
+
+
+def _expand(
+    keys: list[KEY], successors: Callable[[KEY], Iterable[KEY]]
+) -> list[list[KEY]]:
+    return [list(successors(key)) for key in keys]
+
+
+def parallel_bfs(
+    start_keys: Iterable[KEY],
+    successors: Callable[[KEY], Iterable[KEY]],
+    executor: Executor,
+    workers: int,
+    max_depth: int | None,
+) -> Iterator[KEY]:
+    """
+    Yield the keys of all nodes reachable from *start_keys* in
+    breadth-first order.
+
+    The traversal processes the graph one level at a time. The frontier
+    is split into (at most) *workers* chunks whose successors are looked
+    up concurrently, the results are merged into the visited set in the
+    calling thread. Keys in the frontier are yielded while the workers
+    look up the next level.
+    """
+    visited: set[KEY] = set()
+    frontier: list[KEY] = []
+    for key in start_keys:
+        if key not in visited:
+            visited.add(key)
+            frontier.append(key)
+
+    depth = 0
+    while frontier:
+        if max_depth is not None and depth >= max_depth:
+            yield from frontier
+            return
+
+        chunk_size = max(-(-len(frontier) // workers), MIN_CHUNK_SIZE)
+        chunks = []
+        for start in range(0, len(frontier), chunk_size):
+            end = start + chunk_size
+            chunks.append(frontier[start:end])
+        if len(chunks) == 1:
+            yield from frontier
+            expanded = [_expand(frontier, successors)]
+
+        else:
+            futures = [executor.submit(_expand, chunk, successors) for chunk in chunks]
+            yield from frontier
+            expanded = [future.result() for future in futures]
+
+        frontier = []
+        for chunk_successors in expanded:
+            for key_successors in chunk_successors:
+                for key in key_successors:
+                    if key not in visited:
+                        visited.add(key)
+                        frontier.append(key)
+
+        depth += 1
+
+
+def parallel_map(
+    function: Callable[[T], R],
+    items: Iterable[T],
+    executor: Executor,
+    workers: int,
+) -> Iterator[tuple[T, R]]:
+    """
+    Yield (item, function(item)) for all *items* in order, calling
+    *function* concurrently. At most ``2 * workers`` calls are
+    outstanding at any time.
+    """
+    pending: collections.deque[tuple[T, Future[R]]] = collections.deque()
+    items = iter(items)
+    try:
+        for item in itertools.islice(items, 2 * workers):
+            pending.append((item, executor.submit(function, item)))
+
+        while pending:
+            item, future = pending.popleft()
+            for next_item in itertools.islice(items, 1):
+                pending.append((next_item, executor.submit(function, next_item)))
+
+            yield item, future.result()
+
+    finally:
+        # Don't start work for results that will never be used
+        for _, future in pending:
+            future.cancel()
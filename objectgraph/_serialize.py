@@ -0,0 +1,250 @@
+"""
+Binary serialization of graphs
+
+The file format consists of a header followed by a number of
+sections. All integers are stored in little-endian byte order.
+
+* Header: the magic bytes ``b"OGRF"`` and a 16-bit format version
+
+* Nodes: a sequence of blocks, each starting with a 32-bit node count
+  followed by an array of 32-bit identifier lengths, the concatenated
+  UTF-8 encoded identifiers and the node payload for the block (a 32-bit
+  length and the data returned by the node codec). A block with count 0
+  ends the section. Nodes are numbered in the order they are stored.
+
+* Roots: a 32-bit count followed by an array of 32-bit node numbers
+
+* Edge attributes: a 32-bit length followed by a pickled list with
+  all unique sets of edge attributes (as tuples)
+
+* Edges: a sequence of blocks, each starting with a 32-bit edge count
+  followed by an array of 32-bit (source, destination, attributes)
+  triples, where the last item is an index in the edge attributes table.
+  A block with count 0 ends the section.
+
+The sections are stored in blocks to make it possible to read
+large files without reading the entire file in memory.
+"""
+
+import pickle
+import struct
+import sys
+from array import array
+from collections.abc import Iterator
+from typing import IO, TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:  # pragma: nocover
+    from ._objectgraph import ObjectGraph
+
+MAGIC = b"OGRF"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sH")
+_COUNT = struct.Struct("<I")
+
+_NODE_BLOCK = 4096
+_EDGE_BLOCK = 16384
+
+
+class NodeCodec(Protocol):
+    """
+    Interface for objects that convert nodes to and from bytes
+    when serializing a graph. Nodes are converted in blocks to
+    reduce per-node overhead.
+    """
+
+    def encode(self, nodes: list[Any]) -> bytes:  # pragma: nocover
+        """
+        Return the serialized representation of *nodes*
+        """
+        ...  # pragma: nocover
+
+    def decode(
+        self, identifiers: list[str], data: bytes
+    ) -> list[Any]:  # pragma: nocover
+        """
+        Return the nodes with identifiers *identifiers* that were
+        serialized to *data* by :meth:`encode`.
+        """
+        ...  # pragma: nocover
+
+
+class PickleNodeCodec:
+    """
+    The default node codec, nodes are serialized using :mod:`pickle`.
+    """
+
+    def encode(self, nodes: list[Any]) -> bytes:
+        return pickle.dumps(nodes, pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, identifiers: list[str], data: bytes) -> list[Any]:
+        return pickle.loads(data)
+
+
+def _index_array(values=()) -> array:
+    """
+    Return an array of unsigned 32-bit integers
+    """
+    return array("I", values)
+
+
+def _write_array(file: IO[bytes], values: array) -> None:
+    if sys.byteorder == "big":  # pragma: nocover
+        values = array(values.typecode, values)
+        values.byteswap()
+    file.write(values.tobytes())
+
+
+def _read_exact(file: IO[bytes], size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated objectgraph file")
+    return data
+
+
+def _read_count(file: IO[bytes]) -> int:
+    return _COUNT.unpack(_read_exact(file, _COUNT.size))[0]
+
+
+def _read_array(file: IO[bytes], count: int) -> array:
+    values = _index_array()
+    values.frombytes(_read_exact(file, count * values.itemsize))
+    if sys.byteorder == "big":  # pragma: nocover
+        values.byteswap()
+    return values
+
+
+def _check_indexes(values: array, count: int, kind: str) -> None:
+    """
+    Raise :exc:`ValueError` when *values* contains an index that
+    is not less than *count*.
+    """
+    if values and (largest := max(values)) >= count:
+        raise ValueError(
+            f"Corrupt graph file: {kind} index {largest} out of range"
+            f" for {count} entries"
+        )
+
+
+def dump_graph(graph: "ObjectGraph", file: IO[bytes], codec: NodeCodec) -> None:
+    """
+    Write *graph* to *file* in the binary format described in
+    the module docstring.
+    """
+    file.write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+
+    numbering: dict[str, int] = {}
+    block: list[tuple[str, Any]] = []
+    for identifier, node in graph._nodes.items():
+        numbering[identifier] = len(numbering)
+        block.append((identifier, node))
+        if len(block) == _NODE_BLOCK:
+            _write_node_block(file, block, codec)
+            block = []
+
+    if block:
+        _write_node_block(file, block, codec)
+    file.write(_COUNT.pack(0))
+
+    file.write(_COUNT.pack(len(graph._roots)))
+    _write_array(file, _index_array(numbering[root] for root in graph._roots))
+
+    attribute_numbering: dict[frozenset, int] = {}
+    for _, _, attributes in graph._edge_items():
+        key = frozenset(attributes)
+        if key not in attribute_numbering:
+            attribute_numbering[key] = len(attribute_numbering)
+
+    data = pickle.dumps(
+        [tuple(attributes) for attributes in attribute_numbering],
+        pickle.HIGHEST_PROTOCOL,
+    )
+    file.write(_COUNT.pack(len(data)))
+    file.write(data)
+
+    triples = _index_array()
+    for source_id, destination_id, attributes in graph._edge_items():
+        triples.extend(
+            (
+                numbering[source_id],
+                numbering[destination_id],
+                attribute_numbering[frozenset(attributes)],
+            )
+        )
+
+        if len(triples) == 3 * _EDGE_BLOCK:
+            file.write(_COUNT.pack(_EDGE_BLOCK))
+            _write_array(file, triples)
+            triples = _index_array()
+
+    if triples:
+        file.write(_COUNT.pack(len(triples) // 3))
+        _write_array(file, triples)
+    file.write(_COUNT.pack(0))
+
+
+def _write_node_block(
+    file: IO[bytes], block: list[tuple[str, Any]], codec: NodeCodec
+) -> None:
+    identifiers = [identifier.encode("utf-8") for identifier, _ in block]
+    payload = codec.encode([node for _, node in block])
+
+    file.write(_COUNT.pack(len(block)))
+    _write_array(file, _index_array(map(len, identifiers)))
+    file.write(b"".join(identifiers))
+    file.write(_COUNT.pack(len(payload)))
+    file.write(payload)
+
+
+def _read_node_blocks(
+    file: IO[bytes], codec: NodeCodec
+) -> Iterator[tuple[list[str], list[Any]]]:
+    while count := _read_count(file):
+        lengths = _read_array(file, count)
+        data = _read_exact(file, sum(lengths))
+        identifiers = []
+        start = 0
+        for length in lengths:
+            end = start + length
+            identifiers.append(str(data[start:end], "utf-8"))
+            start = end
+
+        nodes = codec.decode(identifiers, _read_exact(file, _read_count(file)))
+        if len(nodes) != count:
+            raise ValueError("Node codec returned the wrong number of nodes")
+        yield identifiers, nodes
+
+
+def load_graph(graph: "ObjectGraph", file: IO[bytes], codec: NodeCodec) -> None:
+    """
+    Read a graph from *file* into the empty graph *graph*
+    """
+    magic, version = _HEADER.unpack(_read_exact(file, _HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Not an objectgraph file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported objectgraph file format version {version}")
+
+    nodes = graph._nodes
+    register = graph._register_node
+    numbering: list[str] = []
+    for identifiers, block in _read_node_blocks(file, codec):
+        nodes.update(zip(identifiers, block, strict=True))
+        for identifier in identifiers:
+            register(identifier)
+        numbering.extend(identifiers)
+
+    roots = _read_array(file, _read_count(file))
+    _check_indexes(roots, len(numbering), "root")
+    graph._roots.update(map(numbering.__getitem__, roots))
+
+    attribute_table = pickle.loads(_read_exact(file, _read_count(file)))
+
+    triples = _index_array()
+    while count := _read_count(file):
+        triples.extend(_read_array(file, 3 * count))
+
+    _check_indexes(triples[::3], len(numbering), "source")
+    _check_indexes(triples[1::3], len(numbering), "destination")
+    _check_indexes(triples[2::3], len(attribute_table), "attribute")
+    graph._load_edges(numbering, triples, attribute_table)
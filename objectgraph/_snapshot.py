@@ -0,0 +1,297 @@
+"""
+Read-only graph snapshots backed by a memory-mapped file
+
+The snapshot file consists of a fixed size header followed by a number
+of sections, each of which starts at an 8-byte aligned offset. Integers
+are stored in the native byte order of the system that wrote the file,
+snapshots are meant to be shared between processes on the same system.
+
+* Header: magic ``b"OGSN"``, 16-bit format version, 16-bit byte order
+  marker and the number of nodes, edges and roots and the size of the
+  edge attribute table (64-bit integers)
+
+* For nodes the identifier offsets, node payload offsets, outgoing edge
+  offsets and incoming edge offsets (64-bit integers, one more than the
+  number of nodes)
+
+* Outgoing edge targets, outgoing edge attributes, incoming edge
+  sources and incoming edge attributes (32-bit integers, one for every edge)
+
+* Root node numbers (32-bit integers)
+
+* The UTF-8 encoded identifiers and the node payloads
+
+* A pickled list of all unique sets of edge attributes (as tuples)
+
+Nodes are numbered by sorting the identifiers, which makes it possible
+to look up nodes without building a dictionary. The edges of a node
+are sorted by the number of the node on the other end of the edge.
+"""
+
+import mmap
+import os
+import pickle
+import struct
+import sys
+from array import array
+from typing import IO, TYPE_CHECKING, Any, Literal
+
+from ._csr import CSRGraph, build_csr
+from ._serialize import NodeCodec, PickleNodeCodec
+from ._types import EDGE_TYPE, NODE_TYPE
+
+if TYPE_CHECKING:  # pragma: nocover
+    from ._objectgraph import ObjectGraph
+
+MAGIC = b"OGSN"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("=4sHHQQQQ")
+_BYTE_ORDER = {"little": 1, "big": 2}[sys.byteorder]
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def write_snapshot(graph: "ObjectGraph", file: IO[bytes], codec: NodeCodec) -> None:
+    """
+    Write a snapshot of *graph* to *file* in the format described in
+    the module docstring.
+    """
+    csr = build_csr(graph)
+
+    encoded_identifiers = [identifier.encode("utf-8") for identifier in csr.identifiers]
+    payloads = [
+        codec.encode([graph._nodes[identifier]]) for identifier in csr.identifiers
+    ]
+
+    identifier_offsets = array("Q", [0])
+    payload_offsets = array("Q", [0])
+    for encoded, payload in zip(encoded_identifiers, payloads, strict=True):
+        identifier_offsets.append(identifier_offsets[-1] + len(encoded))
+        payload_offsets.append(payload_offsets[-1] + len(payload))
+
+    attribute_table = pickle.dumps(
+        [tuple(attributes) for attributes in csr.attribute_table],
+        pickle.HIGHEST_PROTOCOL,
+    )
+
+    sections: list[Any] = [
+        identifier_offsets,
+        payload_offsets,
+        csr.out_offsets,
+        csr.in_offsets,
+        csr.out_targets,
+        csr.out_attrs,
+        csr.in_sources,
+        csr.in_attrs,
+        csr.roots,
+        b"".join(encoded_identifiers),
+        b"".join(payloads),
+        attribute_table,
+    ]
+
+    file.write(
+        _HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            _BYTE_ORDER,
+            len(csr.identifiers),
+            len(csr.out_targets),
+            len(csr.roots),
+            len(attribute_table),
+        )
+    )
+    offset = _HEADER.size
+    for section in sections:
+        data = section.tobytes() if isinstance(section, array) else section
+        padding = _align(offset) - offset
+        file.write(b"\0" * padding)
+        file.write(data)
+        offset += padding + len(data)
+
+
+class GraphSnapshot(CSRGraph[NODE_TYPE, EDGE_TYPE]):
+    """
+    A read-only view on a graph snapshot written by :meth:`write`.
+
+    The snapshot file is memory-mapped and the graph structure is read
+    directly from the mapping, without deserializing it. Multiple
+    processes that open the same snapshot share the memory used for it.
+    Nodes are deserialized the first time they are needed.
+
+    This class supports the read-only API of :class:`ObjectGraph`, edge
+    attributes are returned as a :class:`frozenset`.
+
+    A snapshot can be used as a context manager, and is closed
+    when leaving the with block.
+
+    Args:
+      path: The path of the snapshot file
+
+      node_codec: Object used to deserialize nodes, this must
+             be compatible with the codec used to write the file.
+
+    Raises:
+      ValueError: If the file is not a valid snapshot file
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], *, node_codec: NodeCodec | None = None
+    ) -> None:
+        self._codec = node_codec if node_codec is not None else PickleNodeCodec()
+        self._decoded: dict[int, NODE_TYPE] = {}
+
+        with open(path, "rb") as stream:
+            self._mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._views: list[memoryview] = []
+        try:
+            self._init_views()
+        except BaseException:
+            self.close()
+            raise
+
+    @staticmethod
+    def write(
+        graph: "ObjectGraph[NODE_TYPE, EDGE_TYPE]",
+        file: IO[bytes],
+        *,
+        node_codec: NodeCodec | None = None,
+    ) -> None:
+        """
+        Write a snapshot of *graph* to *file*. Later changes to *graph*
+        are not reflected in the snapshot.
+
+        Args:
+          graph: The graph to write
+
+          file: A file opened for writing in binary mode
+
+          node_codec: Object used to serialize nodes, see
+                 :class:`objectgraph.NodeCodec`. Defaults to
+                 using :mod:`pickle`.
+        """
+        write_snapshot(
+            graph, file, node_codec if node_codec is not None else PickleNodeCodec()
+        )
+
+    def _init_views(self) -> None:
+        buffer = memoryview(self._mmap)
+        self._views.append(buffer)
+
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Not a graph snapshot")
+
+        (
+            magic,
+            version,
+            byte_order,
+            node_count,
+            edge_count,
+            root_count,
+            table_size,
+        ) = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a graph snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph snapshot format version {version}")
+        if byte_order != _BYTE_ORDER:
+            raise ValueError("Graph snapshot was written with a different byte order")
+
+        self._node_count = node_count
+        self._edge_count = edge_count
+
+        offset = _HEADER.size
+
+        def section(size: int, fmt: Literal["Q", "I"] | None) -> memoryview:
+            nonlocal offset
+            offset = _align(offset)
+            end = offset + size * (struct.calcsize(fmt) if fmt else 1)
+            if end > len(buffer):
+                raise ValueError("Truncated graph snapshot")
+            view = buffer[offset:end]
+            if fmt is not None:
+                view = view.cast(fmt)
+            self._views.append(view)
+            offset = end
+            return view
+
+        self._identifier_offsets = section(node_count + 1, "Q")
+        self._payload_offsets = section(node_count + 1, "Q")
+        self._out_offsets = section(node_count + 1, "Q")
+        self._in_offsets = section(node_count + 1, "Q")
+        self._out_targets = section(edge_count, "I")
+        self._out_attrs = section(edge_count, "I")
+        self._in_sources = section(edge_count, "I")
+        self._in_attrs = section(edge_count, "I")
+        self._roots = section(root_count, "I")
+        self._identifier_data = section(self._identifier_offsets[-1], None)
+        self._payload_data = section(self._payload_offsets[-1], None)
+        self._attribute_table = [
+            frozenset(attributes)
+            for attributes in pickle.loads(section(table_size, None))
+        ]
+
+    def close(self) -> None:
+        """
+        Close the snapshot. Nodes that were already returned
+        stay valid, but the snapshot can no longer be used.
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self) -> "GraphSnapshot[NODE_TYPE, EDGE_TYPE]":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _identifier(self, index: int) -> str:
+        start = self._identifier_offsets[index]
+        end = self._identifier_offsets[index + 1]
+        return str(self._identifier_data[start:end], "utf-8")
+
+    def _node(self, index: int) -> NODE_TYPE:
+        try:
+            return self._decoded[index]
+        except KeyError:
+            pass
+
+        start = self._payload_offsets[index]
+        end = self._payload_offsets[index + 1]
+        payload = self._payload_data[start:end].tobytes()
+        node = self._codec.decode([self._identifier(index)], payload)[0]
+        self._decoded[index] = node
+        return node
+
+    def _index(self, node: str | NODE_TYPE) -> int | None:
+        """
+        Return the node number for a node or node identifier,
+        or :data:`None` if the node is not part of the graph.
+        """
+        identifier = node if isinstance(node, str) else node.identifier
+        encoded = identifier.encode("utf-8")
+        offsets = self._identifier_offsets
+        data = self._identifier_data
+
+        def key(index: int) -> bytes:
+            start = offsets[index]
+            end = offsets[index + 1]
+            return data[start:end].tobytes()
+
+        low = 0
+        high = self._node_count
+        while low < high:
+            middle = (low + high) // 2
+            if key(middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self._node_count and key(low) == encoded:
+            return low
+        return None
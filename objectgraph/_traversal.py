@@ -0,0 +1,118 @@
+"""
+Graph traversal
+
+The functions in this module work on node keys (identifiers or
+node numbers) and a function that returns the successors for a
+key, and are shared between the graph implementations.
+"""
+
+import collections
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from typing import Literal, TypeVar
+
+KEY = TypeVar("KEY", bound=Hashable)
+
+TraversalOrder = Literal["dfs-pre", "dfs-post", "bfs"]
+
+
+def traverse(
+    start_keys: Iterable[KEY],
+    successors: Callable[[KEY], Iterable[KEY]],
+    order: TraversalOrder,
+    max_depth: int | None,
+) -> Iterator[KEY]:
+    """
+    Yield the keys of all nodes reachable from *start_keys*
+    in the given traversal order.
+
+    Raises:
+      ValueError: If *order* is not a valid traversal order
+    """
+    if order == "bfs":
+        return _iter_bfs(start_keys, successors, max_depth)
+
+    elif order in ("dfs-pre", "dfs-post"):
+        return _iter_dfs(start_keys, successors, max_depth, order == "dfs-post")
+
+    else:
+        raise ValueError(f"Invalid traversal order {order!r}")
+
+
+def _iter_dfs(
+    start_keys: Iterable[KEY],
+    successors: Callable[[KEY], Iterable[KEY]],
+    max_depth: int | None,
+    postorder: bool,
+) -> Iterator[KEY]:
+    """
+    Depth-first traversal starting at each of *start_keys* in turn
+    """
+    visited: set[KEY] = set()
+
+    for start_key in start_keys:
+        if start_key in visited:
+            continue
+
+        visited.add(start_key)
+        if not postorder:
+            yield start_key
+
+        if max_depth is not None and max_depth <= 0:
+            if postorder:
+                yield start_key
+            continue
+
+        # The stack contains the path from the start node to the
+        # current node, and an iterator for the successors of
+        # each node on that path that still need to be visited.
+        stack = [(start_key, iter(successors(start_key)))]
+        while stack:
+            current_key, pending = stack[-1]
+            for successor_key in pending:
+                if successor_key in visited:
+                    continue
+
+                visited.add(successor_key)
+                if not postorder:
+                    yield successor_key
+
+                if max_depth is None or len(stack) < max_depth:
+                    stack.append((successor_key, iter(successors(successor_key))))
+
+                elif postorder:
+                    yield successor_key
+
+                break
+
+            else:
+                stack.pop()
+                if postorder:
+                    yield current_key
+
+
+def _iter_bfs(
+    start_keys: Iterable[KEY],
+    successors: Callable[[KEY], Iterable[KEY]],
+    max_depth: int | None,
+) -> Iterator[KEY]:
+    """
+    Breadth-first traversal with all of *start_keys* at distance 0
+    """
+    visited: set[KEY] = set()
+    queue: collections.deque[tuple[KEY, int]] = collections.deque()
+    for start_key in start_keys:
+        if start_key not in visited:
+            visited.add(start_key)
+            queue.append((start_key, 0))
+
+    while queue:
+        current_key, depth = queue.popleft()
+        yield current_key
+
+        if max_depth is not None and depth >= max_depth:
+            continue
+
+        for successor_key in successors(current_key):
+            if successor_key not in visited:
+                visited.add(successor_key)
+                queue.append((successor_key, depth + 1))
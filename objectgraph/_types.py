@@ -0,0 +1,34 @@
+"""
+Type definitions shared by the graph implementations
+"""
+
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+from collections.abc import Set as AbstractSet
+from typing import Any, Protocol, TypeVar
+
+
+class GraphNode(Protocol):
+    @property
+    def identifier(self) -> str:  # pragma: nocover
+        ...  # pragma: nocover
+
+
+# The graph is generic for the types of nodes and edges,
+# mostly to make it easier to type-check code using the graph.
+NODE_TYPE = TypeVar("NODE_TYPE", bound=GraphNode)
+EDGE_TYPE = TypeVar("EDGE_TYPE", bound=Hashable)
+
+# Functions that return the outgoing edges of a node as
+# (edge_attributes, node) pairs.
+Expander = Callable[[NODE_TYPE], Iterable[tuple[EDGE_TYPE, NODE_TYPE]]]
+AsyncExpander = Callable[[NODE_TYPE], Awaitable[Iterable[tuple[EDGE_TYPE, NODE_TYPE]]]]
+
+# Functions that select edges by their set of attributes
+EdgeFilter = Callable[[AbstractSet[EDGE_TYPE]], bool]
+
+# Functions that return the data written for a node or an edge
+# by the exporters, as a mapping from key to value.
+NodeFormatter = Callable[[NODE_TYPE], Mapping[str, Any]]
+EdgeFormatter = Callable[
+    [NODE_TYPE, NODE_TYPE, AbstractSet[EDGE_TYPE]], Mapping[str, Any]
+]
@@ -0,0 +1,262 @@
+"""
+Read-only views on part of a graph
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, Generic
+
+from ._traversal import TraversalOrder, traverse
+from ._types import EDGE_TYPE, NODE_TYPE, EdgeFilter
+
+if TYPE_CHECKING:  # pragma: nocover
+    from ._objectgraph import ObjectGraph
+
+
+class SubgraphView(Generic[NODE_TYPE, EDGE_TYPE]):
+    """
+    A read-only view on the part of an :class:`ObjectGraph` with the nodes
+    selected by a predicate and/or a set of node identifiers, created by
+    :meth:`ObjectGraph.subgraph_view`.
+
+    The view does not copy the graph, changes to the graph are visible
+    through the view. The view supports the read-only API of
+    :class:`ObjectGraph`, edges are only visible when both ends of
+    the edge are part of the view.
+
+    Views with a set of node identifiers only look at the adjacency of
+    those nodes, views that only have a predicate check all nodes
+    of the graph in :meth:`nodes` and :meth:`edges`.
+    """
+
+    def __init__(
+        self,
+        graph: "ObjectGraph[NODE_TYPE, EDGE_TYPE]",
+        predicate: Callable[[NODE_TYPE], bool] | None,
+        node_ids: frozenset[str] | None,
+    ) -> None:
+        self._graph = graph
+        self._predicate = predicate
+        self._node_ids = node_ids
+
+    def _includes(self, node_id: str) -> bool:
+        """
+        Return True if *node_id* is part of the graph and the view
+        """
+        node = self._graph._nodes.get(node_id)
+        if node is None:
+            return False
+        if self._node_ids is not None and node_id not in self._node_ids:
+            return False
+        return self._predicate is None or self._predicate(node)
+
+    def _candidate_ids(self) -> Iterable[str]:
+        return self._node_ids if self._node_ids is not None else self._graph._nodes
+
+    def _successor_ids(self, node_id: str) -> Iterator[str]:
+        return filter(self._includes, self._graph._successor_ids(node_id))
+
+    def _successor_function(
+        self, edge_filter: EdgeFilter[EDGE_TYPE] | None
+    ) -> Callable[[str], Iterable[str]]:
+        """
+        Return the successor function for traversals that only
+        follow edges selected by *edge_filter*.
+        """
+        if edge_filter is None:
+            return self._successor_ids
+
+        def successors(node_id: str) -> Iterable[str]:
+            return [
+                destination_id
+                for destination_id, attributes in self._graph._successors(node_id)
+                if edge_filter(attributes) and self._includes(destination_id)
+            ]
+
+        return successors
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} of {self._graph!r}>"
+
+    def roots(self) -> Iterator[NODE_TYPE]:
+        """
+        Yield the roots of the graph that are part of the
+        view, in an arbitrary order.
+        """
+        nodes = self._graph._nodes
+        return (
+            nodes[node_id]
+            for node_id in list(self._graph._roots)
+            if self._includes(node_id)
+        )
+
+    def nodes(self) -> Iterator[NODE_TYPE]:
+        """
+        Yield all nodes in the view in an arbitrary order.
+        """
+        nodes = self._graph._nodes
+        return (
+            nodes[node_id]
+            for node_id in self._candidate_ids()
+            if self._includes(node_id)
+        )
+
+    def edges(self) -> Iterator[tuple[NODE_TYPE, NODE_TYPE, set[EDGE_TYPE]]]:
+        """
+        Yield the source and destination of all edges in the view with a
+        set of all unique edge attributes for edges between the two nodes.
+        """
+        graph = self._graph
+        nodes = graph._nodes
+        includes = self._includes
+        if self._node_ids is None:
+            for source_id, destination_id, attributes in graph._edge_items():
+                if includes(source_id) and includes(destination_id):
+                    yield nodes[source_id], nodes[destination_id], attributes
+            return
+
+        for source_id in self._node_ids:
+            if not includes(source_id):
+                continue
+
+            for destination_id, attributes in graph._successors(source_id):
+                if includes(destination_id):
+                    yield nodes[source_id], nodes[destination_id], attributes
+
+    def find_node(self, node: str | NODE_TYPE) -> NODE_TYPE | None:
+        """
+        Find a node in the view. If the argument is a node object
+        this looks for a graph member with the same *identifier*.
+
+        Args:
+          node: A node or node identifier
+
+        Returns:
+          The node found, or :data:`None` when the node is not present
+        """
+        node_id = node if isinstance(node, str) else node.identifier
+        if not self._includes(node_id):
+            return None
+        return self._graph._nodes[node_id]
+
+    def __contains__(self, node: str | NODE_TYPE) -> bool:
+        """
+        Check if a node is a member of the view
+
+        Args:
+          node: The node or node identifier to look for
+
+        Returns:
+          True if the node is part of the view, False otherwise
+        """
+        return self.find_node(node) is not None
+
+    def edge_data(
+        self, source: str | NODE_TYPE, destination: str | NODE_TYPE
+    ) -> set[EDGE_TYPE]:
+        """
+        Return the all edge attributes for edges between *source* and *destination*.
+
+        Args:
+          source: A node or node identifier
+          destination: A node or node identifier
+
+        Returns:
+          A set of edge attributes for all edges between *source* and *destination*
+
+        Raises:
+          KeyError: If *source* or *destination* aren't member of the view
+          KeyError: If there is no edge between *source* and *destination*
+        """
+        if self.find_node(source) is None:
+            raise KeyError(f"Source {source!r} not found")
+        if self.find_node(destination) is None:
+            raise KeyError(f"Destination {destination!r} not found")
+        return self._graph.edge_data(source, destination)
+
+    def outgoing(
+        self,
+        source: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[tuple[set[EDGE_TYPE], NODE_TYPE]]:
+        """
+        Yield (edge, node) for all outgoing edges in the view
+
+        Args:
+          source: A node or node identifier
+          edge_filter: If not :data:`None` only yield edges for which
+                 this function returns true when called with the set
+                 of edge attributes.
+        """
+        node = self.find_node(source)
+        if node is None:
+            return
+
+        nodes = self._graph._nodes
+        for destination_id, attributes in self._graph._successors(node.identifier):
+            if (edge_filter is None or edge_filter(attributes)) and self._includes(
+                destination_id
+            ):
+                yield attributes, nodes[destination_id]
+
+    def incoming(
+        self,
+        destination: str | NODE_TYPE,
+        *,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[tuple[set[EDGE_TYPE], NODE_TYPE]]:
+        """
+        Yield (edge, node) for all incoming edges in the view
+
+        Args:
+          destination: A node or node identifier
+          edge_filter: If not :data:`None` only yield edges for which
+                 this function returns true when called with the set
+                 of edge attributes.
+        """
+        node = self.find_node(destination)
+        if node is None:
+            return
+
+        nodes = self._graph._nodes
+        for source_id, attributes in self._graph._predecessors(node.identifier):
+            if (edge_filter is None or edge_filter(attributes)) and self._includes(
+                source_id
+            ):
+                yield attributes, nodes[source_id]
+
+    def iter_graph(
+        self,
+        *,
+        node: str | NODE_TYPE | None = None,
+        order: TraversalOrder = "dfs-pre",
+        max_depth: int | None = None,
+        edge_filter: EdgeFilter[EDGE_TYPE] | None = None,
+    ) -> Iterator[NODE_TYPE]:
+        """
+        Yield all nodes in the view reachable from *node* or any of
+        the roots in the view, only following edges in the view.
+
+        See :meth:`ObjectGraph.iter_graph` for a description
+        of the arguments.
+
+        Raises:
+          KeyError: If *node* is not part of the view
+          ValueError: If *order* is not a valid traversal order
+        """
+        if node is None:
+            start_ids = [root.identifier for root in self.roots()]
+
+        else:
+            start_node = self.find_node(node)
+            if start_node is None:
+                raise KeyError(f"Start node {node!r} not found")
+
+            start_ids = [start_node.identifier]
+
+        yield from map(
+            self._graph._nodes.__getitem__,
+            traverse(
+                start_ids, self._successor_function(edge_filter), order, max_depth
+            ),
+        )
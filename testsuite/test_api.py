@@ -2,7 +2,23 @@ import unittest
 
 import objectgraph
 
-PUBLIC_SYMBOLS = {"ObjectGraph", "NODE_TYPE", "EDGE_TYPE"}
+PUBLIC_SYMBOLS = {
+    "ObjectGraph",
+    "CompactObjectGraph",
+    "Component",
+    "ConcurrentObjectGraph",
+    "CycleError",
+    "FrozenObjectGraph",
+    "GraphDiff",
+    "GraphEvent",
+    "GraphSnapshot",
+    "NodeCodec",
+    "OperationStats",
+    "PickleNodeCodec",
+    "SubgraphView",
+    "NODE_TYPE",
+    "EDGE_TYPE",
+}
 
 PYTHON_SYMBOLS = {
     "__loader__",
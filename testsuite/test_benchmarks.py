@@ -0,0 +1,73 @@
+import unittest
+
+import objectgraph
+from benchmarks import generators, operations, runner
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generators(self):
+        for name in generators.GENERATORS:
+            with self.subTest(name):
+                data = generators.generate(name, 200, 1)
+                again = generators.generate(name, 200, 1)
+                self.assertEqual(data.edges, again.edges)
+                self.assertEqual(data.roots, again.roots)
+                self.assertGreater(len(data.edges), 150)
+                self.assertLessEqual(len(data.edges), 200)
+
+                identifiers = {node.identifier for node in data.nodes}
+                self.assertEqual(len(identifiers), len(data.nodes))
+                self.assertLessEqual(set(data.roots), identifiers)
+                for source, destination, attributes in data.edges:
+                    self.assertIn(source, identifiers)
+                    self.assertIn(destination, identifiers)
+                    self.assertIn(attributes, generators.EDGE_KINDS)
+
+    def test_run_and_compare(self):
+        document = runner.run_benchmarks(
+            graph_classes=[objectgraph.ObjectGraph],
+            generators=["random", "module"],
+            sizes=[100],
+            benchmarks=list(operations.BENCHMARKS),
+            repeat=1,
+            seed=0,
+            memory=True,
+        )
+        self.assertEqual(len(document["results"]), 2 * len(operations.BENCHMARKS))
+        for result in document["results"]:
+            self.assertGreaterEqual(result["seconds"], 0)
+            self.assertGreaterEqual(result["peak_memory"], 0)
+
+        lines, regressions = runner.compare_results(document, document, 1.25)
+        self.assertEqual(regressions, [])
+        self.assertEqual(len(lines), 1 + len(document["results"]))
+
+        slower = {
+            "metadata": document["metadata"],
+            "results": [
+                {**result, "seconds": result["seconds"] * 2 + 1}
+                for result in document["results"][:3]
+            ],
+        }
+        lines, regressions = runner.compare_results(document, slower, 1.25)
+        self.assertEqual(len(regressions), 3)
+        self.assertIn("only in baseline", lines[-1])
+
+        with self.assertRaises(ValueError):
+            runner.run_benchmarks(
+                graph_classes=[],
+                generators=[],
+                sizes=[],
+                benchmarks=[],
+                repeat=0,
+                seed=0,
+                memory=False,
+            )
+
+    def test_parse_sizes(self):
+        self.assertEqual(runner.parse_sizes("1000,1e4, 2e5"), [1000, 10000, 200000])
+        self.assertEqual(
+            runner.graph_classes(["CompactObjectGraph"]),
+            [objectgraph.CompactObjectGraph],
+        )
+        self.assertRaises(KeyError, runner.graph_classes, ["GraphDiff"])
@@ -0,0 +1,136 @@
+import objectgraph
+from objectgraph._compact import _HUB_DEGREE
+
+from .test_objectgraph import Node, TestObjectGraph
+
+
+class TestCompactObjectGraph(TestObjectGraph):
+    graph_class = objectgraph.CompactObjectGraph
+
+    def test_attribute_slots(self):
+        graph = self.graph_class()
+
+        n1 = Node("n1")
+        n2 = Node("n2")
+        graph.add_node(n1)
+        graph.add_node(n2)
+
+        graph.add_edge(n1, n2, "a")
+        self.assertEqual(graph._succ_attrs[graph._index["n1"]], ["a"])
+        self.assertEqual(graph._pred_attrs[graph._index["n2"]], ["a"])
+
+        graph.add_edge(n1, n2, "a")
+        self.assertEqual(graph._succ_attrs[graph._index["n1"]], ["a"])
+
+        graph.add_edge(n1, n2, "b")
+        slot = graph._succ_attrs[graph._index["n1"]][0]
+        self.assertEqual(slot, {"a", "b"})
+        self.assertIs(graph._pred_attrs[graph._index["n2"]][0], slot)
+        self.assertEqual(list(graph.incoming(n2)), [({"a", "b"}, n1)])
+
+        graph.remove_edge(n1, n2, "a")
+        graph.remove_edge(n1, n2, "b")
+        self.assertEqual(graph.edge_data(n1, n2), set())
+        self.assertRaises(KeyError, graph.remove_edge, n1, n2, "b")
+
+        graph.remove_all_edges(n1, n2)
+        graph.add_edge(n2, n1, None)
+        graph.remove_edge(n2, n1, None)
+        self.assertEqual(graph.edge_data(n2, n1), set())
+        self.assertEqual(
+            repr(graph), "<CompactObjectGraph with 0 roots, 2 nodes and 1 edges>"
+        )
+
+    def test_index_reuse(self):
+        graph = self.graph_class()
+
+        graph.add_nodes([Node("n1"), Node("n2"), Node("n3")])
+        graph.add_edges([("n1", "n2", 1), ("n2", "n3", 2), ("n3", "n1", 3)])
+
+        old_index = graph._index["n2"]
+        graph.remove_node("n2")
+        self.assertEqual(
+            repr(graph), "<CompactObjectGraph with 0 roots, 2 nodes and 1 edges>"
+        )
+
+        n4 = Node("n4")
+        graph.add_node(n4)
+        self.assertEqual(graph._index["n4"], old_index)
+        self.assertEqual(list(graph.outgoing(n4)), [])
+        self.assertEqual(list(graph.incoming(n4)), [])
+
+        graph.add_edge("n1", n4, 4)
+        self.assertEqual(
+            sorted((s.identifier, d.identifier, a) for s, d, a in graph.edges()),
+            [("n1", "n4", {4}), ("n3", "n1", {3})],
+        )
+
+    def test_hub_index(self):
+        graph = self.graph_class()
+
+        graph.add_nodes(Node(f"n{idx}") for idx in range(200))
+        graph.add_edges((f"n{idx}", "n0", idx) for idx in range(1, 200))
+        graph.add_edges(("n0", f"n{idx}", idx) for idx in range(1, 200))
+        hub = graph._index["n0"]
+        self.assertIn(hub, graph._succ_hubs)
+        self.assertIn(hub, graph._pred_hubs)
+        self.assertEqual(graph.add_edges([("n0", "n5", 5), ("n5", "n0", 5)]), 0)
+
+        graph.add_edge("n0", "n7", "x")
+        self.assertEqual(graph.edge_data("n0", "n7"), {7, "x"})
+        self.assertEqual(graph.edge_data("n7", "n0"), {7})
+
+        for idx in range(1, 200, 3):
+            graph.remove_all_edges("n0", f"n{idx}")
+        graph.remove_node("n2")
+
+        self.assertCountEqual(
+            [node.identifier for _, node in graph.outgoing("n0")],
+            [f"n{idx}" for idx in range(3, 200) if idx % 3 != 1],
+        )
+        self.assertEqual(len(list(graph.incoming("n0"))), 198)
+        for _, node in graph.outgoing("n0"):
+            self.assertEqual(
+                [other.identifier for _, other in graph.incoming(node)], ["n0"]
+            )
+            self.assertIsNotNone(graph._edge_attributes("n0", node.identifier))
+        self.assertIsNone(graph._edge_attributes("n0", "n4"))
+
+        graph.remove_node("n0")
+        self.assertNotIn(hub, graph._succ_hubs)
+        self.assertNotIn(hub, graph._pred_hubs)
+        self.assertEqual(len(list(graph.edges())), 0)
+
+    def test_hub_degree(self):
+        # Adding edges one by one and in bulk creates the hub index
+        # at the same degree.
+        for degree in (_HUB_DEGREE, _HUB_DEGREE + 1):
+            single = self.graph_class()
+            bulk = self.graph_class()
+            for graph in (single, bulk):
+                graph.add_nodes(Node(f"n{idx}") for idx in range(degree + 1))
+
+            for idx in range(1, degree + 1):
+                single.add_edge("n0", f"n{idx}", None)
+                single.add_edge(f"n{idx}", "n0", None)
+
+            neighbours = [f"n{idx}" for idx in range(1, degree + 1)]
+            bulk._insert_new_edges(
+                ["n0"] * degree + neighbours,
+                neighbours + ["n0"] * degree,
+                [{None} for _ in range(2 * degree)],
+            )
+
+            for graph in (single, bulk):
+                with self.subTest(degree=degree, bulk=graph is bulk):
+                    hub = graph._index["n0"]
+                    self.assertEqual(hub in graph._succ_hubs, degree > _HUB_DEGREE)
+                    self.assertEqual(hub in graph._pred_hubs, degree > _HUB_DEGREE)
+                    if degree > _HUB_DEGREE:
+                        self.assertEqual(
+                            graph._succ_hubs[hub],
+                            {
+                                graph._index[node_id]: pos
+                                for pos, node_id in enumerate(neighbours)
+                            },
+                        )
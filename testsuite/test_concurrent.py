@@ -0,0 +1,272 @@
+import asyncio
+import inspect
+import threading
+
+import objectgraph
+
+from .test_objectgraph import Node, TestObjectGraph
+
+# Public methods of ObjectGraph that don't hold the lock: the coroutines
+# can't hold the lock while waiting, and the class methods create a
+# new graph.
+UNLOCKED_METHODS = {"crawl", "async_iter_graph", "from_edges", "load"}
+
+
+def public_methods(cls):
+    return {
+        name
+        for name, value in vars(cls).items()
+        if not name.startswith("_")
+        or (name.startswith("__") and callable(value) and name != "__init__")
+    }
+
+
+class ConcurrentCompactObjectGraph(
+    objectgraph.ConcurrentObjectGraph, objectgraph.CompactObjectGraph
+):
+    pass
+
+
+class TestConcurrentObjectGraph(TestObjectGraph):
+    graph_class = objectgraph.ConcurrentObjectGraph
+
+    def run_threads(self, count, function):
+        barrier = threading.Barrier(count)
+        errors = []
+
+        def worker(idx):
+            barrier.wait()
+            try:
+                function(idx)
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+    def test_instrumentation_copy(self):
+        self.skipTest("The lock of the graph can't be pickled or copied")
+
+    def test_concurrent_add_edge(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(str(idx)) for idx in range(20))
+
+        def worker(idx):
+            for source in range(20):
+                for destination in range(20):
+                    graph.add_edge(str(source), str(destination), idx)
+
+        self.run_threads(8, worker)
+
+        self.assertEqual(len(list(graph.edges())), 400)
+        for _, _, attributes in graph.edges():
+            self.assertEqual(attributes, set(range(8)))
+
+    def test_concurrent_bulk_insert(self):
+        graph = self.graph_class()
+        graph.add_node(Node("hub"))
+
+        def worker(idx):
+            nodes = [Node(f"{idx}-{n}") for n in range(200)]
+            graph.add_nodes(nodes)
+            graph.add_edges(
+                (nodes[n], nodes[(n + 1) % len(nodes)], idx) for n in range(200)
+            )
+            graph.add_edges(("hub", node, None) for node in nodes[::10])
+
+        self.run_threads(8, worker)
+
+        self.assertEqual(len(list(graph.nodes())), 1601)
+        self.assertEqual(len(list(graph.edges())), 1600 + 160)
+        self.assertEqual(len(list(graph.reachable_from("hub"))), 1601)
+
+    def test_iterate_while_mutating(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(str(idx)) for idx in range(100))
+        graph.add_root("0")
+        stop = threading.Event()
+
+        def worker(idx):
+            if idx == 0:
+                try:
+                    for n in range(2000):
+                        node = Node(f"extra-{n}")
+                        graph.add_node(node)
+                        graph.add_edge("0", node, None)
+                        graph.add_edge(node, str(n % 100), None)
+                        if n % 3 == 0:
+                            graph.remove_node(node)
+                finally:
+                    stop.set()
+
+            else:
+                while not stop.is_set():
+                    for _ in graph.edges():
+                        pass
+                    for _ in graph.outgoing("0"):
+                        pass
+                    for _ in graph.iter_graph():
+                        pass
+                    graph.is_reachable("0", "50")
+
+        self.run_threads(4, worker)
+
+    def test_snapshot_iteration(self):
+        graph = self.graph_class()
+        graph.add_nodes([Node("n1"), Node("n2"), Node("n3")])
+        graph.add_edge("n1", "n2", "a")
+
+        nodes = graph.nodes()
+        edges = graph.edges()
+        outgoing = graph.outgoing("n1")
+        graph.add_edge("n1", "n3", "b")
+        graph.add_edge("n1", "n2", "c")
+        graph.remove_node("n3")
+
+        self.assertEqual(sorted(node.identifier for node in nodes), ["n1", "n2", "n3"])
+        self.assertEqual(
+            [(s.identifier, d.identifier, a) for s, d, a in edges],
+            [("n1", "n2", {"a"})],
+        )
+        self.assertEqual([(a, n.identifier) for a, n in outgoing], [({"a"}, "n2")])
+
+    def test_levels_cycle_snapshot(self):
+        graph = self.graph_class()
+        graph.add_nodes([Node("n1"), Node("n2"), Node("n3")])
+        graph.add_edge("n1", "n2", None)
+        graph.add_edge("n2", "n3", None)
+        graph.add_edge("n3", "n2", None)
+
+        levels = graph.levels()
+        graph.remove_node("n3")
+        self.assertEqual([n.identifier for n in next(levels)], ["n1"])
+        with self.assertRaises(objectgraph.CycleError):
+            next(levels)
+
+    def check_locked(self, cls, locked_class, unlocked):
+        methods = public_methods(cls)
+        self.assertLessEqual(unlocked, methods - set(vars(locked_class)))
+
+        for name in sorted(methods - unlocked):
+            with self.subTest(method=name):
+                self.assertIn(name, vars(locked_class))
+
+    def test_public_api_is_locked(self):
+        self.check_locked(
+            objectgraph.ObjectGraph, objectgraph.ConcurrentObjectGraph, UNLOCKED_METHODS
+        )
+
+        # The locked methods aren't shadowed by other base classes
+        for name in public_methods(objectgraph.ConcurrentObjectGraph):
+            with self.subTest(method=name):
+                self.assertIs(
+                    inspect.getattr_static(self.graph_class, name),
+                    vars(objectgraph.ConcurrentObjectGraph)[name],
+                )
+
+    def test_view_api_is_locked(self):
+        view_class = type(self.graph_class().subgraph_view())
+        self.assertTrue(issubclass(view_class, objectgraph.SubgraphView))
+        self.check_locked(objectgraph.SubgraphView, view_class, set())
+
+    def test_locked_methods(self):
+        # The generated methods keep the name and documentation, and
+        # return a snapshot for methods that return an iterator.
+        graph = self.graph_class()
+        graph.add_nodes([Node("n1"), Node("n2")])
+        graph.add_edge("n1", "n2", None)
+
+        method = type(graph).strongly_connected_components
+        self.assertEqual(method.__name__, "strongly_connected_components")
+        self.assertEqual(
+            method.__doc__,
+            objectgraph.ObjectGraph.strongly_connected_components.__doc__,
+        )
+
+        components = graph.strongly_connected_components()
+        path = graph.all_shortest_paths("n1", "n2")
+        version = graph.version
+        graph.remove_node("n2")
+        self.assertEqual(
+            sorted(node.identifier for c in components for node in c), ["n1", "n2"]
+        )
+        self.assertEqual([[n.identifier for n in p] for p in path], [["n1", "n2"]])
+        self.assertGreater(graph.version, version)
+        self.assertIn("n1", graph)
+        self.assertNotIn("n2", graph)
+
+    def test_view_while_mutating(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(str(idx)) for idx in range(100))
+        graph.add_root("0")
+        view = graph.subgraph_view(lambda node: not node.identifier.startswith("x"))
+        stop = threading.Event()
+
+        def worker(idx):
+            if idx == 0:
+                try:
+                    for n in range(2000):
+                        node = Node(f"extra-{n}")
+                        graph.add_node(node)
+                        graph.add_edge("0", node, None)
+                        graph.add_edge(node, str(n % 100), None)
+                        if n % 3 == 0:
+                            graph.remove_node(node)
+                finally:
+                    stop.set()
+
+            else:
+                while not stop.is_set():
+                    for _ in view.nodes():
+                        pass
+                    for _ in view.edges():
+                        pass
+                    for _ in view.outgoing("0"):
+                        pass
+                    for _ in view.iter_graph():
+                        pass
+
+        self.run_threads(4, worker)
+
+        nodes = view.nodes()
+        graph.add_node(Node("new"))
+        self.assertNotIn("new", [node.identifier for node in nodes])
+        self.assertIn("new", view)
+
+    def test_crawl_while_adding(self):
+        # Another thread adds the nodes found by expand, which
+        # must not cause errors in crawl.
+        count = 500
+
+        async def expand(node):
+            await asyncio.sleep(0)
+            value = int(node.identifier)
+            if value >= count:
+                return []
+            return [(None, Node(str(value + 1))), (None, Node(str(value + 2)))]
+
+        graph = self.graph_class()
+        graph.add_node(Node("0"))
+
+        def worker(idx):
+            if idx == 0:
+                asyncio.run(graph.crawl([Node("0")], expand, concurrency=4))
+            else:
+                for value in range(1, count + 2):
+                    graph.add_nodes([Node(str(value))], ignore_existing=True)
+
+        self.run_threads(2, worker)
+
+        self.assertEqual(len(list(graph.nodes())), count + 2)
+        self.assertEqual(len(list(graph.edges())), 2 * count)
+        self.assertEqual(len(list(graph.reachable_from("0"))), count + 2)
+
+
+class TestConcurrentCompactObjectGraph(TestConcurrentObjectGraph):
+    graph_class = ConcurrentCompactObjectGraph
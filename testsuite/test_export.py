@@ -0,0 +1,258 @@
+import io
+import json
+import unittest
+import xml.etree.ElementTree as ET
+
+import objectgraph
+
+from .test_objectgraph import Node, sample_graph
+
+GRAPH_CLASSES = (
+    objectgraph.ObjectGraph,
+    objectgraph.CompactObjectGraph,
+    objectgraph.ConcurrentObjectGraph,
+)
+
+NS = {"g": "http://graphml.graphdrawing.org/xmlns"}
+
+
+class TestExport(unittest.TestCase):
+    def test_dot(self):
+        for graph_class in GRAPH_CLASSES:
+            with self.subTest(graph_class=graph_class):
+                graph = sample_graph(graph_class)
+
+                stream = io.StringIO()
+                graph.write_dot(stream)
+                lines = stream.getvalue().splitlines()
+
+                self.assertEqual(lines[0], "digraph G {")
+                self.assertEqual(lines[-1], "}")
+                self.assertCountEqual(
+                    lines[1:-1],
+                    [
+                        '  "n1" [root="true"];',
+                        '  "n2";',
+                        '  "quote\\"d";',
+                        '  "<ñ4>";',
+                        '  "n5";',
+                        '  "n1" -> "n2" [label="conditional, toplevel"];',
+                        '  "n2" -> "quote\\"d" [label="None"];',
+                        '  "quote\\"d" -> "quote\\"d" [label="(\'nested\', 1)"];',
+                        '  "quote\\"d" -> "n1" [label="toplevel"];',
+                        '  "<ñ4>" -> "n2" [label="toplevel"];',
+                        '  "n5" -> "n1";',
+                    ],
+                )
+
+                stream = io.StringIO()
+                graph.write_dot(
+                    stream,
+                    node_formatter=lambda node: {"label": node.identifier.upper()},
+                    edge_formatter=lambda source, destination, attributes: {
+                        "weight": len(attributes)
+                    },
+                    reachable=True,
+                )
+                self.assertEqual(
+                    stream.getvalue().splitlines(),
+                    [
+                        "digraph G {",
+                        '  "n1" [label="N1", root="true"];',
+                        '  "n1" -> "n2" [weight="2"];',
+                        '  "n2" [label="N2"];',
+                        '  "n2" -> "quote\\"d" [weight="1"];',
+                        '  "quote\\"d" [label="QUOTE\\"D"];',
+                        '  "quote\\"d" -> "quote\\"d" [weight="1"];',
+                        '  "quote\\"d" -> "n1" [weight="1"];',
+                        "}",
+                    ],
+                )
+
+    def test_graphml(self):
+        for graph_class in GRAPH_CLASSES:
+            with self.subTest(graph_class=graph_class):
+                graph = sample_graph(graph_class)
+
+                stream = io.StringIO()
+                graph.write_graphml(stream)
+                root = ET.fromstring(stream.getvalue())
+
+                self.assertEqual(
+                    sorted(
+                        (key.get("for"), key.get("attr.name"), key.get("attr.type"))
+                        for key in root.findall("g:key", NS)
+                    ),
+                    [("edge", "label", "string"), ("node", "root", "boolean")],
+                )
+
+                (element,) = root.findall("g:graph", NS)
+                self.assertEqual(element.get("edgedefault"), "directed")
+
+                nodes = {
+                    node.get("id"): {
+                        data.get("key"): data.text
+                        for data in node.findall("g:data", NS)
+                    }
+                    for node in element.findall("g:node", NS)
+                }
+                self.assertEqual(
+                    nodes,
+                    {
+                        "n1": {"node-root": "true"},
+                        "n2": {},
+                        'quote"d': {},
+                        "<ñ4>": {},
+                        "n5": {},
+                    },
+                )
+
+                edges = sorted(
+                    (
+                        edge.get("source"),
+                        edge.get("target"),
+                        [data.text for data in edge.findall("g:data", NS)],
+                    )
+                    for edge in element.findall("g:edge", NS)
+                )
+                self.assertEqual(
+                    edges,
+                    [
+                        ("<ñ4>", "n2", ["toplevel"]),
+                        ("n1", "n2", ["conditional, toplevel"]),
+                        ("n2", 'quote"d', ["None"]),
+                        ("n5", "n1", []),
+                        ('quote"d', "n1", ["toplevel"]),
+                        ('quote"d', 'quote"d', ["('nested', 1)"]),
+                    ],
+                )
+
+                stream = io.StringIO()
+                graph.write_graphml(
+                    stream,
+                    node_formatter=lambda node: {"name": f"<{node.identifier}>"},
+                    node_keys=["name"],
+                    edge_keys=[],
+                    edge_formatter=lambda source, destination, attributes: {},
+                    reachable=True,
+                )
+                root = ET.fromstring(stream.getvalue())
+                self.assertCountEqual(
+                    [
+                        data.text
+                        for data in root.findall("g:graph/g:node/g:data", NS)
+                        if data.get("key") == "node-name"
+                    ],
+                    ["<n1>", "<n2>", '<quote"d>'],
+                )
+                self.assertEqual(len(root.findall("g:graph/g:edge", NS)), 4)
+
+                with self.assertRaisesRegex(ValueError, "Undeclared GraphML node key"):
+                    graph.write_graphml(
+                        io.StringIO(), node_formatter=lambda node: {"name": 1}
+                    )
+
+    def test_jsonl(self):
+        for graph_class in GRAPH_CLASSES:
+            with self.subTest(graph_class=graph_class):
+                graph = sample_graph(graph_class)
+
+                stream = io.StringIO()
+                graph.write_jsonl(stream)
+                records = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+                self.assertCountEqual(
+                    records,
+                    [
+                        {"type": "node", "id": "n1", "root": True},
+                        {"type": "node", "id": "n2"},
+                        {"type": "node", "id": 'quote"d'},
+                        {"type": "node", "id": "<ñ4>"},
+                        {"type": "node", "id": "n5"},
+                        {
+                            "type": "edge",
+                            "source": "n1",
+                            "destination": "n2",
+                            "attributes": ["conditional", "toplevel"],
+                        },
+                        {
+                            "type": "edge",
+                            "source": "n2",
+                            "destination": 'quote"d',
+                            "attributes": [None],
+                        },
+                        {
+                            "type": "edge",
+                            "source": 'quote"d',
+                            "destination": 'quote"d',
+                            "attributes": [["nested", 1]],
+                        },
+                        {
+                            "type": "edge",
+                            "source": 'quote"d',
+                            "destination": "n1",
+                            "attributes": ["toplevel"],
+                        },
+                        {
+                            "type": "edge",
+                            "source": "<ñ4>",
+                            "destination": "n2",
+                            "attributes": ["toplevel"],
+                        },
+                        {
+                            "type": "edge",
+                            "source": "n5",
+                            "destination": "n1",
+                            "attributes": [],
+                        },
+                    ],
+                )
+
+                stream = io.StringIO()
+                graph.write_jsonl(
+                    stream,
+                    node_formatter=lambda node: {"node": node, "type": "ignored"},
+                    edge_formatter=lambda source, destination, attributes: {},
+                    reachable=True,
+                )
+                records = [json.loads(line) for line in stream.getvalue().splitlines()]
+                self.assertEqual(
+                    records,
+                    [
+                        {
+                            "node": "<node 'n1'>",
+                            "type": "node",
+                            "id": "n1",
+                            "root": True,
+                        },
+                        {"type": "edge", "source": "n1", "destination": "n2"},
+                        {"node": "<node 'n2'>", "type": "node", "id": "n2"},
+                        {"type": "edge", "source": "n2", "destination": 'quote"d'},
+                        {"node": "<node 'quote\"d'>", "type": "node", "id": 'quote"d'},
+                        {"type": "edge", "source": 'quote"d', "destination": 'quote"d'},
+                        {"type": "edge", "source": 'quote"d', "destination": "n1"},
+                    ],
+                )
+
+    def test_streaming(self):
+        graph = objectgraph.ObjectGraph()
+        graph.add_nodes(Node(str(idx)) for idx in range(1000))
+        graph.add_root("0")
+        graph.add_edges((str(idx), str(idx + 1), None) for idx in range(999))
+
+        class Writer:
+            def __init__(self):
+                self.count = 0
+                self.largest = 0
+
+            def write(self, text):
+                self.count += 1
+                self.largest = max(self.largest, len(text))
+
+        for method in (graph.write_dot, graph.write_graphml, graph.write_jsonl):
+            for reachable in (False, True):
+                with self.subTest(method=method.__name__, reachable=reachable):
+                    writer = Writer()
+                    method(writer, reachable=reachable)
+                    self.assertGreaterEqual(writer.count, 1999)
+                    self.assertLess(writer.largest, 200)
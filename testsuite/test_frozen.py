@@ -0,0 +1,110 @@
+import unittest
+
+import objectgraph
+
+from .test_objectgraph import sample_graph
+from .test_serialize import graph_state
+
+
+class TestFrozenObjectGraph(unittest.TestCase):
+    def test_queries(self):
+        graph = sample_graph()
+        frozen = graph.freeze()
+
+        self.assertIsInstance(frozen, objectgraph.FrozenObjectGraph)
+        self.assertEqual(
+            repr(frozen), "<FrozenObjectGraph with 1 roots, 5 nodes and 6 edges>"
+        )
+        self.assertEqual(graph_state(frozen), graph_state(graph))
+        for node in graph.nodes():
+            self.assertIs(frozen.find_node(node.identifier), node)
+            self.assertIs(frozen.find_node(node), node)
+        self.assertIsNone(frozen.find_node("n6"))
+        self.assertNotIn("n6", frozen)
+
+        self.assertEqual(frozen.edge_data("n1", "n2"), {"conditional", "toplevel"})
+        self.assertIsInstance(frozen.edge_data("n1", "n2"), frozenset)
+        self.assertRaises(KeyError, frozen.edge_data, "n2", "n1")
+        self.assertRaises(KeyError, frozen.edge_data, "n6", "n1")
+        self.assertRaises(KeyError, frozen.edge_data, "n1", "n6")
+
+        self.assertEqual(
+            [(a, n.identifier) for a, n in frozen.outgoing('quote"d')],
+            [({"toplevel"}, "n1"), ({("nested", 1)}, 'quote"d')],
+        )
+        self.assertEqual(
+            [(a, n.identifier) for a, n in frozen.incoming("n2")],
+            [({"toplevel"}, "<ñ4>"), ({"conditional", "toplevel"}, "n1")],
+        )
+        self.assertEqual(
+            [(a, n.identifier) for a, n in frozen.incoming("n1")],
+            [(set(), "n5"), ({"toplevel"}, 'quote"d')],
+        )
+        self.assertEqual(list(frozen.outgoing("n6")), [])
+
+        self.assertEqual(frozen.out_degree('quote"d'), 2)
+        self.assertEqual(frozen.in_degree("n2"), 2)
+        self.assertEqual(frozen.in_degree("n5"), 0)
+        self.assertRaises(KeyError, frozen.out_degree, "n6")
+        self.assertRaises(KeyError, frozen.in_degree, "n6")
+
+        self.assertEqual(
+            [n.identifier for n in frozen.iter_graph()], ["n1", "n2", 'quote"d']
+        )
+        self.assertEqual(
+            [n.identifier for n in frozen.iter_graph(order="dfs-post")],
+            ['quote"d', "n2", "n1"],
+        )
+        self.assertEqual(
+            [n.identifier for n in frozen.iter_graph(node="n5")],
+            ["n5", "n1", "n2", 'quote"d'],
+        )
+
+        self.assertEqual(
+            [
+                n.identifier
+                for n in frozen.iter_graph(edge_filter=lambda a: None not in a)
+            ],
+            ["n1", "n2"],
+        )
+        self.assertEqual(
+            [
+                (a, n.identifier)
+                for a, n in frozen.outgoing(
+                    'quote"d', edge_filter=lambda a: "toplevel" in a
+                )
+            ],
+            [({"toplevel"}, "n1")],
+        )
+
+        self.assertTrue(frozen.is_root_reachable('quote"d'))
+        self.assertFalse(frozen.is_root_reachable("<ñ4>"))
+        self.assertRaises(KeyError, frozen.is_root_reachable, "n6")
+
+    def test_immutable_copy(self):
+        graph = sample_graph()
+        frozen = graph.freeze()
+
+        graph.add_edge("<ñ4>", "n5", None)
+        graph.remove_node("n1")
+
+        self.assertIn("n1", frozen)
+        self.assertRaises(KeyError, frozen.edge_data, "<ñ4>", "n5")
+        self.assertFalse(hasattr(frozen, "add_edge"))
+
+    def test_equality(self):
+        frozen1 = sample_graph().freeze()
+        frozen2 = sample_graph().freeze()
+
+        self.assertEqual(frozen1, frozen2)
+        self.assertEqual(hash(frozen1), hash(frozen2))
+        self.assertEqual(len({frozen1, frozen2}), 1)
+        self.assertNotEqual(frozen1, object())
+
+        graph = sample_graph()
+        graph.add_edge("n5", "n2", "d")
+        self.assertNotEqual(frozen1, graph.freeze())
+
+        graph = sample_graph()
+        graph.add_root("n5")
+        self.assertNotEqual(frozen1, graph.freeze())
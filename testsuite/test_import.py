@@ -0,0 +1,178 @@
+import io
+import json
+import unittest
+
+import objectgraph
+
+from .test_objectgraph import Node, sample_graph
+from .test_serialize import graph_state
+
+GRAPH_CLASSES = (
+    objectgraph.ObjectGraph,
+    objectgraph.CompactObjectGraph,
+    objectgraph.ConcurrentObjectGraph,
+)
+
+
+class JSONNode(Node):
+    def __init__(self, record):
+        super().__init__(record["id"])
+        self.record = record
+
+
+class TestImport(unittest.TestCase):
+    def test_edge_list(self):
+        for graph_class in GRAPH_CLASSES:
+            with self.subTest(graph_class=graph_class):
+                graph = graph_class()
+                graph.add_node(Node("n1"))
+                graph.read_edge_list(
+                    io.StringIO(
+                        "# comment\n"
+                        "n1 n2 import\n"
+                        "\n"
+                        "n2   n3\n"
+                        "n1 n2 from import\n"
+                        "n3 n1 import\n"
+                    ),
+                    node_factory=Node,
+                    chunk_size=2,
+                )
+
+                self.assertCountEqual(
+                    [node.identifier for node in graph.nodes()], ["n1", "n2", "n3"]
+                )
+                self.assertEqual(graph.edge_data("n1", "n2"), {"import", "from import"})
+                self.assertEqual(graph.edge_data("n2", "n3"), {None})
+                self.assertEqual(graph.edge_data("n3", "n1"), {"import"})
+
+                graph = graph_class()
+                graph.read_edge_list(
+                    io.StringIO("n1;n2;a;b\n"), node_factory=Node, delimiter=";"
+                )
+                self.assertEqual(graph.edge_data("n1", "n2"), {"a;b"})
+
+                graph = graph_class()
+                with self.assertRaisesRegex(ValueError, "Line 3: expecting"):
+                    graph.read_edge_list(
+                        io.StringIO("n1 n2\nn2 n3\nn4\n"),
+                        node_factory=Node,
+                        chunk_size=2,
+                    )
+                self.assertEqual(graph.edge_data("n2", "n3"), {None})
+
+                with self.assertRaisesRegex(ValueError, "Invalid chunk size"):
+                    graph.read_edge_list(
+                        io.StringIO("n1 n2\n"), node_factory=Node, chunk_size=0
+                    )
+
+    def test_csv(self):
+        for graph_class in GRAPH_CLASSES:
+            with self.subTest(graph_class=graph_class):
+                graph = graph_class()
+                graph.read_csv(
+                    io.StringIO(
+                        "kind,from,to\n"
+                        "import,n1,n2\n"
+                        '"a, b",n2,n3\n'
+                        "\n"
+                        "import,n3,n1\n"
+                    ),
+                    node_factory=Node,
+                    source="from",
+                    destination="to",
+                    attribute="kind",
+                    chunk_size=1,
+                )
+                self.assertEqual(
+                    sorted(
+                        (source.identifier, destination.identifier)
+                        for source, destination, _ in graph.edges()
+                    ),
+                    [("n1", "n2"), ("n2", "n3"), ("n3", "n1")],
+                )
+                self.assertEqual(graph.edge_data("n2", "n3"), {"a, b"})
+
+                graph = graph_class()
+                graph.read_csv(
+                    io.StringIO("source\tdestination\nn1\tn2\n"),
+                    node_factory=Node,
+                    delimiter="\t",
+                )
+                self.assertEqual(graph.edge_data("n1", "n2"), {None})
+
+                graph = graph_class()
+                graph.read_csv(io.StringIO(""), node_factory=Node)
+                self.assertEqual(list(graph.nodes()), [])
+
+                with self.assertRaisesRegex(ValueError, "Column 'kind' not found"):
+                    graph.read_csv(
+                        io.StringIO("source,destination\n"),
+                        node_factory=Node,
+                        attribute="kind",
+                    )
+
+                with self.assertRaisesRegex(ValueError, "Line 3: expecting 2 fields"):
+                    graph.read_csv(
+                        io.StringIO("source,destination\nn1,n2\nn3\n"),
+                        node_factory=Node,
+                    )
+
+    def test_jsonl(self):
+        for graph_class in GRAPH_CLASSES:
+            for reachable in (False, True):
+                for chunk_size in (1, 2, 10_000):
+                    with self.subTest(
+                        graph_class=graph_class,
+                        reachable=reachable,
+                        chunk_size=chunk_size,
+                    ):
+                        graph = sample_graph(graph_class)
+                        stream = io.StringIO()
+                        graph.write_jsonl(
+                            stream,
+                            node_formatter=lambda node: {"name": node.identifier * 2},
+                            reachable=reachable,
+                        )
+
+                        stream.seek(0)
+                        copy = graph_class()
+                        copy.read_jsonl(
+                            stream, node_factory=JSONNode, chunk_size=chunk_size
+                        )
+
+                        for node in copy.nodes():
+                            self.assertEqual(node.record["name"], node.identifier * 2)
+
+                        if reachable:
+                            graph.remove_node("<ñ4>")
+                            graph.remove_node("n5")
+                        self.assertEqual(graph_state(copy), graph_state(graph))
+
+    def test_jsonl_errors(self):
+        for graph_class in GRAPH_CLASSES:
+            with self.subTest(graph_class=graph_class):
+                graph = graph_class()
+                with self.assertRaisesRegex(ValueError, "Invalid record type 'foo'"):
+                    graph.read_jsonl(
+                        io.StringIO(json.dumps({"type": "foo"})),
+                        node_factory=JSONNode,
+                    )
+
+                graph.add_node(Node("n1"))
+                with self.assertRaises(ValueError):
+                    graph.read_jsonl(
+                        io.StringIO(json.dumps({"type": "node", "id": "n1"})),
+                        node_factory=JSONNode,
+                    )
+
+                with self.assertRaises(ValueError):
+                    graph.read_jsonl(
+                        io.StringIO("not json\n"),
+                        node_factory=JSONNode,
+                    )
+
+                with self.assertRaisesRegex(ValueError, "Invalid chunk size"):
+                    graph.read_jsonl(
+                        io.StringIO(""), node_factory=JSONNode, chunk_size=-1
+                    )
@@ -1,4 +1,9 @@
+import asyncio
+import concurrent.futures
+import pickle
+import sys
 import unittest
+from copy import deepcopy
 
 import objectgraph
 
@@ -11,11 +16,40 @@ class Node:
         return f"<node {self.identifier!r}>"
 
 
+def sample_graph(graph_class=objectgraph.ObjectGraph):
+    """
+    A small graph for tests that convert graphs: it has edges with several,
+    tuple, None and no attributes, a cycle, a self loop, nodes that are not
+    reachable from the root and identifiers that need quoting.
+    """
+    graph = graph_class()
+    graph.add_nodes([Node("n1"), Node("n2"), Node('quote"d'), Node("<ñ4>"), Node("n5")])
+    graph.add_root("n1")
+    graph.add_edges(
+        [
+            ("n1", "n2", "toplevel"),
+            ("n1", "n2", "conditional"),
+            ("n2", 'quote"d', None),
+            ('quote"d', 'quote"d', ("nested", 1)),
+            ('quote"d', "n1", "toplevel"),
+            ("<ñ4>", "n2", "toplevel"),
+            ("n5", "n1", "toplevel"),
+        ]
+    )
+    graph.remove_edge("n5", "n1", "toplevel")
+    return graph
+
+
 class TestObjectGraph(unittest.TestCase):
+    graph_class = objectgraph.ObjectGraph
+
     def test_empty(self):
-        graph = objectgraph.ObjectGraph()
+        graph = self.graph_class()
 
-        self.assertEqual(repr(graph), "<ObjectGraph with 0 roots, 0 nodes and 0 edges>")
+        self.assertEqual(
+            repr(graph),
+            f"<{self.graph_class.__name__} with 0 roots, 0 nodes and 0 edges>",
+        )
 
         self.assertEqual(list(graph.roots()), [])
         self.assertEqual(list(graph.nodes()), [])
@@ -28,7 +62,7 @@ class TestObjectGraph(unittest.TestCase):
         self.assertEqual(list(graph.outgoing("foo")), [])
 
     def test_simple_graph(self):
-        graph = objectgraph.ObjectGraph()
+        graph = self.graph_class()
 
         n1 = Node("n1")
         n2 = Node("n2")
@@ -65,7 +99,7 @@ class TestObjectGraph(unittest.TestCase):
         self.assertEqual(set(graph.incoming(n1)), set())
 
     def test_finding(self):
-        graph = objectgraph.ObjectGraph()
+        graph = self.graph_class()
 
         n1_a = Node("n1")
         n1_b = Node("n1")
@@ -87,7 +121,7 @@ class TestObjectGraph(unittest.TestCase):
         self.assertIs(v, n1_a)
 
     def test_duplicate_node(self):
-        graph = objectgraph.ObjectGraph()
+        graph = self.graph_class()
 
         n1_a = Node("n1")
         n1_b = Node("n1")
@@ -97,7 +131,7 @@ class TestObjectGraph(unittest.TestCase):
         self.assertRaises(AttributeError, graph.add_node, "n2")
 
     def test_edges(self):
-        graph = objectgraph.ObjectGraph()
+        graph = self.graph_class()
 
         n1 = Node("n1")
         n2 = Node("n2")
@@ -148,7 +182,7 @@ class TestObjectGraph(unittest.TestCase):
         self.assertEqual(list(graph.incoming(n3)), [({2}, n1), ({None}, n2)])
 
     def test_graph_iteration(self):
-        graph = objectgraph.ObjectGraph()
+        graph = self.graph_class()
 
         n1 = Node("n1")
         n2 = Node("n2")
@@ -196,7 +230,7 @@ class TestObjectGraph(unittest.TestCase):
         self.assertEqual(set(graph.iter_graph()), {n1, n2, n3, n4, n5, n6, n7})
 
     def test_edge_removal(self):
-        graph = objectgraph.ObjectGraph()
+        graph = self.graph_class()
 
         n1 = Node("n1")
         n2 = Node("n2")
@@ -228,7 +262,7 @@ class TestObjectGraph(unittest.TestCase):
         self.assertRaises(KeyError, graph.edge_data, n2, n3)
 
     def test_root_removal(self):
-        graph = objectgraph.ObjectGraph()
+        graph = self.graph_class()
 
         n1 = Node("n1")
         n2 = Node("n2")
@@ -269,7 +303,7 @@ class TestObjectGraph(unittest.TestCase):
         self.assertRaises(KeyError, graph.remove_root, "n4")
 
     def test_node_removal(self):
-        graph = objectgraph.ObjectGraph()
+        graph = self.graph_class()
 
         n1 = Node("n1")
         n2 = Node("n2")
@@ -307,3 +341,1428 @@ class TestObjectGraph(unittest.TestCase):
 
         self.assertRaises(KeyError, graph.remove_node, n4)
         self.assertRaises(KeyError, graph.remove_node, "n4")
+
+    def test_adjacency_after_removal(self):
+        graph = self.graph_class()
+
+        n1 = Node("n1")
+        n2 = Node("n2")
+        n3 = Node("n3")
+        graph.add_node(n1)
+        graph.add_node(n2)
+        graph.add_node(n3)
+
+        graph.add_edge(n1, n2, 1)
+        graph.add_edge(n2, n3, 2)
+        graph.add_edge(n3, n1, 3)
+        graph.add_edge(n2, n2, 4)
+
+        self.assertEqual(list(graph.outgoing(n2)), [({2}, n3), ({4}, n2)])
+        self.assertEqual(list(graph.incoming(n2)), [({1}, n1), ({4}, n2)])
+
+        graph.remove_all_edges(n2, n3)
+        self.assertEqual(list(graph.outgoing(n2)), [({4}, n2)])
+        self.assertEqual(list(graph.incoming(n3)), [])
+
+        graph.remove_node(n2)
+        self.assertEqual(list(graph.outgoing(n1)), [])
+        self.assertEqual(list(graph.incoming(n1)), [({3}, n3)])
+        self.assertEqual(list(graph.edges()), [(n3, n1, {3})])
+
+        graph.add_node(n2)
+        self.assertEqual(list(graph.outgoing(n2)), [])
+        self.assertEqual(list(graph.incoming(n2)), [])
+
+    def test_bulk_node_removal(self):
+        graph = self.graph_class()
+
+        nodes = [Node(f"n{idx}") for idx in range(5)]
+        for n in nodes:
+            graph.add_node(n)
+
+        graph.add_root(nodes[0])
+        graph.add_root(nodes[4])
+
+        graph.add_edge(nodes[0], nodes[1], 1)
+        graph.add_edge(nodes[1], nodes[2], 2)
+        graph.add_edge(nodes[2], nodes[1], 3)
+        graph.add_edge(nodes[2], nodes[3], 4)
+        graph.add_edge(nodes[3], nodes[3], 5)
+        graph.add_edge(nodes[4], nodes[3], 6)
+
+        self.assertRaises(KeyError, graph.remove_nodes, [nodes[1], "n9"])
+        self.assertEqual(len(list(graph.nodes())), 5)
+        self.assertEqual(len(list(graph.edges())), 6)
+
+        graph.remove_nodes([nodes[1], "n3", nodes[4]])
+
+        self.assertEqual(set(graph.nodes()), {nodes[0], nodes[2]})
+        self.assertEqual(set(graph.roots()), {nodes[0]})
+        self.assertEqual(list(graph.edges()), [])
+        self.assertEqual(list(graph.outgoing(nodes[0])), [])
+        self.assertEqual(list(graph.incoming(nodes[2])), [])
+
+        graph.remove_nodes([])
+        self.assertEqual(set(graph.nodes()), {nodes[0], nodes[2]})
+
+    def test_graph_iteration_order(self):
+        graph = self.graph_class()
+
+        nodes = {name: Node(name) for name in ("a", "b", "c", "d", "e")}
+        for n in nodes.values():
+            graph.add_node(n)
+
+        graph.add_root("a")
+        graph.add_edge("a", "b", None)
+        graph.add_edge("a", "c", None)
+        graph.add_edge("b", "d", None)
+        graph.add_edge("c", "d", None)
+        graph.add_edge("d", "e", None)
+        graph.add_edge("e", "a", None)
+
+        def names(it):
+            return [n.identifier for n in it]
+
+        self.assertEqual(names(graph.iter_graph()), ["a", "b", "d", "e", "c"])
+        self.assertEqual(
+            names(graph.iter_graph(order="dfs-pre")), ["a", "b", "d", "e", "c"]
+        )
+        self.assertEqual(
+            names(graph.iter_graph(order="dfs-post")), ["e", "d", "b", "c", "a"]
+        )
+        self.assertEqual(
+            names(graph.iter_graph(order="bfs")), ["a", "b", "c", "d", "e"]
+        )
+
+        self.assertEqual(names(graph.iter_graph(max_depth=0)), ["a"])
+        self.assertEqual(names(graph.iter_graph(order="dfs-post", max_depth=0)), ["a"])
+        self.assertEqual(names(graph.iter_graph(max_depth=1)), ["a", "b", "c"])
+        self.assertEqual(
+            names(graph.iter_graph(order="dfs-post", max_depth=1)), ["b", "c", "a"]
+        )
+        self.assertEqual(
+            names(graph.iter_graph(order="bfs", max_depth=2)), ["a", "b", "c", "d"]
+        )
+        self.assertEqual(
+            names(graph.iter_graph(node="d", order="bfs")), ["d", "e", "a", "b", "c"]
+        )
+
+        with self.assertRaises(ValueError):
+            list(graph.iter_graph(order="random"))
+
+    def test_deep_graph_iteration(self):
+        graph = self.graph_class()
+
+        depth = sys.getrecursionlimit() * 3
+        for idx in range(depth):
+            graph.add_node(Node(str(idx)))
+            if idx:
+                graph.add_edge(str(idx - 1), str(idx), None)
+
+        graph.add_root("0")
+
+        self.assertEqual(len(list(graph.iter_graph())), depth)
+        post = list(graph.iter_graph(order="dfs-post"))
+        self.assertEqual(post[0].identifier, str(depth - 1))
+        self.assertEqual(post[-1].identifier, "0")
+
+    def test_bulk_construction(self):
+        graph = self.graph_class()
+
+        n1 = Node("n1")
+        n2 = Node("n2")
+        n3 = Node("n3")
+
+        self.assertEqual(graph.add_nodes([n1, n2]), 2)
+        self.assertEqual(graph.add_nodes([]), 0)
+        self.assertRaises(ValueError, graph.add_nodes, [n3, Node("n1")])
+        self.assertRaises(ValueError, graph.add_nodes, [n3, Node("n3")])
+        self.assertNotIn(n3, graph)
+        self.assertEqual(graph.add_nodes(iter([n3])), 1)
+
+        n4 = Node("n4")
+        self.assertEqual(
+            graph.add_nodes([Node("n1"), n4, Node("n4")], ignore_existing=True), 1
+        )
+        self.assertIs(graph.find_node("n1"), n1)
+        self.assertIs(graph.find_node("n4"), n4)
+        graph.remove_node(n4)
+
+        self.assertEqual(
+            graph.add_edges([(n1, n2, 1), ("n1", "n2", 2), (n2, "n3", None)]), 3
+        )
+        self.assertEqual(graph.add_edges([(n1, n2, 1), (n3, n1, 3)]), 1)
+
+        with self.assertRaises(KeyError) as cm:
+            graph.add_edges([(n1, "x", 4), ("y", n2, 5), (n2, n1, 6)])
+        self.assertIn("'x'", str(cm.exception))
+        self.assertIn("'y'", str(cm.exception))
+        self.assertRaises(KeyError, graph.edge_data, n2, n1)
+
+        self.assertEqual(graph.edge_data(n1, n2), {1, 2})
+        self.assertEqual(graph.edge_data(n2, n3), {None})
+        self.assertEqual(list(graph.incoming(n1)), [({3}, n3)])
+
+    def test_from_edges(self):
+        n1 = Node("n1")
+        n2 = Node("n2")
+        n3 = Node("n3")
+        n4 = Node("n4")
+
+        graph = self.graph_class.from_edges(
+            [(n1, n2, 1), (n2, n3, 2), (Node("n1"), n3, 3), (n1, n2, 4)],
+            nodes=[n4],
+            roots=["n1"],
+        )
+
+        self.assertEqual(list(graph.nodes()), [n4, n1, n2, n3])
+        self.assertIs(graph.find_node("n1"), n1)
+        self.assertEqual(list(graph.roots()), [n1])
+        self.assertEqual(graph.edge_data(n1, n2), {1, 4})
+        self.assertEqual(list(graph.incoming(n3)), [({2}, n2), ({3}, n1)])
+        self.assertEqual(list(graph.iter_graph()), [n1, n2, n3])
+
+        self.assertRaises(
+            KeyError, self.graph_class.from_edges, [(n1, n2, 1)], roots=[n3]
+        )
+
+    def test_reachability(self):
+        graph = self.graph_class(reachability_cache_size=2)
+
+        graph.add_nodes(Node(f"n{idx}") for idx in range(1, 6))
+        graph.add_edges([("n1", "n2", 1), ("n2", "n3", 2), ("n4", "n3", 3)])
+
+        def reachable(node):
+            return {n.identifier for n in graph.reachable_from(node)}
+
+        self.assertEqual(reachable("n1"), {"n1", "n2", "n3"})
+        self.assertEqual(reachable(Node("n3")), {"n3"})
+        self.assertTrue(graph.is_reachable("n1", "n3"))
+        self.assertTrue(graph.is_reachable("n3", "n3"))
+        self.assertFalse(graph.is_reachable("n3", "n1"))
+        self.assertRaises(KeyError, graph.is_reachable, "n1", "n9")
+        self.assertRaises(KeyError, graph.is_reachable, "n9", "n1")
+        self.assertRaises(KeyError, graph.reachable_from, "n9")
+
+        # The cache is bounded, and "n3" was used most recently
+        self.assertEqual(list(graph._reachability_cache), ["n1", "n3"])
+        self.assertEqual(reachable("n4"), {"n3", "n4"})
+        self.assertEqual(list(graph._reachability_cache), ["n3", "n4"])
+
+        # New attributes for existing edges and unrelated edges
+        # don't invalidate the cache
+        graph.add_edge("n1", "n2", 4)
+        graph.add_edge("n5", "n1", 5)
+        graph.remove_edge("n1", "n2", 1)
+        self.assertEqual(list(graph._reachability_cache), ["n3", "n4"])
+
+        graph.add_edge("n3", "n5", 6)
+        self.assertEqual(list(graph._reachability_cache), [])
+        self.assertEqual(reachable("n4"), {"n1", "n2", "n3", "n4", "n5"})
+        self.assertTrue(graph.is_reachable("n3", "n1"))
+
+        graph.remove_all_edges("n3", "n5")
+        self.assertEqual(list(graph._reachability_cache), [])
+        self.assertFalse(graph.is_reachable("n3", "n1"))
+        self.assertEqual(reachable("n1"), {"n1", "n2", "n3"})
+
+        graph.add_edges([("n1", "n2", 7), ("n3", "n4", 8)])
+        self.assertEqual(list(graph._reachability_cache), [])
+        self.assertEqual(reachable("n1"), {"n1", "n2", "n3", "n4"})
+
+        graph.remove_node("n4")
+        self.assertEqual(reachable("n1"), {"n1", "n2", "n3"})
+
+        graph.remove_nodes(["n2"])
+        self.assertEqual(reachable("n1"), {"n1"})
+
+    def test_reachability_without_cache(self):
+        graph = self.graph_class(reachability_cache_size=0)
+        graph.add_nodes([Node("n1"), Node("n2")])
+        graph.add_edge("n1", "n2", None)
+
+        self.assertTrue(graph.is_reachable("n1", "n2"))
+        self.assertEqual(list(graph._reachability_cache), [])
+
+    def test_strongly_connected_components(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(f"n{idx}") for idx in range(1, 8))
+        graph.add_root("n7")
+        graph.add_root("n2")
+        graph.add_edges(
+            [
+                ("n1", "n2", "a"),
+                ("n2", "n3", "b"),
+                ("n3", "n1", "c"),
+                ("n3", "n4", "d"),
+                ("n2", "n4", "e"),
+                ("n4", "n5", "f"),
+                ("n5", "n4", "g"),
+                ("n6", "n6", "h"),
+                ("n7", "n1", "i"),
+            ]
+        )
+        graph.add_edge("n6", "n5", "j")
+        graph.remove_edge("n6", "n5", "j")
+
+        components = [
+            sorted(n.identifier for n in component)
+            for component in graph.strongly_connected_components()
+        ]
+        self.assertCountEqual(
+            components, [["n1", "n2", "n3"], ["n4", "n5"], ["n6"], ["n7"]]
+        )
+        # Reverse topological order
+        self.assertLess(components.index(["n4", "n5"]), components.index(["n6"]))
+        self.assertLess(
+            components.index(["n4", "n5"]), components.index(["n1", "n2", "n3"])
+        )
+        self.assertLess(components.index(["n1", "n2", "n3"]), components.index(["n7"]))
+
+        condensed = graph.condensation()
+        self.assertIsInstance(condensed, self.graph_class)
+        self.assertEqual(
+            sorted(n.identifier for n in condensed.nodes()), ["n1", "n4", "n6", "n7"]
+        )
+        self.assertEqual(sorted(n.identifier for n in condensed.roots()), ["n1", "n7"])
+        component = condensed.find_node("n1")
+        self.assertIsInstance(component, objectgraph.Component)
+        self.assertEqual(
+            sorted(n.identifier for n in component.nodes), ["n1", "n2", "n3"]
+        )
+        self.assertEqual(repr(component), "<Component 'n1' with 3 nodes>")
+
+        self.assertEqual(
+            sorted(
+                (s.identifier, d.identifier, sorted(a)) for s, d, a in condensed.edges()
+            ),
+            [("n1", "n4", ["d", "e"]), ("n6", "n4", []), ("n7", "n1", ["i"])],
+        )
+        self.assertEqual(len(list(condensed.strongly_connected_components())), 4)
+
+    def test_strongly_connected_components_deep(self):
+        graph = self.graph_class()
+
+        count = sys.getrecursionlimit() * 3
+        graph.add_nodes(Node(str(idx)) for idx in range(count))
+        graph.add_edges(
+            (str(idx), str((idx + 1) % count), None) for idx in range(count)
+        )
+        graph.add_node(Node("extra"))
+        graph.add_edge("extra", "0", None)
+
+        components = list(graph.strongly_connected_components())
+        self.assertEqual([len(c) for c in components], [count, 1])
+        self.assertEqual(len(list(graph.condensation().edges())), 1)
+
+    def test_parallel_iter_graph(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(str(idx)) for idx in range(2000))
+        graph.add_root("0")
+        graph.add_edges((str(idx), str(idx * 3 + 1), None) for idx in range(666))
+        graph.add_edges((str(idx), str(idx * 3 + 2), None) for idx in range(666))
+        graph.add_edges((str(idx), str(idx * 3 + 3), None) for idx in range(666))
+        graph.add_edges((str(idx), "0", None) for idx in range(1000, 1100))
+
+        class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+            submitted = 0
+
+            def submit(self, *args, **kwds):
+                self.submitted += 1
+                return super().submit(*args, **kwds)
+
+        expected = [n.identifier for n in graph.iter_graph(order="bfs")]
+        with CountingExecutor(max_workers=4) as executor:
+            self.assertEqual(
+                [
+                    n.identifier
+                    for n in graph.parallel_iter_graph(executor=executor, workers=4)
+                ],
+                expected,
+            )
+            self.assertGreater(executor.submitted, 0)
+
+        self.assertEqual(
+            [n.identifier for n in graph.parallel_iter_graph(workers=2)], expected
+        )
+
+        for start, depth in (("0", 3), ("5", None), ("1000", 0), ("1000", 1)):
+            with self.subTest(start=start, depth=depth):
+                self.assertEqual(
+                    [
+                        n.identifier
+                        for n in graph.parallel_iter_graph(node=start, max_depth=depth)
+                    ],
+                    [
+                        n.identifier
+                        for n in graph.iter_graph(
+                            node=start, order="bfs", max_depth=depth
+                        )
+                    ],
+                )
+
+        self.assertEqual(list(self.graph_class().parallel_iter_graph()), [])
+
+        with self.assertRaises(KeyError):
+            list(graph.parallel_iter_graph(node="missing"))
+
+        with self.assertRaises(ValueError):
+            list(graph.parallel_iter_graph(workers=0))
+
+    def test_map_nodes(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(str(idx)) for idx in range(100))
+
+        def function(node):
+            return int(node.identifier) * 2
+
+        self.assertEqual(
+            [(n.identifier, r) for n, r in graph.map_nodes(function, workers=3)],
+            [(str(idx), idx * 2) for idx in range(100)],
+        )
+
+        nodes = graph.iter_graph(node="5")
+        self.assertEqual(
+            list(graph.map_nodes(function, nodes)), [(graph.find_node("5"), 10)]
+        )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            results = graph.map_nodes(function, executor=executor)
+            self.assertEqual(len(list(results)), 100)
+
+        def failing(node):
+            if node.identifier == "50":
+                raise RuntimeError(node.identifier)
+            return node
+
+        results = graph.map_nodes(failing, workers=2)
+        for idx in range(50):
+            self.assertEqual(next(results)[0].identifier, str(idx))
+        with self.assertRaises(RuntimeError):
+            next(results)
+
+        with self.assertRaises(ValueError):
+            list(graph.map_nodes(function, workers=-1))
+
+    def test_crawl(self):
+        # Node "n" has edges to "2n" and "2n+1" for n < 50
+        calls = []
+        active = 0
+        max_active = 0
+
+        async def expand(node):
+            nonlocal active, max_active
+            calls.append(node.identifier)
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0)
+            active -= 1
+
+            value = int(node.identifier)
+            if value >= 50:
+                return []
+            return [
+                ("left", Node(str(2 * value))),
+                ("right", Node(str(2 * value + 1))),
+            ]
+
+        graph = self.graph_class()
+        existing = Node("1")
+        graph.add_node(existing)
+
+        added = asyncio.run(graph.crawl([Node("1"), Node("3")], expand, concurrency=4))
+        self.assertEqual(added, 98)
+        self.assertIs(graph.find_node("1"), existing)
+        self.assertEqual(sorted(calls), sorted(str(idx) for idx in range(1, 100)))
+        self.assertLessEqual(max_active, 4)
+        self.assertGreater(max_active, 1)
+        self.assertEqual(graph.edge_data("3", "7"), {"right"})
+        self.assertEqual(len(list(graph.edges())), 98)
+
+        # Crawling again expands nodes again, but doesn't add anything
+        calls.clear()
+        self.assertEqual(asyncio.run(graph.crawl([Node("2")], expand)), 0)
+        self.assertEqual(len(calls), 63)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(graph.crawl([Node("2")], expand, concurrency=0))
+
+    def test_crawl_error(self):
+        async def expand(node):
+            if node.identifier == "b":
+                raise RuntimeError(node.identifier)
+            await asyncio.sleep(0)
+            return [(None, Node("a")), (None, Node("b"))]
+
+        graph = self.graph_class()
+        with self.assertRaises(RuntimeError):
+            asyncio.run(graph.crawl([Node("root")], expand))
+
+    def test_async_iter_graph(self):
+        graph = self.graph_class()
+        graph.add_nodes([Node("root"), Node("other")])
+        graph.add_root("root")
+        graph.add_edge("root", "other", "existing")
+
+        async def expand(node):
+            await asyncio.sleep(0)
+            if node.identifier == "root":
+                return [("new", Node("child"))]
+            if node.identifier == "child":
+                return [("new", Node("grandchild")), ("back", Node("root"))]
+            return []
+
+        async def collect(**kwds):
+            return [
+                node.identifier async for node in graph.async_iter_graph(expand, **kwds)
+            ]
+
+        self.assertEqual(asyncio.run(collect(max_depth=1)), ["root", "other", "child"])
+        self.assertNotIn("grandchild", graph)
+
+        self.assertEqual(
+            asyncio.run(collect(concurrency=1)),
+            ["root", "other", "child", "grandchild"],
+        )
+        self.assertEqual(graph.edge_data("child", "root"), {"back"})
+        self.assertEqual(asyncio.run(collect(node="grandchild")), ["grandchild"])
+        self.assertEqual(asyncio.run(collect(node="root", max_depth=0)), ["root"])
+
+        with self.assertRaises(KeyError):
+            asyncio.run(collect(node="missing"))
+
+        async def first():
+            async for node in graph.async_iter_graph(expand):
+                return node.identifier
+
+        self.assertEqual(asyncio.run(first()), "root")
+
+    def test_diff(self):
+        old = self.graph_class()
+        old.add_nodes(Node(name) for name in ("a", "b", "c", "d", "e"))
+        old.add_root("a")
+        old.add_root("e")
+        old.add_edges(
+            [
+                ("a", "b", 1),
+                ("a", "b", 2),
+                ("b", "c", 1),
+                ("c", "d", 1),
+                ("d", "e", 1),
+                ("e", "a", 1),
+            ]
+        )
+        old.add_edge("c", "a", 3)
+        old.remove_edge("c", "a", 3)
+
+        new = self.graph_class()
+        changed = Node("b")
+        changed.version = 2
+        new.add_nodes([Node("a"), changed, Node("c"), Node("d"), Node("f")])
+        new.add_root("a")
+        new.add_root("f")
+        new.add_edges(
+            [
+                ("a", "b", 2),
+                ("a", "b", 3),
+                ("b", "c", 1),
+                ("d", "f", 1),
+                ("f", "a", 1),
+            ]
+        )
+        new.add_edge("d", "c", 1)
+        new.remove_edge("d", "c", 1)
+
+        self.assertFalse(old.diff(old))
+        self.assertEqual(repr(old.diff(old)), "<GraphDiff no changes>")
+
+        diff = old.diff(new)
+        self.assertTrue(diff)
+        self.assertEqual([n.identifier for n in diff.added_nodes], ["f"])
+        self.assertEqual(diff.removed_nodes, ("e",))
+        self.assertEqual(diff.changed_nodes, ())
+        self.assertEqual(diff.added_roots, ("f",))
+        self.assertEqual(diff.removed_roots, ("e",))
+        self.assertCountEqual(
+            diff.added_edges,
+            [("d", "f", {1}), ("f", "a", {1}), ("d", "c", frozenset())],
+        )
+        self.assertCountEqual(
+            diff.removed_edges,
+            [("c", "d", {1}), ("d", "e", {1}), ("e", "a", {1}), ("c", "a", set())],
+        )
+        self.assertEqual(diff.added_edge_attributes, (("a", "b", {3}),))
+        self.assertEqual(diff.removed_edge_attributes, (("a", "b", {1}),))
+        self.assertEqual(diff.affected_nodes(), {"a", "b", "c", "d", "e", "f"})
+        self.assertEqual(
+            repr(diff),
+            "<GraphDiff 1 added nodes, 1 removed nodes, 1 added roots, 1 removed roots, 3 added edges, 4 removed edges, 1 added edge attributes, 1 removed edge attributes>",  # noqa:E501, B950
+        )
+
+        def node_changed(old_node, new_node):
+            return getattr(old_node, "version", 1) != getattr(new_node, "version", 1)
+
+        diff = old.diff(new, node_changed=node_changed)
+        self.assertEqual(diff.changed_nodes, (changed,))
+
+        self.assertTrue(old.is_reachable("a", "e"))
+        old.apply(diff)
+        self.assertFalse(old.diff(new))
+        self.assertIs(old.find_node("b"), changed)
+        self.assertEqual(old.edge_data("d", "c"), set())
+        self.assertFalse(old.is_reachable("a", "d"))
+        self.assertEqual(
+            sorted((s.identifier, d.identifier) for s, d, _ in old.edges()),
+            sorted((s.identifier, d.identifier) for s, d, _ in new.edges()),
+        )
+
+    def test_apply_invalid(self):
+        graph = self.graph_class()
+        graph.add_nodes([Node("a"), Node("b")])
+        graph.add_edge("a", "b", 1)
+
+        for diff in (
+            objectgraph.GraphDiff(removed_nodes=("c",)),
+            objectgraph.GraphDiff(added_nodes=(Node("a"),)),
+            objectgraph.GraphDiff(changed_nodes=(Node("c"),)),
+            objectgraph.GraphDiff(removed_roots=("a",)),
+            objectgraph.GraphDiff(added_roots=("c",)),
+            objectgraph.GraphDiff(removed_edges=(("b", "a", frozenset()),)),
+            objectgraph.GraphDiff(removed_edge_attributes=(("a", "b", {2}),)),
+            objectgraph.GraphDiff(added_edges=(("a", "b", {2}),)),
+            objectgraph.GraphDiff(added_edges=(("a", "c", {2}),)),
+            objectgraph.GraphDiff(added_edge_attributes=(("b", "a", {2}),)),
+            objectgraph.GraphDiff(
+                removed_nodes=("b",), added_edge_attributes=(("a", "b", {2}),)
+            ),
+        ):
+            with self.subTest(diff=diff):
+                with self.assertRaises(ValueError):
+                    graph.apply(diff)
+
+                self.assertEqual(len(list(graph.nodes())), 2)
+                self.assertEqual(graph.edge_data("a", "b"), {1})
+
+    def test_events(self):
+        graph = self.graph_class()
+        events = []
+        graph.subscribe(events.append)
+        self.assertEqual(graph.version, 0)
+
+        def changes():
+            result = [
+                (e.version, e.kind, e.source, e.destination, set(e.attributes))
+                for e in events
+            ]
+            events.clear()
+            return result
+
+        graph.add_node(Node("a"))
+        graph.add_nodes([Node("b"), Node("c")])
+        graph.add_root("a")
+        graph.add_root("a")
+        self.assertEqual(
+            changes(),
+            [
+                (1, "node-added", "a", None, set()),
+                (2, "node-added", "b", None, set()),
+                (2, "node-added", "c", None, set()),
+                (3, "root-added", "a", None, set()),
+            ],
+        )
+        self.assertEqual(graph.version, 3)
+
+        graph.add_edge("a", "b", 1)
+        graph.add_edge("a", "b", 1)
+        graph.add_edges([("b", "c", 1), ("a", "b", 1), ("b", "c", 2)])
+        self.assertEqual(graph.add_edges([("b", "c", 1)]), 0)
+        graph.remove_edge("b", "c", 1)
+        self.assertEqual(
+            changes(),
+            [
+                (4, "edge-added", "a", "b", {1}),
+                (5, "edge-added", "b", "c", {1}),
+                (5, "edge-added", "b", "c", {2}),
+                (6, "edge-removed", "b", "c", {1}),
+            ],
+        )
+
+        graph.add_edge("c", "a", 3)
+        graph.add_edge("c", "c", 4)
+        events.clear()
+        graph.remove_node("a")
+        self.assertCountEqual(
+            changes(),
+            [
+                (9, "root-removed", "a", None, set()),
+                (9, "edge-removed", "a", "b", {1}),
+                (9, "edge-removed", "c", "a", {3}),
+                (9, "node-removed", "a", None, set()),
+            ],
+        )
+
+        graph.remove_all_edges("b", "c")
+        graph.add_root("c")
+        graph.remove_root("c")
+        graph.remove_nodes(["b", "c"])
+        graph.remove_nodes([])
+        self.assertCountEqual(
+            changes(),
+            [
+                (10, "edge-removed", "b", "c", {2}),
+                (11, "root-added", "c", None, set()),
+                (12, "root-removed", "c", None, set()),
+                (13, "edge-removed", "c", "c", {4}),
+                (13, "node-removed", "b", None, set()),
+                (13, "node-removed", "c", None, set()),
+            ],
+        )
+        self.assertEqual(graph.version, 13)
+
+        graph.unsubscribe(events.append)
+        graph.add_node(Node("d"))
+        self.assertEqual(events, [])
+        self.assertEqual(graph.version, 14)
+        with self.assertRaises(ValueError):
+            graph.unsubscribe(events.append)
+
+    def test_events_apply(self):
+        old = self.graph_class()
+        old.add_nodes([Node("a"), Node("b")])
+        new = self.graph_class()
+        new.add_nodes([Node("a"), Node("b")])
+        new.add_edge("a", "b", 1)
+        new.remove_edge("a", "b", 1)
+
+        events = []
+        old.subscribe(events.append)
+        old.apply(old.diff(new, node_changed=lambda a, b: True))
+        self.assertCountEqual(
+            [(e.kind, e.source, e.destination) for e in events],
+            [
+                ("node-replaced", "a", None),
+                ("node-replaced", "b", None),
+                ("edge-added", "a", "b"),
+            ],
+        )
+
+        # Every operation performed by apply has its own version
+        versions = [e.version for e in events]
+        self.assertEqual(versions, sorted(versions))
+        self.assertEqual(len(set(versions)), 2)
+        self.assertEqual(versions[-1], old.version)
+
+    def test_journal(self):
+        graph = self.graph_class(journal_size=3)
+        with self.assertRaises(ValueError):
+            self.graph_class().events_since(0)
+
+        self.assertEqual(graph.events_since(0), [])
+        graph.add_node(Node("a"))
+        graph.add_node(Node("b"))
+        self.assertEqual([e.source for e in graph.events_since(0)], ["a", "b"])
+        self.assertEqual([e.source for e in graph.events_since(1)], ["b"])
+        self.assertEqual(graph.events_since(2), [])
+
+        graph.add_nodes([Node("c"), Node("d")])
+        self.assertEqual([e.source for e in graph.events_since(1)], ["b", "c", "d"])
+        with self.assertRaises(ValueError):
+            graph.events_since(0)
+
+        graph.add_node(Node("e"))
+        self.assertEqual([e.source for e in graph.events_since(3)], ["e"])
+        self.assertEqual([e.source for e in graph.events_since(2)], ["c", "d", "e"])
+        with self.assertRaises(ValueError):
+            graph.events_since(1)
+
+    def test_expander(self):
+        # Node "n" has edges to "2n" and "2n+1"
+        calls = []
+
+        def expand(node):
+            calls.append(node.identifier)
+            value = int(node.identifier)
+            return [("left", Node(str(2 * value))), ("right", Node(str(2 * value + 1)))]
+
+        graph = self.graph_class()
+        graph.add_node(Node("1"))
+        graph.add_root("1")
+        graph.set_expander(expand)
+        self.assertEqual(len(list(graph.nodes())), 1)
+
+        self.assertEqual(
+            [n.identifier for n in graph.iter_graph(order="bfs", max_depth=2)],
+            ["1", "2", "3", "4", "5", "6", "7"],
+        )
+        self.assertEqual(calls, ["1", "2", "3"])
+        self.assertEqual(len(list(graph.nodes())), 7)
+        self.assertEqual(graph.edge_data("3", "7"), {"right"})
+
+        # Expansion is memoized
+        self.assertEqual(
+            [n.identifier for n in graph.iter_graph(order="bfs", max_depth=2)],
+            ["1", "2", "3", "4", "5", "6", "7"],
+        )
+        self.assertEqual(calls, ["1", "2", "3"])
+
+        self.assertEqual(
+            sorted((a, n.identifier) for a, n in graph.outgoing("5")),
+            [({"left"}, "10"), ({"right"}, "11")],
+        )
+        self.assertEqual(calls, ["1", "2", "3", "5"])
+        self.assertEqual(list(graph.incoming("10")), [({"left"}, graph.find_node("5"))])
+
+        # Removing a node forgets that it was expanded
+        graph.remove_node("5")
+        graph.add_node(Node("5"))
+        self.assertEqual(len(list(graph.outgoing("5"))), 2)
+        self.assertEqual(calls[-1], "5")
+
+        graph.set_expander(None)
+        self.assertEqual(list(graph.outgoing("4")), [])
+        self.assertEqual(calls, ["1", "2", "3", "5", "5"])
+
+    def test_expander_reachability(self):
+        def expand(node):
+            value = int(node.identifier)
+            if value >= 20:
+                return []
+            return [(None, Node(str(value + 1))), (None, Node("0"))]
+
+        graph = self.graph_class()
+        graph.add_node(Node("0"))
+        graph.set_expander(expand)
+        self.assertTrue(graph.is_reachable("0", "20"))
+        self.assertEqual(len(list(graph.reachable_from("5"))), 21)
+
+    def test_expander_reachability_cache(self):
+        def expand(node):
+            if node.identifier == "a":
+                return [(None, Node("b"))]
+            return []
+
+        graph = self.graph_class()
+        graph.add_node(Node("a"))
+        self.assertEqual([n.identifier for n in graph.reachable_from("a")], ["a"])
+
+        # Setting an expander drops results cached without expanding nodes
+        graph.set_expander(expand)
+        self.assertEqual(
+            sorted(n.identifier for n in graph.reachable_from("a")), ["a", "b"]
+        )
+        self.assertTrue(graph.is_reachable("a", "b"))
+
+    def test_expander_error(self):
+        fail = True
+
+        def expand(node):
+            if fail:
+                raise RuntimeError(node.identifier)
+            return [(None, Node("child"))]
+
+        graph = self.graph_class()
+        graph.add_node(Node("root"))
+        graph.set_expander(expand)
+        with self.assertRaises(RuntimeError):
+            list(graph.outgoing("root"))
+
+        fail = False
+        self.assertEqual(
+            [n.identifier for n in graph.iter_graph(node="root")], ["root", "child"]
+        )
+
+    def test_subgraph_view(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(f"n{idx}") for idx in range(1, 7))
+        graph.add_root("n1")
+        graph.add_root("n6")
+        graph.add_edges(
+            [
+                ("n1", "n2", "a"),
+                ("n2", "n3", "b"),
+                ("n3", "n4", "c"),
+                ("n1", "n4", "d"),
+                ("n4", "n5", "e"),
+                ("n6", "n5", "f"),
+            ]
+        )
+
+        def ids(nodes):
+            return sorted(node.identifier for node in nodes)
+
+        def edges(view):
+            return sorted(
+                (s.identifier, d.identifier, sorted(a)) for s, d, a in view.edges()
+            )
+
+        reachable = graph.subgraph_view(nodes=graph.reachable_from("n2"))
+        self.assertIsInstance(reachable, objectgraph.SubgraphView)
+        self.assertEqual(ids(reachable.nodes()), ["n2", "n3", "n4", "n5"])
+        self.assertEqual(ids(reachable.roots()), [])
+        self.assertEqual(
+            edges(reachable),
+            [("n2", "n3", ["b"]), ("n3", "n4", ["c"]), ("n4", "n5", ["e"])],
+        )
+        self.assertIn("n3", reachable)
+        self.assertNotIn("n1", reachable)
+        self.assertIsNone(reachable.find_node(Node("n6")))
+        self.assertEqual(reachable.edge_data("n2", "n3"), {"b"})
+        self.assertRaises(KeyError, reachable.edge_data, "n1", "n2")
+        self.assertRaises(KeyError, reachable.edge_data, "n2", "n1")
+        self.assertEqual(ids(n for _, n in reachable.incoming("n4")), ["n3"])
+        self.assertEqual(ids(n for _, n in reachable.outgoing("n4")), ["n5"])
+        self.assertEqual(list(reachable.outgoing("n1")), [])
+        self.assertEqual(list(reachable.incoming("n1")), [])
+        self.assertEqual(
+            [n.identifier for n in reachable.iter_graph(node="n2", order="bfs")],
+            ["n2", "n3", "n4", "n5"],
+        )
+        self.assertRaises(KeyError, lambda: list(reachable.iter_graph(node="n1")))
+
+        def skip_e(attributes):
+            return "e" not in attributes
+
+        self.assertEqual(list(reachable.outgoing("n4", edge_filter=skip_e)), [])
+        self.assertEqual(
+            ids(n for _, n in reachable.incoming("n4", edge_filter=skip_e)), ["n3"]
+        )
+        self.assertEqual(list(reachable.incoming("n5", edge_filter=skip_e)), [])
+        self.assertEqual(
+            ids(reachable.iter_graph(node="n2", edge_filter=skip_e)), ["n2", "n3", "n4"]
+        )
+
+        odd = graph.subgraph_view(lambda node: int(node.identifier[1:]) % 2 == 1)
+        self.assertEqual(ids(odd.nodes()), ["n1", "n3", "n5"])
+        self.assertEqual(ids(odd.roots()), ["n1"])
+        self.assertEqual(edges(odd), [])
+        self.assertEqual([n.identifier for n in odd.iter_graph()], ["n1"])
+        self.assertTrue(repr(odd).startswith(f"<{type(odd).__name__} of <"))
+
+        combined = graph.subgraph_view(
+            lambda node: node.identifier != "n4", nodes=["n1", "n2", "n4", "n6"]
+        )
+        self.assertEqual(ids(combined.nodes()), ["n1", "n2", "n6"])
+        self.assertEqual(edges(combined), [("n1", "n2", ["a"])])
+        self.assertEqual(ids(combined.iter_graph()), ["n1", "n2", "n6"])
+
+        # Views are live
+        graph.remove_node("n3")
+        graph.add_edge("n2", "n5", "g")
+        self.assertEqual(ids(reachable.nodes()), ["n2", "n4", "n5"])
+        self.assertEqual(edges(reachable), [("n2", "n5", ["g"]), ("n4", "n5", ["e"])])
+
+    def test_induced_subgraph(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(f"n{idx}") for idx in range(1, 5))
+        graph.add_root("n1")
+        graph.add_root("n4")
+        graph.add_edges(
+            [("n1", "n2", "a"), ("n2", "n3", "b"), ("n3", "n1", "c"), ("n1", "n4", "d")]
+        )
+        graph.add_edge("n2", "n1", "e")
+        graph.remove_edge("n2", "n1", "e")
+
+        subgraph = graph.induced_subgraph(["n1", graph.find_node("n2"), "n3"])
+        self.assertIsInstance(subgraph, self.graph_class)
+        self.assertEqual(
+            sorted(n.identifier for n in subgraph.nodes()), ["n1", "n2", "n3"]
+        )
+        self.assertEqual([n.identifier for n in subgraph.roots()], ["n1"])
+        self.assertEqual(
+            sorted(
+                (s.identifier, d.identifier, sorted(a)) for s, d, a in subgraph.edges()
+            ),
+            [
+                ("n1", "n2", ["a"]),
+                ("n2", "n1", []),
+                ("n2", "n3", ["b"]),
+                ("n3", "n1", ["c"]),
+            ],
+        )
+        self.assertIs(subgraph.find_node("n1"), graph.find_node("n1"))
+
+        # Edge attributes are copied
+        subgraph.add_edge("n1", "n2", "x")
+        self.assertEqual(graph.edge_data("n1", "n2"), {"a"})
+        self.assertEqual(subgraph.edge_data("n1", "n2"), {"a", "x"})
+
+        with self.assertRaises(KeyError):
+            graph.induced_subgraph(["n1", "n9"])
+
+    def test_shortest_path(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(f"n{idx}") for idx in range(1, 8))
+        graph.add_edges(
+            [
+                ("n1", "n2", "toplevel"),
+                ("n1", "n3", "conditional"),
+                ("n2", "n4", "toplevel"),
+                ("n3", "n4", "toplevel"),
+                ("n4", "n5", "toplevel"),
+                ("n1", "n6", "toplevel"),
+                ("n6", "n7", "toplevel"),
+                ("n7", "n5", "toplevel"),
+                ("n5", "n1", "toplevel"),
+            ]
+        )
+
+        def ids(path):
+            return None if path is None else [n.identifier for n in path]
+
+        def toplevel(attributes):
+            return "toplevel" in attributes
+
+        self.assertEqual(ids(graph.shortest_path("n1", "n1")), ["n1"])
+        self.assertEqual(ids(graph.shortest_path("n1", "n2")), ["n1", "n2"])
+        all_paths = [
+            ["n1", "n2", "n4", "n5"],
+            ["n1", "n3", "n4", "n5"],
+            ["n1", "n6", "n7", "n5"],
+        ]
+        self.assertIn(ids(graph.shortest_path(graph.find_node("n1"), "n5")), all_paths)
+        self.assertEqual(ids(graph.shortest_path("n5", "n3")), ["n5", "n1", "n3"])
+        self.assertIsNone(graph.shortest_path("n5", "n3", edge_filter=toplevel))
+        self.assertRaises(KeyError, graph.shortest_path, "n1", "n9")
+        self.assertRaises(KeyError, graph.shortest_path, "n9", "n1")
+
+        self.assertCountEqual(map(ids, graph.all_shortest_paths("n1", "n5")), all_paths)
+        self.assertCountEqual(
+            map(ids, graph.all_shortest_paths("n1", "n5", edge_filter=toplevel)),
+            [["n1", "n2", "n4", "n5"], ["n1", "n6", "n7", "n5"]],
+        )
+        self.assertEqual(list(map(ids, graph.all_shortest_paths("n4", "n4"))), [["n4"]])
+        self.assertEqual(
+            list(map(ids, graph.all_shortest_paths("n5", "n3", edge_filter=toplevel))),
+            [],
+        )
+        with self.assertRaises(KeyError):
+            list(graph.all_shortest_paths("n1", "n9"))
+
+    def test_why(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(f"n{idx}") for idx in range(1, 7))
+        graph.add_root("n1")
+        graph.add_root("n5")
+        graph.add_edges(
+            [
+                ("n1", "n2", "toplevel"),
+                ("n2", "n3", "toplevel"),
+                ("n3", "n4", "conditional"),
+                ("n5", "n3", "toplevel"),
+                ("n1", "n4", "conditional"),
+                ("n4", "n6", "toplevel"),
+            ]
+        )
+
+        def ids(path):
+            return None if path is None else [n.identifier for n in path]
+
+        self.assertEqual(ids(graph.why("n1")), ["n1"])
+        self.assertEqual(ids(graph.why("n2")), ["n1", "n2"])
+        self.assertEqual(ids(graph.why("n3")), ["n5", "n3"])
+        self.assertEqual(ids(graph.why("n6")), ["n1", "n4", "n6"])
+        self.assertIsNone(
+            graph.why("n6", edge_filter=lambda attributes: "toplevel" in attributes)
+        )
+        self.assertEqual(
+            ids(graph.why("n4", edge_filter=lambda attributes: "n1" not in attributes)),
+            ["n1", "n4"],
+        )
+
+        graph.remove_root("n1")
+        self.assertIsNone(graph.why("n2"))
+        self.assertRaises(KeyError, graph.why, "n9")
+
+    def test_shortest_path_deep(self):
+        graph = self.graph_class()
+
+        count = sys.getrecursionlimit() * 3
+        graph.add_nodes(Node(str(idx)) for idx in range(count))
+        graph.add_root("0")
+        graph.add_edges((str(idx), str(idx + 1), None) for idx in range(count - 1))
+
+        self.assertEqual(len(graph.shortest_path("0", str(count - 1))), count)
+        self.assertEqual(len(list(graph.all_shortest_paths("0", str(count - 1)))), 1)
+        self.assertEqual(len(graph.why(str(count - 1))), count)
+
+    def test_edge_filter(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(f"n{idx}") for idx in range(1, 6))
+        graph.add_root("n1")
+        graph.add_edges(
+            [
+                ("n1", "n2", "toplevel"),
+                ("n1", "n3", "conditional"),
+                ("n2", "n4", "toplevel"),
+                ("n2", "n4", "try-except"),
+                ("n3", "n5", "toplevel"),
+            ]
+        )
+
+        def toplevel(attributes):
+            return "toplevel" in attributes
+
+        self.assertCountEqual(
+            [
+                (attributes, node.identifier)
+                for attributes, node in graph.outgoing("n1", edge_filter=toplevel)
+            ],
+            [({"toplevel"}, "n2")],
+        )
+        self.assertEqual(
+            list(graph.outgoing("n1", edge_filter=lambda attributes: False)), []
+        )
+        self.assertEqual(
+            list(graph.outgoing("n9", edge_filter=lambda attributes: True)), []
+        )
+        self.assertCountEqual(
+            [
+                (attributes, node.identifier)
+                for attributes, node in graph.incoming(
+                    "n4", edge_filter=lambda attributes: "try-except" in attributes
+                )
+            ],
+            [({"toplevel", "try-except"}, "n2")],
+        )
+        self.assertEqual(list(graph.incoming("n3", edge_filter=toplevel)), [])
+
+        self.assertEqual(
+            [node.identifier for node in graph.iter_graph(edge_filter=toplevel)],
+            ["n1", "n2", "n4"],
+        )
+        self.assertCountEqual(
+            [
+                node.identifier
+                for node in graph.iter_graph(
+                    node="n3", order="bfs", edge_filter=toplevel
+                )
+            ],
+            ["n3", "n5"],
+        )
+        self.assertCountEqual(
+            [node.identifier for node in graph.iter_graph(edge_filter=None)],
+            ["n1", "n2", "n3", "n4", "n5"],
+        )
+
+    def test_edges_with_attribute(self):
+        for attribute_index in (False, True):
+            with self.subTest(attribute_index=attribute_index):
+                graph = self.graph_class(attribute_index=attribute_index)
+                graph.add_nodes(Node(f"n{idx}") for idx in range(1, 6))
+
+                def edges(edge_attributes):
+                    return sorted(
+                        (source.identifier, destination.identifier)
+                        for source, destination in graph.edges_with_attribute(
+                            edge_attributes
+                        )
+                    )
+
+                self.assertEqual(edges("toplevel"), [])
+
+                graph.add_edge("n1", "n2", "toplevel")
+                graph.add_edges(
+                    [
+                        ("n1", "n3", "conditional"),
+                        ("n2", "n3", "toplevel"),
+                        ("n2", "n3", "conditional"),
+                        ("n3", "n4", "toplevel"),
+                        ("n4", "n5", "toplevel"),
+                    ]
+                )
+                self.assertEqual(
+                    edges("toplevel"),
+                    [("n1", "n2"), ("n2", "n3"), ("n3", "n4"), ("n4", "n5")],
+                )
+                self.assertEqual(edges("conditional"), [("n1", "n3"), ("n2", "n3")])
+                self.assertEqual(edges("try-except"), [])
+
+                graph.remove_edge("n2", "n3", "toplevel")
+                self.assertEqual(
+                    edges("toplevel"), [("n1", "n2"), ("n3", "n4"), ("n4", "n5")]
+                )
+                self.assertEqual(edges("conditional"), [("n1", "n3"), ("n2", "n3")])
+
+                graph.remove_all_edges("n2", "n3")
+                self.assertEqual(edges("conditional"), [("n1", "n3")])
+
+                graph.remove_node("n4")
+                self.assertEqual(edges("toplevel"), [("n1", "n2")])
+
+                graph.remove_nodes(["n1"])
+                self.assertEqual(edges("toplevel"), [])
+                self.assertEqual(edges("conditional"), [])
+
+                other = self.graph_class()
+                other.add_nodes(graph.nodes())
+                other.add_edge("n2", "n5", "toplevel")
+                graph.apply(graph.diff(other))
+                self.assertEqual(edges("toplevel"), [("n2", "n5")])
+
+    def test_edges_with_attribute_index(self):
+        graph = self.graph_class(attribute_index=True, journal_size=10)
+        graph.add_nodes([Node("n1"), Node("n2")])
+
+        events = []
+        graph.subscribe(events.append)
+        graph.add_edge("n1", "n2", "toplevel")
+        graph.unsubscribe(events.append)
+        graph.add_edge("n2", "n1", "toplevel")
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(len(graph.events_since(0)), 4)
+        self.assertCountEqual(
+            [
+                (source.identifier, destination.identifier)
+                for source, destination in graph.edges_with_attribute("toplevel")
+            ],
+            [("n1", "n2"), ("n2", "n1")],
+        )
+
+    def test_instrumentation(self):
+        graph = self.graph_class()
+        self.assertEqual(graph.stats(), {})
+
+        graph.add_nodes(Node(f"n{idx}") for idx in range(1, 6))
+        graph.add_root("n1")
+        graph.add_edges(
+            [
+                ("n1", "n2", "toplevel"),
+                ("n1", "n3", "toplevel"),
+                ("n2", "n4", "toplevel"),
+                ("n3", "n4", "conditional"),
+            ]
+        )
+        self.assertEqual(graph.stats(), {})
+
+        samples = []
+        graph.enable_instrumentation(
+            sink=lambda name, stats: samples.append((name, stats))
+        )
+        self.assertIn("outgoing", vars(graph))
+
+        graph.add_edge("n4", "n5", "toplevel")
+        self.assertEqual(list(graph.outgoing("n5")), [])
+        self.assertEqual(len(list(graph.outgoing("n1"))), 2)
+        self.assertEqual(len(list(graph.incoming("n4"))), 2)
+
+        self.assertEqual(len(list(graph.iter_graph())), 5)
+        self.assertEqual(
+            graph.stats()["iter_graph"], objectgraph.OperationStats(1, 5, 5, None)
+        )
+
+        iterator = graph.iter_graph()
+        next(iterator)
+        self.assertEqual(graph.stats()["iter_graph"].calls, 1)
+        iterator.close()
+        self.assertRaises(KeyError, graph.edge_data, "n1", "n5")
+
+        stats = graph.stats()
+        self.assertEqual(stats["add_edge"], objectgraph.OperationStats(1, 0, 0, None))
+        self.assertEqual(stats["outgoing"], objectgraph.OperationStats(2, 2, 2, None))
+        self.assertEqual(stats["incoming"], objectgraph.OperationStats(1, 2, 1, None))
+        self.assertEqual(stats["edge_data"].calls, 1)
+        self.assertEqual(stats["iter_graph"].calls, 2)
+        self.assertGreaterEqual(stats["find_node"].calls, 5)
+
+        self.assertEqual(len(samples), sum(value.calls for value in stats.values()))
+        self.assertEqual(samples[0][0], "find_node")
+        self.assertEqual(
+            samples[-1], ("edge_data", objectgraph.OperationStats(1, 0, 0, None))
+        )
+
+        graph.disable_instrumentation()
+        self.assertNotIn("outgoing", vars(graph))
+        self.assertNotIn("_successors", vars(graph))
+        list(graph.outgoing("n1"))
+        self.assertEqual(graph.stats(), stats)
+
+        graph.enable_instrumentation(timing=True)
+        self.assertEqual(graph.stats(), {})
+        graph.add_edge("n1", "n5", "toplevel")
+        self.assertEqual(
+            [node.identifier for node in graph.reachable_from("n5")], ["n5"]
+        )
+        stats = graph.stats()
+        self.assertEqual(stats["add_edge"].calls, 1)
+        self.assertIsInstance(stats["add_edge"].seconds, float)
+        self.assertGreaterEqual(stats["add_edge"].seconds, 0)
+        self.assertEqual(stats["reachable_from"].nodes_visited, 1)
+
+        graph.enable_instrumentation()
+        graph.find_node("n1")
+        self.assertEqual(graph.stats(), {"find_node": (1, 0, 0, None)})
+        graph.disable_instrumentation()
+
+    def test_instrumentation_copy(self):
+        graph = sample_graph(self.graph_class)
+        graph.enable_instrumentation(sink=lambda name, stats: None)
+        graph.find_node("n1")
+        graph.disable_instrumentation()
+
+        for copy in (pickle.loads(pickle.dumps(graph)), deepcopy(graph)):
+            self.assertEqual(copy.stats(), {"find_node": (1, 0, 0, None)})
+            self.assertEqual(
+                sorted(node.identifier for node in copy.reachable_from("n1")),
+                ["n1", "n2", 'quote"d'],
+            )
+            copy.enable_instrumentation()
+            copy.find_node("n2")
+            self.assertEqual(copy.stats(), {"find_node": (1, 0, 0, None)})
+            copy.disable_instrumentation()
+
+        self.assertEqual(graph.stats(), {"find_node": (1, 0, 0, None)})
+
+    def test_degrees(self):
+        graph = self.graph_class()
+        self.assertEqual(graph.degree_histogram(), [])
+        self.assertEqual(graph.top_k_by_in_degree(3), [])
+
+        nodes = [Node(f"n{idx}") for idx in range(6)]
+        graph.add_nodes(nodes)
+        graph.add_edges(
+            [
+                ("n1", "n0", "import"),
+                ("n1", "n0", "from"),
+                ("n2", "n0", None),
+                ("n3", "n0", None),
+                ("n2", "n3", None),
+                ("n3", "n4", None),
+                ("n0", "n0", None),
+            ]
+        )
+
+        self.assertEqual(graph.in_degree("n0"), 4)
+        self.assertEqual(graph.in_degree(nodes[0]), 4)
+        self.assertEqual(graph.out_degree("n0"), 1)
+        self.assertEqual(graph.out_degree("n1"), 1)
+        self.assertEqual(graph.out_degree("n3"), 2)
+        self.assertEqual(graph.in_degree("n5"), 0)
+        self.assertEqual(graph.out_degree("n5"), 0)
+
+        with self.assertRaisesRegex(KeyError, "Node 'n9' not found"):
+            graph.in_degree("n9")
+        with self.assertRaisesRegex(KeyError, "Node 'n9' not found"):
+            graph.out_degree("n9")
+
+        self.assertEqual(graph.degree_histogram(), [2, 2, 2])
+        self.assertEqual(graph.degree_histogram(incoming=True), [3, 2, 0, 0, 1])
+
+        # Removing the last attribute keeps the edge
+        graph.remove_edge("n3", "n4", None)
+        self.assertEqual(graph.in_degree("n4"), 1)
+
+        self.assertEqual(
+            graph.top_k_by_in_degree(1),
+            [(nodes[0], 4)],
+        )
+        self.assertEqual(
+            [degree for _, degree in graph.top_k_by_in_degree(3)], [4, 1, 1]
+        )
+        self.assertEqual(len(graph.top_k_by_in_degree(10)), 6)
+        self.assertEqual(graph.top_k_by_in_degree(0), [])
+
+        graph.remove_edge("n1", "n0", "import")
+        self.assertEqual(graph.in_degree("n0"), 4)
+        graph.remove_all_edges("n1", "n0")
+        self.assertEqual(graph.in_degree("n0"), 3)
+        self.assertEqual(graph.out_degree("n1"), 0)
+
+        graph.remove_node("n3")
+        self.assertEqual(graph.in_degree("n0"), 2)
+        self.assertEqual(graph.out_degree("n2"), 1)
+        self.assertEqual(graph.degree_histogram(incoming=True), [4, 0, 1])
+        self.assertEqual(graph.degree_histogram(), [3, 2])
+
+        graph.add_edge("n4", "n5", None)
+        self.assertEqual(graph.in_degree("n5"), 1)
+        self.assertEqual(graph.out_degree("n4"), 1)
+
+    def test_topological_order(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(f"n{idx}") for idx in range(1, 7))
+        graph.add_edges(
+            [
+                ("n1", "n2", None),
+                ("n1", "n3", None),
+                ("n2", "n4", None),
+                ("n3", "n4", None),
+                ("n4", "n5", None),
+                ("n6", "n5", None),
+            ]
+        )
+
+        levels = [sorted(n.identifier for n in level) for level in graph.levels()]
+        self.assertEqual(levels, [["n1", "n6"], ["n2", "n3"], ["n4"], ["n5"]])
+
+        levels = [
+            sorted(n.identifier for n in level) for level in graph.levels(reverse=True)
+        ]
+        self.assertEqual(levels, [["n5"], ["n4", "n6"], ["n2", "n3"], ["n1"]])
+
+        for reverse in (False, True):
+            order = [n.identifier for n in graph.topological_order(reverse=reverse)]
+            self.assertCountEqual(order, [n.identifier for n in graph.nodes()])
+            for source, destination, _ in graph.edges():
+                before = order.index(source.identifier)
+                after = order.index(destination.identifier)
+                if reverse:
+                    self.assertGreater(before, after)
+                else:
+                    self.assertLess(before, after)
+
+        self.assertEqual(self.graph_class().topological_order(), [])
+        self.assertEqual(list(self.graph_class().levels()), [])
+
+    def test_topological_order_cycle(self):
+        graph = self.graph_class()
+        graph.add_nodes(Node(f"n{idx}") for idx in range(1, 6))
+        graph.add_edges(
+            [
+                ("n1", "n2", None),
+                ("n2", "n3", None),
+                ("n3", "n4", None),
+                ("n4", "n2", None),
+                ("n4", "n5", None),
+            ]
+        )
+
+        for reverse in (False, True):
+            with self.subTest(reverse=reverse):
+                with self.assertRaises(objectgraph.CycleError) as cm:
+                    graph.topological_order(reverse=reverse)
+                self.assertIsInstance(cm.exception, ValueError)
+
+                cycle = [n.identifier for n in cm.exception.args[1]]
+                self.assertEqual(cycle[0], cycle[-1])
+                self.assertCountEqual(cycle[:-1], ["n2", "n3", "n4"])
+                for source, destination in zip(cycle, cycle[1:]):
+                    graph.edge_data(source, destination)
+
+        # Levels before the cycle are yielded before raising
+        levels = graph.levels()
+        self.assertEqual([n.identifier for n in next(levels)], ["n1"])
+        with self.assertRaises(objectgraph.CycleError):
+            next(levels)
+
+        graph = self.graph_class()
+        graph.add_node(Node("n1"))
+        graph.add_edge("n1", "n1", None)
+        with self.assertRaises(objectgraph.CycleError) as cm:
+            graph.topological_order()
+        self.assertEqual([n.identifier for n in cm.exception.args[1]], ["n1", "n1"])
+
+    def test_topological_order_deep(self):
+        graph = self.graph_class()
+
+        count = sys.getrecursionlimit() * 3
+        graph.add_nodes(Node(str(idx)) for idx in range(count))
+        graph.add_edges((str(idx), str(idx + 1), None) for idx in range(count - 1))
+
+        order = graph.topological_order()
+        self.assertEqual([n.identifier for n in order], [str(i) for i in range(count)])
+
+        graph.add_edge(str(count - 1), "0", None)
+        with self.assertRaises(objectgraph.CycleError) as cm:
+            graph.topological_order()
+        self.assertEqual(len(cm.exception.args[1]), count + 1)
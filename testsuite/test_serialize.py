@@ -0,0 +1,195 @@
+import io
+import pickle
+import struct
+import unittest
+
+import objectgraph
+
+from .test_objectgraph import Node, sample_graph
+
+
+class IdentifierCodec:
+    def encode(self, nodes):
+        return b""
+
+    def decode(self, identifiers, data):
+        return [Node(identifier) for identifier in identifiers]
+
+
+class EmptyCodec(IdentifierCodec):
+    def decode(self, identifiers, data):
+        return []
+
+
+def graph_state(graph):
+    return (
+        sorted(n.identifier for n in graph.nodes()),
+        sorted(n.identifier for n in graph.roots()),
+        sorted(
+            (s.identifier, d.identifier, sorted(a, key=repr))
+            for s, d, a in graph.edges()
+        ),
+    )
+
+
+def graph_file(roots, attributes, triples):
+    """
+    Assemble a graph file with nodes "a" and "b", for use with
+    IdentifierCodec.
+    """
+    table = pickle.dumps(attributes)
+    return b"".join(
+        [
+            struct.pack("<4sH", b"OGRF", 1),
+            struct.pack("<3I2sI", 2, 1, 1, b"ab", 0),
+            struct.pack("<I", 0),
+            struct.pack(f"<{len(roots) + 1}I", len(roots), *roots),
+            struct.pack("<I", len(table)),
+            table,
+            struct.pack(f"<{len(triples) + 1}I", len(triples) // 3, *triples),
+            struct.pack("<I", 0),
+        ]
+    )
+
+
+class TestSerialization(unittest.TestCase):
+    def test_roundtrip(self):
+        for graph_class in (objectgraph.ObjectGraph, objectgraph.CompactObjectGraph):
+            with self.subTest(graph_class=graph_class):
+                graph = sample_graph(graph_class)
+                graph.add_root("<ñ4>")
+
+                stream = io.BytesIO()
+                graph.dump(stream)
+                stream.seek(0)
+
+                copy = graph_class.load(stream)
+                self.assertIsInstance(copy, graph_class)
+                self.assertEqual(graph_state(copy), graph_state(graph))
+                self.assertEqual(copy.edge_data("n5", "n1"), set())
+                self.assertEqual(stream.read(), b"")
+
+    def test_cross_class(self):
+        graph = sample_graph()
+
+        stream = io.BytesIO()
+        graph.dump(stream)
+        stream.seek(0)
+
+        copy = objectgraph.CompactObjectGraph.load(stream)
+        self.assertEqual(graph_state(copy), graph_state(graph))
+
+    def test_node_codec(self):
+        graph = sample_graph()
+
+        stream = io.BytesIO()
+        graph.dump(stream, node_codec=IdentifierCodec())
+        stream.seek(0)
+
+        copy = objectgraph.ObjectGraph.load(stream, node_codec=IdentifierCodec())
+        self.assertEqual(graph_state(copy), graph_state(graph))
+        self.assertIsNot(copy.find_node("n1"), graph.find_node("n1"))
+
+    def test_large_graph(self):
+        for graph_class in (objectgraph.ObjectGraph, objectgraph.CompactObjectGraph):
+            with self.subTest(graph_class=graph_class):
+                graph = graph_class()
+                count = 10000
+                graph.add_nodes(Node(str(idx)) for idx in range(count))
+                graph.add_edges(
+                    (str(idx), str((idx * 7 + offset) % count), offset % 3)
+                    for idx in range(count)
+                    for offset in range(3)
+                )
+                graph.add_edges(("0", str(idx), "hub") for idx in range(count))
+                graph.add_root("0")
+
+                stream = io.BytesIO()
+                graph.dump(stream, node_codec=IdentifierCodec())
+                stream.seek(0)
+
+                copy = graph_class.load(stream, node_codec=IdentifierCodec())
+                self.assertEqual(graph_state(copy), graph_state(graph))
+                self.assertEqual(copy.edge_data("0", "1"), {1, "hub"})
+                copy.remove_all_edges("0", "5")
+                self.assertIsNone(copy._edge_attributes("0", "5"))
+                self.assertEqual(len(list(copy.outgoing("0"))), count - 1)
+
+    def test_attributes_not_shared(self):
+        for graph_class in (objectgraph.ObjectGraph, objectgraph.CompactObjectGraph):
+            with self.subTest(graph_class=graph_class):
+                graph = graph_class()
+                graph.add_nodes(Node(f"n{idx}") for idx in range(4))
+                graph.add_edges(
+                    (source, destination, attributes)
+                    for source, destination in (("n0", "n1"), ("n2", "n3"))
+                    for attributes in (1, 2)
+                )
+                graph.add_edges([("n0", "n2", 1), ("n1", "n3", 1)])
+                for source, destination in (("n0", "n3"), ("n1", "n2")):
+                    graph.add_edge(source, destination, 1)
+                    graph.remove_edge(source, destination, 1)
+
+                stream = io.BytesIO()
+                graph.dump(stream)
+                stream.seek(0)
+
+                copy = graph_class.load(stream)
+                copy.add_edge("n0", "n1", 3)
+                copy.add_edge("n0", "n2", 4)
+                copy.add_edge("n0", "n3", 5)
+                self.assertEqual(copy.edge_data("n0", "n1"), {1, 2, 3})
+                self.assertEqual(copy.edge_data("n2", "n3"), {1, 2})
+                self.assertEqual(copy.edge_data("n0", "n2"), {1, 4})
+                self.assertEqual(copy.edge_data("n1", "n3"), {1})
+                self.assertEqual(copy.edge_data("n0", "n3"), {5})
+                self.assertEqual(copy.edge_data("n1", "n2"), set())
+
+    def test_invalid_files(self):
+        with self.assertRaisesRegex(ValueError, "Not an objectgraph file"):
+            objectgraph.ObjectGraph.load(io.BytesIO(b"GRAPH\0\0\0"))
+
+        with self.assertRaisesRegex(ValueError, "version 99"):
+            objectgraph.ObjectGraph.load(io.BytesIO(b"OGRFc\0"))
+
+        with self.assertRaisesRegex(ValueError, "Truncated"):
+            objectgraph.ObjectGraph.load(io.BytesIO(b"OGR"))
+
+        stream = io.BytesIO()
+        sample_graph().dump(stream)
+        data = stream.getvalue()
+
+        with self.assertRaisesRegex(ValueError, "Truncated"):
+            objectgraph.ObjectGraph.load(io.BytesIO(data[:-10]))
+
+        with self.assertRaisesRegex(ValueError, "wrong number of nodes"):
+            objectgraph.ObjectGraph.load(io.BytesIO(data), node_codec=EmptyCodec())
+
+    def test_corrupt_indexes(self):
+        valid = graph_file([1], [(), ("x", "y")], [0, 1, 1, 1, 0, 0])
+        for graph_class in (objectgraph.ObjectGraph, objectgraph.CompactObjectGraph):
+            with self.subTest(graph_class=graph_class):
+                graph = graph_class.load(
+                    io.BytesIO(valid), node_codec=IdentifierCodec()
+                )
+                self.assertEqual(
+                    graph_state(graph),
+                    (["a", "b"], ["b"], [("a", "b", ["x", "y"]), ("b", "a", [])]),
+                )
+
+        for roots, triples, message in [
+            ([2], [0, 1, 0], "root index 2"),
+            ([0], [0, 1, 0, 1, 7, 0], "destination index 7"),
+            ([0], [0, 1, 0, 2**32 - 1, 0, 0], "source index 4294967295"),
+            ([0], [1, 0, 2], "attribute index 2"),
+        ]:
+            data = graph_file(roots, [(), ("x", "y")], triples)
+            for graph_class in (
+                objectgraph.ObjectGraph,
+                objectgraph.CompactObjectGraph,
+            ):
+                with self.subTest(graph_class=graph_class, message=message):
+                    with self.assertRaisesRegex(
+                        ValueError, f"Corrupt graph file: {message} out of range"
+                    ):
+                        graph_class.load(io.BytesIO(data), node_codec=IdentifierCodec())
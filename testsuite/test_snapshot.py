@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+
+import objectgraph
+
+from .test_objectgraph import Node
+from .test_serialize import IdentifierCodec, graph_state
+
+
+class TestGraphSnapshot(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".snapshot")
+        os.close(fd)
+
+        self.graph = objectgraph.ObjectGraph()
+        self.graph.add_nodes(
+            [Node("n1"), Node("n2"), Node("n3"), Node("ñ4"), Node("z5")]
+        )
+        self.graph.add_root("n1")
+        self.graph.add_root("z5")
+        self.graph.add_edges(
+            [
+                ("n1", "n3", "a"),
+                ("n1", "n2", "b"),
+                ("n1", "n2", "c"),
+                ("n2", "ñ4", None),
+                ("n3", "n3", "a"),
+                ("ñ4", "n1", "a"),
+                ("z5", "n2", "b"),
+            ]
+        )
+
+        with open(self.path, "wb") as stream:
+            objectgraph.GraphSnapshot.write(self.graph, stream)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_queries(self):
+        with objectgraph.GraphSnapshot(self.path) as snapshot:
+            self.assertEqual(
+                repr(snapshot), "<GraphSnapshot with 2 roots, 5 nodes and 6 edges>"
+            )
+            self.assertEqual(graph_state(snapshot), graph_state(self.graph))
+            self.assertEqual(
+                [n.identifier for n in snapshot.nodes()],
+                ["n1", "n2", "n3", "z5", "ñ4"],
+            )
+
+            n1 = snapshot.find_node("n1")
+            self.assertEqual(n1.identifier, "n1")
+            self.assertIs(snapshot.find_node(Node("n1")), n1)
+            self.assertIsNone(snapshot.find_node("n0"))
+            self.assertIsNone(snapshot.find_node("zz"))
+            self.assertIn("ñ4", snapshot)
+            self.assertNotIn("n4", snapshot)
+
+            self.assertEqual(snapshot.edge_data("n1", "n2"), {"b", "c"})
+            self.assertEqual(snapshot.edge_data("n2", "ñ4"), {None})
+            self.assertRaises(KeyError, snapshot.edge_data, "n2", "n1")
+            self.assertRaises(KeyError, snapshot.edge_data, "n0", "n1")
+            self.assertRaises(KeyError, snapshot.edge_data, "n1", "n0")
+
+            self.assertEqual(
+                [(a, n.identifier) for a, n in snapshot.outgoing("n1")],
+                [({"b", "c"}, "n2"), ({"a"}, "n3")],
+            )
+            self.assertEqual(
+                [(a, n.identifier) for a, n in snapshot.incoming("n2")],
+                [({"b", "c"}, "n1"), ({"b"}, "z5")],
+            )
+            self.assertEqual(list(snapshot.outgoing("n0")), [])
+            self.assertEqual(list(snapshot.incoming("n0")), [])
+
+            self.assertEqual(
+                [n.identifier for n in snapshot.iter_graph(node="n1")],
+                ["n1", "n2", "ñ4", "n3"],
+            )
+            self.assertEqual(
+                [n.identifier for n in snapshot.iter_graph(order="bfs")],
+                ["n1", "z5", "n2", "n3", "ñ4"],
+            )
+            with self.assertRaises(KeyError):
+                list(snapshot.iter_graph(node="n0"))
+
+            def only_a(attributes):
+                return "a" in attributes
+
+            self.assertEqual(
+                [n.identifier for _, n in snapshot.outgoing("n1", edge_filter=only_a)],
+                ["n3"],
+            )
+            self.assertEqual(
+                [n.identifier for _, n in snapshot.incoming("n1", edge_filter=only_a)],
+                ["ñ4"],
+            )
+            self.assertEqual(list(snapshot.incoming("n2", edge_filter=only_a)), [])
+            self.assertEqual(
+                [
+                    n.identifier
+                    for n in snapshot.iter_graph(node="n1", edge_filter=only_a)
+                ],
+                ["n1", "n3"],
+            )
+
+    def test_node_codec(self):
+        codec = IdentifierCodec()
+        with open(self.path, "wb") as stream:
+            objectgraph.GraphSnapshot.write(self.graph, stream, node_codec=codec)
+
+        with objectgraph.GraphSnapshot(self.path, node_codec=codec) as snapshot:
+            self.assertEqual(graph_state(snapshot), graph_state(self.graph))
+
+    def test_close(self):
+        snapshot = objectgraph.GraphSnapshot(self.path)
+        n1 = snapshot.find_node("n1")
+        snapshot.close()
+        snapshot.close()
+
+        self.assertEqual(n1.identifier, "n1")
+        self.assertRaises(ValueError, snapshot.find_node, "n2")
+
+    def test_invalid_files(self):
+        with open(self.path, "rb") as stream:
+            data = stream.read()
+
+        for contents, message in [
+            (b"OGSN", "Not a graph snapshot"),
+            (b"GRAPH" + data[5:], "Not a graph snapshot"),
+            (data[:4] + b"\x63\x00" + data[6:], "version 99"),
+            (data[:-20], "Truncated"),
+        ]:
+            with self.subTest(message=message):
+                with open(self.path, "wb") as stream:
+                    stream.write(contents)
+
+                with self.assertRaisesRegex(ValueError, message):
+                    objectgraph.GraphSnapshot(self.path)